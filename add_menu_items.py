@@ -1,10 +1,11 @@
-from backend.database import engine, SessionLocal, Base
-from backend.models import MenuItem
+from backend.database import SessionLocal, init_db
+from backend.models import MenuItem, Room
+from backend.menu_loader import upsert_menu_items, read_menu_file
 import sys
 
 def create_tables():
     """Create all database tables if they don't exist"""
-    Base.metadata.create_all(bind=engine)
+    init_db()
     print("✅ Database tables created successfully!")
 
 def get_complete_menu_data():
@@ -92,48 +93,43 @@ def get_complete_menu_data():
         {"name": "Papad", "description": "Plain roasted papad", "price": 40, "category": "Miscellaneous"},
     ]
 
+def print_upsert_summary(diff):
+    """Print the add/update/remove diff from a bulk upsert"""
+    print("=" * 50)
+    print(f"\n📊 SEEDING SUMMARY")
+    print(f"   Newly added: {len(diff['added'])}")
+    print(f"   Updated: {len(diff['updated'])}")
+    print(f"   Unchanged: {diff['unchanged']}")
+    if "removed" in diff:
+        print(f"   Removed: {len(diff['removed'])}")
+    else:
+        print(f"   Not in input (kept): {len(diff['missing'])}")
+    
+    for label, key in [("✅ Added", "added"), ("✏️  Updated", "updated"), ("🗑️  Removed", "removed")]:
+        names = diff.get(key, [])
+        if names:
+            preview = ", ".join(names[:10]) + (f" … (+{len(names) - 10} more)" if len(names) > 10 else "")
+            print(f"   {label}: {preview}")
+
 def seed_menu(clear_existing=False):
     """
     Seed complete menu data into database
     Args:
         clear_existing: If True, clear all existing menu items first
     """
-    db = SessionLocal()
-    
     if clear_existing:
         print("🗑️  Clearing existing menu items...")
+        db = SessionLocal()
         deleted_count = db.query(MenuItem).delete()
+        db.commit()
+        db.close()
         print(f"   Removed {deleted_count} existing items")
     
     menu_data = get_complete_menu_data()
     
-    print(f"📥 Adding {len(menu_data)} menu items...")
-    print("=" * 50)
-    
-    added_count = 0
-    skipped_count = 0
-    
-    for item in menu_data:
-        # Check if item already exists (unless we cleared them)
-        if not clear_existing:
-            exists = db.query(MenuItem).filter(MenuItem.name == item["name"]).first()
-            if exists:
-                skipped_count += 1
-                print(f"⏭️  Skipped: {item['name']} (already exists)")
-                continue
-        
-        db_item = MenuItem(**item)
-        db.add(db_item)
-        added_count += 1
-        print(f"✅ Added: {item['name']} (₹{item['price']})")
-    
-    db.commit()
-    
-    print("=" * 50)
-    print(f"\n📊 SEEDING SUMMARY")
-    print(f"   Total items in menu: {len(menu_data)}")
-    print(f"   Newly added: {added_count}")
-    print(f"   Skipped (already existed): {skipped_count}")
+    print(f"📥 Upserting {len(menu_data)} menu items...")
+    diff = upsert_menu_items(menu_data)
+    print_upsert_summary(diff)
     
     # Show category-wise count
     categories = {}
@@ -145,9 +141,55 @@ def seed_menu(clear_existing=False):
     for cat, count in sorted(categories.items()):
         print(f"   {cat}: {count} items")
     
-    db.close()
     print(f"\n✅ Menu database updated successfully!")
 
+def import_menu_file(path, prune=False):
+    """Bulk upsert a CSV/JSONL menu file"""
+    print(f"📥 Importing menu from {path}...")
+    diff = upsert_menu_items(read_menu_file(path), prune=prune)
+    print_upsert_summary(diff)
+    print(f"\n✅ Menu import completed!")
+
+# (room type, nightly rate ₹, capacity, rooms per floor)
+ROOM_TYPES = [
+    ("standard", 150, 2, 4),
+    ("deluxe", 250, 2, 3),
+    ("premium", 350, 3, 2),
+    ("suite", 500, 4, 1),
+]
+ROOM_FLOORS = 4
+
+def get_room_inventory_data():
+    """Room inventory: numbered by floor (101, 102, ...), cheapest types first"""
+    rooms = []
+    for floor in range(1, ROOM_FLOORS + 1):
+        number = 1
+        for room_type, rate, capacity, per_floor in ROOM_TYPES:
+            for _ in range(per_floor):
+                rooms.append({
+                    "room_number": f"{floor}{number:02d}",
+                    "room_type": room_type,
+                    "nightly_rate": rate,
+                    "capacity": capacity,
+                })
+                number += 1
+    return rooms
+
+def seed_rooms():
+    """Add rooms that don't exist yet (existing rooms and their bookings are kept)"""
+    from backend.availability import invalidate_availability
+    
+    db = SessionLocal()
+    try:
+        existing = {number for (number,) in db.query(Room.room_number)}
+        new_rooms = [Room(**room) for room in get_room_inventory_data() if room["room_number"] not in existing]
+        db.add_all(new_rooms)
+        db.commit()
+    finally:
+        db.close()
+    invalidate_availability()
+    print(f"🏨 Rooms: {len(new_rooms)} added, {len(existing)} already present")
+
 def setup_full_database():
     """Complete database setup: create tables + seed data"""
     print("🔧 Setting up complete database...")
@@ -159,6 +201,9 @@ def setup_full_database():
     # Step 2: Seed menu data (clear existing)
     seed_menu(clear_existing=True)
     
+    # Step 3: Room inventory
+    seed_rooms()
+    
     print("=" * 50)
     print("🎉 Database setup completed successfully!")
 
@@ -188,16 +233,29 @@ if __name__ == "__main__":
             # Create tables only
             create_tables()
             
+        elif command == "import" and len(sys.argv) > 2:
+            # Bulk upsert from a CSV/JSONL file (--prune deletes items not in the file)
+            create_tables()
+            import_menu_file(sys.argv[2], prune="--prune" in sys.argv[3:])
+            
+        elif command == "rooms":
+            # Room inventory only (adds missing rooms)
+            create_tables()
+            seed_rooms()
+            
         elif command == "help":
             print("\n📖 USAGE:")
             print("  python add_menu_items.py setup    → Create tables + seed data (clears existing)")
             print("  python add_menu_items.py add      → Add items only (no clear, no table creation)")
             print("  python add_menu_items.py tables   → Create tables only")
+            print("  python add_menu_items.py rooms    → Add missing rooms to the inventory")
+            print("  python add_menu_items.py import <file.csv|file.jsonl> [--prune]")
+            print("                                    → Bulk upsert menu file (--prune removes missing items)")
             print("  python add_menu_items.py          → Interactive mode (default)")
             
         else:
             print(f"❌ Unknown command: {command}")
-            print("   Use: setup, add, tables, or help")
+            print("   Use: setup, add, tables, import, or help")
             
     else:
         # Interactive mode
@@ -0,0 +1,44 @@
+"""
+Staff-only routes, authorized by the X-Admin-Token header.
+
+Guests confirm and cancel their own bookings through /bookings with their
+session id; the front desk acts on any booking through /admin/bookings.
+Every admin route refuses all requests while ADMIN_TOKEN is unset.
+"""
+
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+from . import reservations
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN or not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+class StaffConfirm(BaseModel):
+    guest_name: Optional[str] = None
+
+router = APIRouter(prefix="/admin/bookings", tags=["admin"])
+
+@router.post("/{booking_id}/confirm")
+def staff_confirm_booking(booking_id: int, body: Optional[StaffConfirm] = None,
+                          x_admin_token: Optional[str] = Header(None)):
+    """Confirm any guest's live hold"""
+    require_admin(x_admin_token)
+    try:
+        return reservations.staff_confirm_hold(booking_id, (body or StaffConfirm()).guest_name)
+    except reservations.BookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.delete("/{booking_id}")
+def staff_cancel_booking(booking_id: int, x_admin_token: Optional[str] = Header(None)):
+    """Cancel any guest's hold or booking"""
+    require_admin(x_admin_token)
+    try:
+        return reservations.staff_cancel_booking(booking_id)
+    except reservations.BookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -1,11 +1,25 @@
 import os
-import google.generativeai as genai
+import json
+import importlib.util
 from dotenv import load_dotenv
-from google.generativeai.types import FunctionDeclaration, Tool
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
 import logging
-import re
+import threading
+import time
+from .llm_guard import LLMUnavailable, llm_guard
+from .llm_metrics import path_metrics, timed_send
+from .context_window import ContextWindow
+from .fake_llm import FAKE_LLM_ENABLED, FakeGenerativeModel
+from .session_store import SessionStore, create_session_store
+from .singleflight import SingleFlight
+from .tracing import span, traced
+from .knowledge_base import get_knowledge_base
+from .order_parser import ORDER_FAST_PATH_ENABLED, get_order_parser
+from .slots import (SLOT_FILLING_ENABLED, extract_slots, fill_tool_args, is_affirmative, is_refusal, room_answer,
+                    slots_from_tool_args)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,129 +30,309 @@ env_path = os.path.join(current_dir, '.env')
 if os.path.exists(env_path):
     load_dotenv(env_path)
 
+def _module_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
 api_key = os.getenv("GEMINI_API_KEY")
-GEMINI_AVAILABLE = bool(api_key and api_key.startswith("AIza"))
+GEMINI_AVAILABLE = bool(api_key and api_key.startswith("AIza")) and _module_available("google.generativeai")
 
-if GEMINI_AVAILABLE:
-    try:
-        genai.configure(api_key=api_key)
-        logger.info("✅ Gemini configured")
-    except:
-        GEMINI_AVAILABLE = False
-        logger.warning("⚠️ Gemini not available, using mock mode")
+# An order held for its room number is placed only if the guest answers on the next turn, within this time
+PENDING_ORDER_TTL_SECONDS = float(os.getenv("PENDING_ORDER_TTL_SECONDS", "300"))
+
+# The Gemini SDK takes about a second to import, so it is loaded by the first agent that needs it
+_genai = None
+_genai_lock = threading.Lock()
+
+def load_genai():
+    """Import and configure the Gemini SDK once; None when Gemini is unavailable"""
+    global _genai, GEMINI_AVAILABLE
+    with _genai_lock:
+        if _genai is None and GEMINI_AVAILABLE:
+            try:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+                logger.info("✅ Gemini configured")
+            except Exception:
+                GEMINI_AVAILABLE = False
+                logger.warning("⚠️ Gemini not available, using mock mode")
+    return _genai
 
 # --- Conversation Memory ---
+MAX_STORED_MESSAGES = 10
+
+def _new_state() -> Dict[str, Any]:
+    return {"messages": [], "context": {}, "route": None, "windows": {}}
+
 class ConversationMemory:
-    def __init__(self):
-        self.conversations: Dict[str, List[Dict]] = {}
-        self.user_contexts: Dict[str, Dict[str, Any]] = {}
+    """
+    Per-session conversation state backed by a pluggable SessionStore.
+    
+    Inside `with memory.session(session_id):` the state is loaded once and
+    saved when the block exits; outside it every call loads and saves.
+    """
+    
+    def __init__(self, store: Optional[SessionStore] = None):
+        self._store = store
+        self._store_lock = threading.Lock()
+        self._local = threading.local()
+    
+    @property
+    def store(self) -> SessionStore:
+        # Opened on first use so importing this module never touches SQLite or Redis
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    self._store = create_session_store()
+        return self._store
+    
+    @contextmanager
+    def session(self, session_id: str):
+        active = getattr(self._local, "active", None)
+        if active is not None and active[0] == session_id:
+            yield active[1]
+            return
+        
+        state = self._load(session_id)
+        self._local.active = (session_id, state)
+        try:
+            yield state
+        finally:
+            self._local.active = active
+            self.store.save(session_id, state)
+    
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        state = self.store.load(session_id)
+        return state if state is not None else _new_state()
+    
+    def _state(self, session_id: str) -> Dict[str, Any]:
+        active = getattr(self._local, "active", None)
+        if active is not None and active[0] == session_id:
+            return active[1]
+        return self._load(session_id)
+    
+    def _save(self, session_id: str, state: Dict[str, Any]):
+        active = getattr(self._local, "active", None)
+        if active is None or active[0] != session_id:
+            self.store.save(session_id, state)
     
     def get_conversation(self, session_id: str) -> List[Dict]:
-        return self.conversations.get(session_id, [])
+        return self._state(session_id)["messages"]
     
     def add_message(self, session_id: str, role: str, content: str, metadata: Optional[Dict] = None):
-        if session_id not in self.conversations:
-            self.conversations[session_id] = []
+        state = self._state(session_id)
         
         message = {"role": role, "content": content, "timestamp": datetime.now().isoformat()}
         if metadata:
             message["metadata"] = metadata
         
-        self.conversations[session_id].append(message)
-        if len(self.conversations[session_id]) > 10:
-            self.conversations[session_id] = self.conversations[session_id][-10:]
+        state["messages"] = (state["messages"] + [message])[-MAX_STORED_MESSAGES:]
+        self._save(session_id, state)
     
     def get_context(self, session_id: str) -> Dict[str, Any]:
-        return self.user_contexts.get(session_id, {})
+        return self._state(session_id)["context"]
     
     def update_context(self, session_id: str, updates: Dict[str, Any]):
-        if session_id not in self.user_contexts:
-            self.user_contexts[session_id] = {}
-        self.user_contexts[session_id].update(updates)
+        state = self._state(session_id)
+        state["context"].update(updates)
+        self._save(session_id, state)
+    
+    def get_route(self, session_id: str) -> Optional[str]:
+        return self._state(session_id)["route"]
+    
+    def set_route(self, session_id: str, agent_type: str):
+        state = self._state(session_id)
+        state["route"] = agent_type
+        self._save(session_id, state)
+    
+    def get_window(self, session_id: str, agent_type: str) -> Optional[Dict]:
+        return self._state(session_id)["windows"].get(agent_type)
+    
+    def set_window(self, session_id: str, agent_type: str, window: Dict):
+        state = self._state(session_id)
+        state["windows"][agent_type] = window
+        self._save(session_id, state)
 
 memory = ConversationMemory()
 
+def hold_order(session_id: str, items: Dict[str, int], offered_room: Optional[str] = None):
+    """Keep a parsed order for one turn while the guest is asked for (or to confirm) the room number"""
+    memory.update_context(session_id, {"pending_order": {
+        "items": items, "offered_room": offered_room, "held_at": time.time(),
+    }})
+
 # --- Tool Definitions ---
+# Plain function declarations; the Gemini SDK converts them when a model is built
 receptionist_tools = [
-    FunctionDeclaration(
-        name="check_room_availability",
-        description="Check room availability and prices",
-        parameters={
+    {
+        "name": "check_room_availability",
+        "description": "Check room availability and prices for a stay (defaults to tonight)",
+        "parameters": {
             "type": "object",
             "properties": {
-                "room_type": {"type": "string", "description": "deluxe, suite, standard, premium"}
+                "room_type": {"type": "string", "description": "deluxe, suite, standard, premium"},
+                "check_in": {"type": "string", "description": "Arrival date, YYYY-MM-DD"},
+                "check_out": {"type": "string", "description": "Departure date, YYYY-MM-DD"},
+                "guests": {"type": "integer", "description": "Number of guests"}
             },
             "required": []
         }
-    ),
-    FunctionDeclaration(
-        name="get_facility_info",
-        description="Get facility information",
-        parameters={
+    },
+    {
+        "name": "hold_room",
+        "description": "Hold a room for a stay while the guest confirms (expires after a few minutes)",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "room_type": {"type": "string", "description": "deluxe, suite, standard, premium"},
+                "check_in": {"type": "string", "description": "Arrival date, YYYY-MM-DD"},
+                "check_out": {"type": "string", "description": "Departure date, YYYY-MM-DD"},
+                "guests": {"type": "integer", "description": "Number of guests"},
+                "guest_name": {"type": "string", "description": "Name for the booking"}
+            },
+            "required": ["room_type", "check_in", "check_out"]
+        }
+    },
+    {
+        "name": "confirm_booking",
+        "description": "Confirm a held room once the guest agrees",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "hold_id": {"type": "integer", "description": "Hold number returned by hold_room"},
+                "guest_name": {"type": "string", "description": "Name for the booking"}
+            },
+            "required": ["hold_id"]
+        }
+    },
+    {
+        "name": "search_resort_info",
+        "description": "Search resort policies and facilities (pets, airport transfer, spa packages, cancellation, kids, etc.)",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "The guest's question or its key words"}
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "get_facility_info",
+        "description": "Get facility information",
+        "parameters": {
             "type": "object",
             "properties": {
                 "facility_name": {"type": "string", "description": "gym, spa, pool, restaurant, checkin, checkout, wifi, parking"}
             },
             "required": ["facility_name"]
         }
-    )
+    }
 ]
 
 restaurant_tools = [
-    FunctionDeclaration(
-        name="get_menu_items",
-        description="Get restaurant menu",
-        parameters={
+    {
+        "name": "get_menu_items",
+        "description": "Get restaurant menu as compact pages (names and prices). Scope by category when the guest asks for one.",
+        "parameters": {
             "type": "object",
             "properties": {
-                "compact": {"type": "boolean", "description": "Brief menu if true"}
+                "compact": {"type": "boolean", "description": "Brief menu if true"},
+                "category": {"type": "string", "description": "Breakfast, Veg Starter, Non-Veg Starter, Veg Main Course, Non-Veg Main Course, Breads, Desserts, Drinks, Miscellaneous"},
+                "page": {"type": "integer", "description": "Page number (default 1)"}
             },
             "required": []
         }
-    ),
-    FunctionDeclaration(
-        name="place_restaurant_order",
-        description="Place food order",
-        parameters={
+    },
+    {
+        "name": "search_menu",
+        "description": "Search the menu for dishes matching a guest's request (ingredient, taste, meal, diet). Prefer this over the full menu.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "What the guest is looking for, e.g. 'spicy paneer'"},
+                "limit": {"type": "integer", "description": "Max results (default 5)"}
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "place_restaurant_order",
+        "description": "Place food order",
+        "parameters": {
             "type": "object",
             "properties": {
-                "room_number": {"type": "string", "description": "Room number"},
+                "room_number": {"type": "string", "description": "Room number (omit if listed under Known details)"},
                 "items_dict": {"type": "object", "description": "Item names and quantities"}
             },
-            "required": ["room_number", "items_dict"]
+            "required": ["items_dict"]
         }
-    )
+    }
 ]
 
 room_service_tools = [
-    FunctionDeclaration(
-        name="create_room_service_request",
-        description="Create room service request",
-        parameters={
+    {
+        "name": "create_room_service_request",
+        "description": "Create room service request",
+        "parameters": {
             "type": "object",
             "properties": {
-                "room_number": {"type": "string", "description": "Room number"},
+                "room_number": {"type": "string", "description": "Room number (omit if listed under Known details)"},
                 "request_type": {"type": "string", "description": "cleaning, towel, amenity, repair"},
                 "details": {"type": "string", "description": "Additional details"}
             },
-            "required": ["room_number", "request_type"]
+            "required": ["request_type"]
         }
-    )
+    }
 ]
 
+def _response_text(response) -> str:
+    """Text parts of a Gemini response (response.text raises on function calls)"""
+    return "".join(getattr(part, "text", "") or "" for part in getattr(response, "parts", []))
+
+def order_summary(items: Dict[str, int]) -> str:
+    return ", ".join(f"{qty}x {name}" for name, qty in items.items())
+
+# Read-only tools with a separate rich rendering for guests
+GUEST_RENDERED_TOOLS = {"get_menu_items"}
+
+# Every tool is one or the other; only read-only tools may share a result across sessions
+READ_ONLY_TOOLS = {
+    "check_room_availability", "get_facility_info", "search_resort_info", "get_menu_items", "search_menu",
+}
+WRITE_TOOLS = {"hold_room", "confirm_booking", "place_restaurant_order", "create_room_service_request"}
+
+# A new tool must be classified before it can be used; a write tool treated as read-only would share results
+_misclassified = ((READ_ONLY_TOOLS & WRITE_TOOLS)
+                  | ({tool["name"] for tool in receptionist_tools + restaurant_tools + room_service_tools}
+                     ^ (READ_ONLY_TOOLS | WRITE_TOOLS)))
+if _misclassified:
+    raise RuntimeError(f"Tools must be in exactly one of READ_ONLY_TOOLS and WRITE_TOOLS: {sorted(_misclassified)}")
+
+# Concurrent identical read-only tool calls (the breakfast menu rush) run once
+tool_calls = SingleFlight()
+
 # --- ResortAgent Class ---
 class ResortAgent:
-    def __init__(self, system_prompt: str, tools: List[FunctionDeclaration], agent_type: str, session_id: str = "default"):
+    def __init__(self, system_prompt: str, tools: List[Dict], agent_type: str, session_id: str = "default"):
         self.system_prompt = system_prompt
         self.agent_type = agent_type
         self.session_id = session_id
         self.tools = tools
         
-        if GEMINI_AVAILABLE:
+        self.context = ContextWindow()
+        
+        if FAKE_LLM_ENABLED:
+            self.model = FakeGenerativeModel(tools=tools, system_instruction=system_prompt)
+            self.chat_session = self.model.start_chat()
+        elif GEMINI_AVAILABLE and load_genai():
             try:
-                self.model = genai.GenerativeModel(
+                self.model = _genai.GenerativeModel(
                     model_name='gemini-2.0-flash',
-                    tools=tools,
+                    tools=[{"function_declarations": tools}],
                     system_instruction=system_prompt
                 )
                 self.chat_session = self.model.start_chat(enable_automatic_function_calling=False)  # Changed to False
@@ -155,24 +349,32 @@ class ResortAgent:
         try:
             from .tools import (
                 check_room_availability,
+                hold_room,
+                confirm_booking,
                 get_facility_info,
+                search_resort_info,
                 get_menu_items,
+                search_menu,
                 place_restaurant_order,
                 create_room_service_request
             )
             
             return {
                 "check_room_availability": check_room_availability,
+                "hold_room": hold_room,
+                "confirm_booking": confirm_booking,
                 "get_facility_info": get_facility_info,
+                "search_resort_info": search_resort_info,
                 "get_menu_items": get_menu_items,
+                "search_menu": search_menu,
                 "place_restaurant_order": place_restaurant_order,
                 "create_room_service_request": create_room_service_request
             }
         except ImportError:
             return {}
     
-    def _execute_tool(self, func_name: str, args: Dict) -> str:
-        """Execute a tool function"""
+    def _execute_tool(self, func_name: str, args: Dict, audience: str = "llm") -> str:
+        """Execute a tool function (audience="guest" renders read-only results for humans)"""
         try:
             tools = self._load_tools()
             if func_name not in tools:
@@ -180,25 +382,86 @@ class ResortAgent:
             
             func = tools[func_name]
             
-            if func_name == "get_menu_items":
-                compact = args.get("compact", False)
-                return func(compact=compact)
-            elif func_name == "check_room_availability":
-                room_type = args.get("room_type")
-                return func(room_type=room_type) if room_type else func()
-            elif func_name == "get_facility_info":
-                return func(args.get("facility_name", ""))
-            elif func_name == "place_restaurant_order":
-                return func(room_number=args.get("room_number", ""), items_dict=args.get("items_dict", {}))
-            elif func_name == "create_room_service_request":
-                return func(
-                    room_number=args.get("room_number", ""),
-                    request_type=args.get("request_type", ""),
-                    details=args.get("details", "")
-                )
+            # Fill arguments the model left out from what the guest already told us, and
+            # remember the ones it supplied
+            if SLOT_FILLING_ENABLED:
+                args = fill_tool_args(func_name, args, memory.get_context(self.session_id))
+                learned = slots_from_tool_args(func_name, args)
+                if learned:
+                    memory.update_context(self.session_id, learned)
+            
+            with span(f"tool.{func_name}", audience=audience):
+                # Identical read-only calls in flight at the same moment share one result
+                if func_name in READ_ONLY_TOOLS:
+                    key = (func_name, audience, json.dumps(args, sort_keys=True, default=str))
+                    return tool_calls.do(key, lambda: self._run_tool(func, func_name, args, audience))
+                return self._run_tool(func, func_name, args, audience)
         except Exception as e:
             return f"Error: {str(e)[:100]}"
     
+    def _run_tool(self, func, func_name: str, args: Dict, audience: str) -> str:
+        """Call a tool with the arguments it takes"""
+        if func_name == "get_menu_items":
+            return func(
+                compact=args.get("compact", False),
+                category=args.get("category"),
+                page=int(args.get("page", 1) or 1),
+                style="rich" if audience == "guest" else "llm"
+            )
+        elif func_name == "search_menu":
+            return func(query=args.get("query", ""), limit=args.get("limit", 5))
+        elif func_name == "check_room_availability":
+            return func(
+                room_type=args.get("room_type"),
+                check_in=args.get("check_in"),
+                check_out=args.get("check_out"),
+                guests=args.get("guests", 1)
+            )
+        elif func_name == "hold_room":
+            return func(
+                room_type=args.get("room_type", ""),
+                check_in=args.get("check_in"),
+                check_out=args.get("check_out"),
+                guests=args.get("guests", 1),
+                guest_name=args.get("guest_name"),
+                session_id=self.session_id
+            )
+        elif func_name == "confirm_booking":
+            return func(
+                hold_id=args.get("hold_id", 0),
+                guest_name=args.get("guest_name"),
+                session_id=self.session_id
+            )
+        elif func_name == "get_facility_info":
+            return func(args.get("facility_name", ""))
+        elif func_name == "search_resort_info":
+            return func(query=args.get("query", ""))
+        elif func_name == "place_restaurant_order":
+            return func(
+                room_number=args.get("room_number", ""),
+                items_dict=args.get("items_dict", {}),
+                session_id=self.session_id,
+                idempotency_key=args.get("idempotency_key")
+            )
+        elif func_name == "create_room_service_request":
+            return func(
+                room_number=args.get("room_number", ""),
+                request_type=args.get("request_type", ""),
+                details=args.get("details", ""),
+                session_id=self.session_id,
+                idempotency_key=args.get("idempotency_key")
+            )
+    
+    def record_direct_answer(self, user_message: str, answer: str) -> str:
+        """Keep a turn answered without the LLM in this agent's history, so follow-ups have context"""
+        self.context.load(memory.get_window(self.session_id, self.agent_type))
+        self.context.start_turn(user_message)
+        self.context.add("model", answer)
+        memory.set_window(self.session_id, self.agent_type, self.context.to_dict())
+        memory.add_message(self.session_id, "assistant", answer)
+        return answer
+    
+    @traced("agent.process_message")
     def process_message(self, history: List[Dict[str, str]]) -> str:
         """Process message with manual function calling"""
         try:
@@ -212,49 +475,116 @@ class ResortAgent:
             if not user_message:
                 return "How can I help you?"
             
-            # Extract room number
-            room_match = re.search(r'room\s*(\d+)', user_message.lower())
-            if room_match:
-                memory.update_context(self.session_id, {"room_number": room_match.group(1)})
-            
             # Store user message
             memory.add_message(self.session_id, "user", user_message)
             
-            if not GEMINI_AVAILABLE or not self.chat_session:
+            if not self.chat_session:
                 return self._get_mock_response(user_message)
             
-            # Send to Gemini
-            response = self.chat_session.send_message(user_message)
+            # Replay only the bounded window (summary + recent turns), not the whole transcript
+            self.context.load(memory.get_window(self.session_id, self.agent_type))
+            self.chat_session = self.model.start_chat(
+                history=self.context.render(memory.get_context(self.session_id)),
+                enable_automatic_function_calling=False
+            )
+            self.context.start_turn(user_message)
+            
+            # Send to Gemini (answer locally if it is down or too slow)
+            try:
+                response, self.chat_session = timed_send(self.chat_session, user_message, self.session_id, self.agent_type)
+            except LLMUnavailable as e:
+                answer = self._local_fallback(user_message, e.reason)
+                self.context.add("model", answer)
+                memory.add_message(self.session_id, "assistant", answer)
+                memory.set_window(self.session_id, self.agent_type, self.context.to_dict())
+                return answer
             response_text = ""
             
-            # Check for function calls and execute them manually
-            if hasattr(response, 'parts'):
-                for part in response.parts:
-                    if hasattr(part, 'text'):
-                        response_text += part.text
-                    elif hasattr(part, 'function_call'):
-                        # EXECUTE THE FUNCTION (FIXED)
-                        func_name = part.function_call.name
-                        args = dict(part.function_call.args)
-                        
-                        logger.info(f"🔧 Executing: {func_name} with {args}")
-                        tool_result = self._execute_tool(func_name, args)
-                        
-                        # Send result back to Gemini
-                        self.chat_session.send_message(str(tool_result))
-                        response_text += f"\n{tool_result}"
+            # Collect text and function calls
+            calls = []
+            for part in getattr(response, 'parts', []):
+                # Proto parts expose every field, so check the call name rather than hasattr
+                function_call = getattr(part, 'function_call', None)
+                if function_call is not None and getattr(function_call, 'name', ''):
+                    calls.append((function_call.name, dict(function_call.args)))
+                elif getattr(part, 'text', ''):
+                    response_text += part.text
+            
+            call_notes = " ".join(f"[called {name}({args})]" for name, args in calls)
+            self.context.add("model", " ".join(filter(None, [response_text, call_notes])))
+            
+            # Execute function calls manually
+            for func_name, args in calls:
+                logger.info(f"🔧 Executing: {func_name} with {args}")
+                tool_result = self._execute_tool(func_name, args)
+                
+                # Send result back to Gemini; the tool already ran, so its result stands without it
+                try:
+                    follow_up, self.chat_session = timed_send(
+                        self.chat_session, str(tool_result), self.session_id, self.agent_type,
+                        kind="tool_result", tools=[func_name], tool_output=str(tool_result)
+                    )
+                except LLMUnavailable:
+                    follow_up = None
+                self.context.add("user", str(tool_result), kind="tool_result", tool=func_name)
+                self.context.add("model", _response_text(follow_up))
+                
+                # The model gets the compact rendering; the guest sees the rich one
+                if func_name in GUEST_RENDERED_TOOLS:
+                    tool_result = self._execute_tool(func_name, args, audience="guest")
+                response_text += f"\n{tool_result}"
             
             if not response_text.strip():
                 response_text = self._get_mock_response(user_message)
             
-            # Store response
+            # Store response and the updated window
             memory.add_message(self.session_id, "assistant", response_text)
+            memory.set_window(self.session_id, self.agent_type, self.context.to_dict())
             return response_text
             
         except Exception as e:
             logger.error(f"Error: {e}")
             return self._get_mock_response(user_message) if 'user_message' in locals() else "I encountered an error"
     
+    def _local_fallback(self, user_message: str, reason: str) -> str:
+        """Answer without the model: FAQ passages, the menu and a deterministic order flow"""
+        logger.warning(f"{self.agent_type} answering locally ({reason})")
+        tools = self._load_tools()
+        text = user_message.lower()
+        
+        if self.agent_type == "Restaurant":
+            parsed = get_order_parser().parse(user_message)
+            items = parsed["items"] if not parsed["reason"] else None
+            # Only a room stated in this message; a remembered one is confirmed first
+            room_number = parsed["room_number"]
+            if items and room_number:
+                memory.update_context(self.session_id, {"room_number": room_number})
+                llm_guard.record_fallback("order")
+                return tools["place_restaurant_order"](room_number=room_number, items_dict=items, session_id=self.session_id)
+            if items:
+                hold_order(self.session_id, items)
+                llm_guard.record_fallback("order_pending")
+                return f"🛎️ Got it: {order_summary(items)}. What's your room number?"
+            if "menu" in text:
+                llm_guard.record_fallback("menu")
+                return self._execute_tool("get_menu_items", {"compact": True}, audience="guest")
+            if parsed["reason"] not in ("empty", "no_order_intent"):
+                llm_guard.record_fallback("menu_search")
+                return (self._execute_tool("search_menu", {"query": user_message})
+                        + "\n\nPlease order by exact item name and quantity, e.g. \"2 Masala Dosa to room 204\".")
+        
+        elif self.agent_type == "Receptionist":
+            results = get_knowledge_base().search(user_message, limit=1)
+            if results and results[0]["coverage"] >= 0.5:
+                llm_guard.record_fallback("knowledge_base")
+                return results[0]["text"]
+            if "available" in text or "availability" in text:
+                llm_guard.record_fallback("availability")
+                return self._execute_tool("check_room_availability", {})
+        
+        llm_guard.record_fallback("canned")
+        return f"⚠️ Our assistant is briefly unavailable. {self._get_mock_response(user_message)}"
+    
     def _get_mock_response(self, user_message: str) -> str:
         """Mock response when Gemini unavailable"""
         user_lower = user_message.lower()
@@ -283,25 +613,40 @@ class ResortAgent:
 
 # System Prompts
 RECEPTIONIST_PROMPT = """You are a resort receptionist. Answer questions about rooms, facilities, check-in/out.
+For room availability, pass the guest's dates (YYYY-MM-DD) and party size to check_room_availability.
+To book: hold_room first, tell the guest the total, and call confirm_booking only after they agree.
+For policies and facilities, use search_resort_info and answer only from its results; never guess.
 Use tools for accurate information."""
 
 RESTAURANT_PROMPT = """You are a restaurant assistant. Handle menu requests and food orders.
-For ordering: Ask for room number, confirm items, then place order.
+For specific requests ("something spicy", "a vegan breakfast"), use search_menu instead of the full menu.
+For ordering: confirm items, then place order. Only ask for the room number if it is not under Known details.
 Use tools when needed."""
 
-ROOM_SERVICE_PROMPT = """You handle room service requests. Ask for room number and request type.
+ROOM_SERVICE_PROMPT = """You handle room service requests. Ask for the request type, and for the room number
+only if it is not under Known details.
 Use tool to create service requests."""
 
 # --- Agent Manager ---
+MAX_CACHED_AGENTS = 1000
+
 class AgentManager:
+    """
+    Routes guest messages to agents. Session state (routing, context,
+    history) lives in `memory`'s store, so cached agents are only a
+    per-process optimization and any worker can serve any session.
+    """
+    
     def __init__(self):
-        self.conversation_states = {}
-        self.agent_cache = {}
+        self.agent_cache: "OrderedDict[str, ResortAgent]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def get_agent(self, agent_type: str, session_id: str = "default"):
         cache_key = f"{session_id}_{agent_type}"
-        if cache_key in self.agent_cache:
-            return self.agent_cache[cache_key]
+        with self._cache_lock:
+            if cache_key in self.agent_cache:
+                self.agent_cache.move_to_end(cache_key)
+                return self.agent_cache[cache_key]
         
         if agent_type == "Restaurant":
             tools = restaurant_tools
@@ -314,9 +659,13 @@ class AgentManager:
             prompt = RECEPTIONIST_PROMPT
         
         agent = ResortAgent(prompt, tools, agent_type, session_id)
-        self.agent_cache[cache_key] = agent
+        with self._cache_lock:
+            self.agent_cache[cache_key] = agent
+            while len(self.agent_cache) > MAX_CACHED_AGENTS:
+                self.agent_cache.popitem(last=False)
         return agent
     
+    @traced("agent.route")
     def route_request(self, text: str, session_id: str = "default") -> str:
         if not text:
             return "Receptionist"
@@ -324,7 +673,7 @@ class AgentManager:
         text_lower = text.lower()
         
         # Check current state
-        current_state = self.conversation_states.get(session_id)
+        current_state = memory.get_route(session_id)
         if current_state == "Restaurant" and any(word in text_lower for word in ["menu", "order", "food", "eat", "want", "get"]):
             return "Restaurant"
         if current_state == "RoomService" and any(word in text_lower for word in ["clean", "towel", "service"]):
@@ -341,17 +690,22 @@ class AgentManager:
                         "laundry", "housekeeping", "maintenance", "repair"]
         
         if any(word in text_lower for word in restaurant_words):
-            self.conversation_states[session_id] = "Restaurant"
+            memory.set_route(session_id, "Restaurant")
             return "Restaurant"
         
         if any(word in text_lower for word in service_words):
-            self.conversation_states[session_id] = "RoomService"
+            memory.set_route(session_id, "RoomService")
             return "RoomService"
         
-        self.conversation_states[session_id] = "Receptionist"
+        memory.set_route(session_id, "Receptionist")
         return "Receptionist"
     
     def chat(self, history: List[Dict[str, str]], session_id: str = "default") -> str:
+        # Load the session's state once for the whole turn and save it at the end
+        with span("agent.chat", session_id=session_id), memory.session(session_id):
+            return self._chat(history, session_id)
+    
+    def _chat(self, history: List[Dict[str, str]], session_id: str) -> str:
         if not history:
             welcome = "Welcome to Eco Resort! How can I help?"
             memory.add_message(session_id, "assistant", welcome)
@@ -367,15 +721,122 @@ class AgentManager:
         # Store user message
         memory.add_message(session_id, "user", user_text)
         
+        # Pick up room number, name and party size once, for every agent in the session
+        if SLOT_FILLING_ENABLED:
+            earlier = memory.get_conversation(session_id)[:-1]
+            previous_reply = next((m["content"] for m in reversed(earlier) if m["role"] == "assistant"), "")
+            slots = extract_slots(user_text, previous_reply)
+            if slots:
+                memory.update_context(session_id, slots)
+        
+        start = time.perf_counter()
+        
+        # Clearly structured orders ("2 masala dosa to room 204") are placed without the LLM
+        fallback_reason = None
+        context = memory.get_context(session_id)
+        
+        # A held order lives for exactly one turn: placed if this turn is just the room number (or a
+        # yes to the room we offered), refused out loud on a "no", dropped on anything else
+        pending = context.get("pending_order")
+        if pending:
+            memory.update_context(session_id, {"pending_order": None})
+            if time.time() - pending["held_at"] <= PENDING_ORDER_TTL_SECONDS:
+                if is_refusal(user_text):
+                    return self._drop_held_order(user_text, pending["items"], session_id, start)
+                room_number = room_answer(user_text)
+                if not room_number and is_affirmative(user_text):
+                    room_number = pending.get("offered_room")
+                if room_number:
+                    return self._fast_path_order(user_text, pending["items"], room_number, session_id, start)
+        
+        if ORDER_FAST_PATH_ENABLED:
+            with span("order.parse"):
+                parsed = get_order_parser().parse(user_text)
+            if not parsed["reason"] and parsed["room_number"]:
+                return self._fast_path_order(user_text, parsed["items"], parsed["room_number"], session_id, start)
+            if not parsed["reason"] and context.get("room_number"):
+                # A remembered room may be stale or misread; never bill it without the guest saying so
+                return self._confirm_room(user_text, parsed["items"], context["room_number"], session_id, start)
+            if parsed["reason"] not in ("empty", "no_order_intent"):
+                fallback_reason = parsed["reason"] or "no_room"
+        
         # Route to agent
         agent_type = self.route_request(user_text, session_id)
         logger.info(f"Routing to: {agent_type}")
         
         # Get agent and process
         agent = self.get_agent(agent_type, session_id)
+        
+        # Policy/facility questions the knowledge base clearly answers skip the LLM
+        if agent_type == "Receptionist":
+            with span("knowledge_base.direct_answer"):
+                hit = get_knowledge_base().direct_answer(user_text)
+            if hit:
+                logger.info(f"Answered from knowledge base: {hit['title']}")
+                response = agent.record_direct_answer(user_text, hit["text"])
+                path_metrics.record("knowledge_base", (time.perf_counter() - start) * 1000)
+                return response
+        
         response = agent.process_message(history)
+        path_metrics.record("agent", (time.perf_counter() - start) * 1000, fallback_reason)
         
         return response
+    
+    def _fast_path_order(self, user_text: str, items: Dict[str, int], room_number: str,
+                         session_id: str, start: float) -> str:
+        """Place a parsed order directly and keep the turn in the restaurant agent's history"""
+        from .tools import place_restaurant_order
+        
+        result = place_restaurant_order(room_number=room_number, items_dict=items, session_id=session_id)
+        memory.set_route(session_id, "Restaurant")
+        memory.update_context(session_id, {"room_number": room_number})
+        response = self.get_agent("Restaurant", session_id).record_direct_answer(user_text, result)
+        
+        latency_ms = (time.perf_counter() - start) * 1000
+        path_metrics.record("order_fast_path", latency_ms)
+        logger.info(f"Fast-path order for room {room_number}: {items} in {latency_ms:.1f} ms")
+        return response
+    
+    def _confirm_room(self, user_text: str, items: Dict[str, int], remembered_room: str,
+                      session_id: str, start: float) -> str:
+        """Hold a parsed order until the guest states the room it goes to"""
+        memory.set_route(session_id, "Restaurant")
+        hold_order(session_id, items, offered_room=remembered_room)
+        reply = (f"🛎️ Got it: {order_summary(items)}. Shall I send it to room {remembered_room}? "
+                 f"Reply yes, or with your room number if it's a different one.")
+        response = self.get_agent("Restaurant", session_id).record_direct_answer(user_text, reply)
+        path_metrics.record("order_confirm_room", (time.perf_counter() - start) * 1000)
+        return response
+    
+    def _drop_held_order(self, user_text: str, items: Dict[str, int], session_id: str, start: float) -> str:
+        """The guest said no to a held order: nothing is placed or charged, and the reply says so"""
+        reply = (f"👍 Okay, I haven't placed the order for {order_summary(items)} and nothing was charged. "
+                 f"To order, send the items with your room number, e.g. \"2 Masala Dosa to room 204\".")
+        response = self.get_agent("Restaurant", session_id).record_direct_answer(user_text, reply)
+        path_metrics.record("order_declined", (time.perf_counter() - start) * 1000)
+        return response
 
 # Global instance
-manager = AgentManager()
\ No newline at end of file
+_manager: Optional[AgentManager] = None
+_manager_lock = threading.Lock()
+
+def get_manager() -> AgentManager:
+    """The process-wide AgentManager, built on first use"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = AgentManager()
+    return _manager
+
+def warm_up():
+    """Load what the first chat turn would otherwise pay for (the Gemini SDK and the manager)"""
+    get_manager()
+    if GEMINI_AVAILABLE and not FAKE_LLM_ENABLED:
+        load_genai()
+
+def __getattr__(name: str):
+    # `agents.manager` keeps working for callers written before the manager became lazy
+    if name == "manager":
+        return get_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,194 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import or_
+from .database import SessionLocal
+from .models import Room, Booking
+
+logger = logging.getLogger(__name__)
+
+# Bit n of a room's occupancy bitmap is the night of EPOCH + n days
+EPOCH = date(2020, 1, 1)
+# Rebuild from the database this often, to pick up bookings made by other workers (0 = never)
+AVAILABILITY_REFRESH_SECONDS = float(os.getenv("AVAILABILITY_REFRESH_SECONDS", "30"))
+MAX_STAY_NIGHTS = 30
+# Booking statuses that take a room off the market (holds only until they expire)
+OCCUPYING_STATUSES = ("Confirmed", "Held")
+
+def _to_date(value) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise ValueError(f"'{value}' is not a valid date.")
+
+def parse_stay(check_in=None, check_out=None, nights: Optional[int] = None) -> Tuple[date, date]:
+    """
+    Normalize a stay to (check_in, check_out) dates; check_out is exclusive.
+    Defaults to one night from today. Raises ValueError for invalid ranges.
+    """
+    start = _to_date(check_in) or date.today()
+    end = _to_date(check_out) or start + timedelta(days=int(nights or 1))
+    if end <= start:
+        raise ValueError("Check-out must be after check-in.")
+    if (end - start).days > MAX_STAY_NIGHTS:
+        raise ValueError(f"Stays are limited to {MAX_STAY_NIGHTS} nights.")
+    if start < EPOCH:
+        raise ValueError("Dates are too far in the past.")
+    return start, end
+
+def night_mask(check_in: date, check_out: date) -> int:
+    """Bitmask with one bit set per night of the stay"""
+    return ((1 << (check_out - check_in).days) - 1) << (check_in - EPOCH).days
+
+class AvailabilityIndex:
+    """
+    Per-night occupancy bitmaps for every room, grouped by room type.
+
+    A stay is free in a room when the room's bitmap AND the stay's night
+    mask is zero, so answering "which types are free from A to B" is one
+    integer AND per room, independent of how many bookings exist.
+    """
+
+    def __init__(self):
+        self.rooms: Dict[str, Dict] = {}
+        self.by_type: Dict[str, List[str]] = {}
+        self.built_at = time.monotonic()
+        # Called as listener(room_type, changed_bits, +1 booked / -1 freed) after occupy/release
+        self.listeners: List[Callable[[str, int, int], None]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_db(cls, db=None) -> "AvailabilityIndex":
+        index = cls()
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            for room in db.query(Room).filter(Room.is_active.is_(True)).order_by(Room.room_number):
+                index.add_room(room.room_number, room.room_type, room.nightly_rate, room.capacity)
+
+            # Only stays that haven't ended matter for availability
+            rows = db.query(Booking.room_number, Booking.check_in, Booking.check_out).filter(
+                Booking.status.in_(OCCUPYING_STATUSES),
+                or_(Booking.status != "Held", Booking.expires_at > datetime.now()),
+                Booking.check_out > date.today()
+            )
+            for room_number, check_in, check_out in rows:
+                index.occupy(room_number, check_in, check_out)
+        finally:
+            if own_session:
+                db.close()
+        return index
+
+    def add_room(self, room_number: str, room_type: str, nightly_rate: float, capacity: int = 2):
+        room_type = room_type.lower()
+        with self._lock:
+            if room_number not in self.rooms:
+                self.by_type.setdefault(room_type, []).append(room_number)
+            self.rooms[room_number] = {
+                "room_type": room_type,
+                "nightly_rate": nightly_rate,
+                "capacity": capacity or 1,
+                "bits": self.rooms.get(room_number, {}).get("bits", 0),
+            }
+
+    def occupy(self, room_number: str, check_in: date, check_out: date):
+        with self._lock:
+            room = self.rooms.get(room_number)
+            if not room:
+                return
+            changed = night_mask(check_in, check_out) & ~room["bits"]
+            room["bits"] |= changed
+        self._notify(room["room_type"], changed, 1)
+
+    def release(self, room_number: str, check_in: date, check_out: date):
+        with self._lock:
+            room = self.rooms.get(room_number)
+            if not room:
+                return
+            changed = night_mask(check_in, check_out) & room["bits"]
+            room["bits"] &= ~changed
+        self._notify(room["room_type"], changed, -1)
+
+    def _notify(self, room_type: str, changed: int, delta: int):
+        if not changed:
+            return
+        for listener in self.listeners:
+            try:
+                listener(room_type, changed, delta)
+            except Exception as e:
+                logger.error(f"Availability listener failed: {e}")
+
+    def is_free(self, room_number: str, check_in: date, check_out: date) -> bool:
+        room = self.rooms.get(room_number)
+        return bool(room) and not room["bits"] & night_mask(check_in, check_out)
+
+    def free_rooms(self, room_type: str, check_in: date, check_out: date, guests: int = 1) -> List[str]:
+        mask = night_mask(check_in, check_out)
+        rooms = self.rooms
+        return [
+            number for number in self.by_type.get(room_type.lower(), [])
+            if not rooms[number]["bits"] & mask and rooms[number]["capacity"] >= guests
+        ]
+
+    def summary(self, check_in: date, check_out: date, guests: int = 1,
+                room_type: Optional[str] = None) -> Dict[str, Dict]:
+        """Free/total rooms and starting rate per room type, cheapest type first"""
+        mask = night_mask(check_in, check_out)
+        result = {}
+        for type_name, numbers in self.by_type.items():
+            if room_type and type_name != room_type:
+                continue
+            rooms = [self.rooms[n] for n in numbers]
+            fitting = [r for r in rooms if r["capacity"] >= guests]
+            free = sum(1 for r in fitting if not r["bits"] & mask)
+            result[type_name] = {
+                "free": free,
+                "total": len(rooms),
+                "nightly_rate": min(r["nightly_rate"] for r in rooms),
+                "capacity": max(r["capacity"] for r in rooms),
+            }
+        return dict(sorted(result.items(), key=lambda item: item[1]["nightly_rate"]))
+
+_index: Optional[AvailabilityIndex] = None
+_index_lock = threading.Lock()
+
+def get_availability_index(refresh: bool = False) -> AvailabilityIndex:
+    """Shared index, built on first use and rebuilt every AVAILABILITY_REFRESH_SECONDS"""
+    global _index
+    index = _index
+    stale = index is not None and AVAILABILITY_REFRESH_SECONDS and \
+        time.monotonic() - index.built_at > AVAILABILITY_REFRESH_SECONDS
+    if index is None or stale or refresh:
+        with _index_lock:
+            if _index is index:
+                start = time.perf_counter()
+                _index = AvailabilityIndex.from_db()
+                logger.info(f"Availability index built: {len(_index.rooms)} rooms in "
+                            f"{(time.perf_counter() - start) * 1000:.1f} ms")
+            index = _index
+    return index
+
+def invalidate_availability():
+    """Force a rebuild on next use (after bulk room or booking changes)"""
+    global _index
+    with _index_lock:
+        _index = None
+
+def match_room_type(text: Optional[str], room_types) -> Optional[str]:
+    """Room type named in free text ("a deluxe room" → "deluxe")"""
+    if not text:
+        return None
+    text = text.lower()
+    for room_type in room_types:
+        if room_type in text:
+            return room_type
+    return None
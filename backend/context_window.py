@@ -0,0 +1,121 @@
+import os
+from typing import Dict, List, Optional
+from .tokens import estimate_tokens
+
+# Max tokens of history (summary + recent turns) replayed to the model each turn
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("CONTEXT_SUMMARY_TOKEN_BUDGET", "200"))
+# Tool outputs larger than this are replaced by a reference outside the latest turn
+TOOL_OUTPUT_REF_TOKENS = 60
+
+SUMMARY_ACK = "Noted."
+
+def _squash(text: str, limit: int) -> str:
+    """Single-line, truncated version of text"""
+    flat = " ".join((text or "").split())
+    return flat if len(flat) <= limit else flat[:limit - 1] + "…"
+
+class ContextWindow:
+    """
+    Token-bounded chat history for one agent.
+
+    History is kept as whole turns (guest message, model reply, tool
+    results and follow-ups) so roles always alternate. Turns that fall
+    outside the budget are folded into a rolling extractive summary, and
+    large tool outputs from earlier turns are replaced with short references.
+    """
+
+    def __init__(self, max_tokens: int = CONTEXT_TOKEN_BUDGET, summary_tokens: int = SUMMARY_TOKEN_BUDGET):
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.turns: List[List[Dict]] = []
+        self.summary: List[str] = []
+
+    def to_dict(self) -> Dict:
+        return {"turns": self.turns, "summary": self.summary}
+
+    def load(self, data: Optional[Dict]):
+        """Restore turns and summary saved with to_dict()"""
+        data = data or {}
+        self.turns = data.get("turns", [])
+        self.summary = data.get("summary", [])
+
+    def start_turn(self, user_message: str):
+        self.turns.append([{"role": "user", "text": user_message, "kind": "message"}])
+
+    def add(self, role: str, text: str, kind: str = "message", tool: Optional[str] = None):
+        if not self.turns:
+            self.start_turn("")
+        self.turns[-1].append({"role": role, "text": text or "(no reply)", "kind": kind, "tool": tool})
+
+    def _entry_text(self, entry: Dict, latest: bool) -> str:
+        if entry["kind"] == "tool_result" and not latest and estimate_tokens(entry["text"]) > TOOL_OUTPUT_REF_TOKENS:
+            return f"[{entry['tool']} output omitted ({estimate_tokens(entry['text'])} tokens): {_squash(entry['text'], 60)}]"
+        return entry["text"]
+
+    def _fold(self, turn: List[Dict]):
+        """Add a one-line digest of an evicted turn to the rolling summary"""
+        parts = []
+        for entry in turn:
+            if entry["kind"] == "tool_result":
+                parts.append(f"{entry['tool']} → {_squash(entry['text'], 60)}")
+            elif entry["role"] == "user" and entry["text"]:
+                parts.append(f"Guest: {_squash(entry['text'], 80)}")
+        replies = [e["text"] for e in turn if e["role"] == "model" and not e["text"].startswith("[called")]
+        if replies:
+            parts.append(f"Agent: {_squash(replies[-1], 80)}")
+        if parts:
+            self.summary.append(" | ".join(parts))
+
+        # Rolling: drop the oldest digests once the summary is over budget
+        while len(self.summary) > 1 and estimate_tokens("\n".join(self.summary)) > self.summary_tokens:
+            self.summary.pop(0)
+
+    def _summary_text(self, context: Optional[Dict]) -> str:
+        lines = []
+        if context:
+            known = ", ".join(f"{k}={v}" for k, v in context.items() if v not in (None, ""))
+            if known:
+                lines.append(f"Known details: {known}")
+        if self.summary:
+            lines.append("Earlier in this conversation:")
+            lines.extend(f"- {line}" for line in self.summary)
+        return "\n".join(lines)
+
+    def render(self, context: Optional[Dict] = None) -> List[Dict]:
+        """History for start_chat(): summary pair followed by the recent turns that fit the budget"""
+        summary_text = self._summary_text(context)
+        budget = self.max_tokens - estimate_tokens(summary_text)
+
+        # Newest turns first; the latest complete turn is always kept
+        kept = []
+        used = 0
+        for index in range(len(self.turns) - 1, -1, -1):
+            latest = index == len(self.turns) - 1
+            rendered = [(e["role"], self._entry_text(e, latest)) for e in self.turns[index]]
+            cost = sum(estimate_tokens(text) for _, text in rendered)
+            if kept and used + cost > budget:
+                break
+            kept.insert(0, rendered)
+            used += cost
+
+        # Fold evicted turns into the summary and forget them
+        evicted = len(self.turns) - len(kept)
+        if evicted:
+            for turn in self.turns[:evicted]:
+                self._fold(turn)
+            self.turns = self.turns[evicted:]
+            summary_text = self._summary_text(context)
+
+        history = []
+        if summary_text:
+            history.append({"role": "user", "parts": [summary_text]})
+            history.append({"role": "model", "parts": [SUMMARY_ACK]})
+        for turn in kept:
+            for role, text in turn:
+                history.append({"role": role, "parts": [text]})
+        return history
+
+    def token_count(self, context: Optional[Dict] = None) -> int:
+        """Estimated tokens of the history render() would produce"""
+        return sum(estimate_tokens(part) for entry in self.render(context) for part in entry["parts"])
@@ -1,6 +1,10 @@
-from sqlalchemy import create_engine
+import logging
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .tracing import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./resort.db"
 
@@ -8,13 +12,57 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
     connect_args={"check_same_thread": False}
 )
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def init_db():
+    """Create tables, plus columns and indexes missing from existing tables"""
+    from . import models  # noqa: F401 - registers models on Base
+    
+    Base.metadata.create_all(bind=engine)
+    
+    # Add nullable columns introduced after the table was first created
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    col_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+    
+    if "uq_menu_items_name" not in {index["name"] for index in inspector.get_indexes("menu_items")}:
+        dedupe_menu_names()
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    from .menu_search import ensure_menu_fts
+    ensure_menu_fts()
+
+def dedupe_menu_names():
+    """
+    Databases from before uq_menu_items_name can hold the same menu name
+    twice, which would stop the unique index from being created. Keep the
+    newest row of each name (orders store item names, not ids).
+    """
+    with engine.begin() as conn:
+        duplicates = [name for (name,) in conn.execute(
+            text("SELECT name FROM menu_items GROUP BY name HAVING COUNT(*) > 1")
+        )]
+        if not duplicates:
+            return
+        removed = conn.execute(text(
+            "DELETE FROM menu_items WHERE id NOT IN (SELECT MAX(id) FROM menu_items GROUP BY name)"
+        )).rowcount
+    logger.warning(f"Removed {removed} duplicate menu rows, keeping the newest of each: {', '.join(duplicates)}")
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
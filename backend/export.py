@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import logging
+from sqlalchemy import select
+from .database import SessionLocal
+from .models import Order, ServiceRequest
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor per batch (and per Parquet row group)
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MODELS = {
+    "orders": Order,
+    "requests": ServiceRequest,
+}
+
+EXPORT_COLUMNS = {
+    "orders": ["id", "room_number", "items", "total_amount", "status", "created_at"],
+    "requests": ["id", "room_number", "request_type", "details", "status", "created_at"],
+}
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def parquet_available() -> bool:
+    """Check whether pyarrow is installed"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _row_to_dict(kind: str, row) -> dict:
+    """Convert a result row to a plain dict"""
+    record = dict(row._mapping)
+    if record.get("created_at"):
+        record["created_at"] = record["created_at"].isoformat()
+    if kind == "orders":
+        record["items"] = record.get("items") or []
+        record["total_amount"] = float(record["total_amount"]) if record.get("total_amount") else 0.0
+    return record
+
+def _format_items(items) -> str:
+    """Format order items as '2x Masala Dosa, 1x Cold Coffee'"""
+    if not isinstance(items, list):
+        return str(items or "")
+    return ", ".join(f"{int(i.get('quantity', 1))}x {i.get('name', 'Unknown')}" for i in items)
+
+def iter_export_rows(kind: str, filters):
+    """
+    Yield rows for an export in batches of EXPORT_BATCH_SIZE.
+
+    Uses a streaming cursor so only one batch is held in memory at a time.
+    `filters` is a callable that applies WHERE clauses to the select.
+    """
+    model = EXPORT_MODELS[kind]
+    stmt = select(*[getattr(model, col) for col in EXPORT_COLUMNS[kind]])
+    stmt = filters(stmt, model).order_by(model.created_at, model.id)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            stmt,
+            execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE}
+        )
+        for batch in result.partitions():
+            yield [_row_to_dict(kind, row) for row in batch]
+    finally:
+        db.close()
+
+def iter_csv(kind: str, batches):
+    """Stream batches as CSV text"""
+    columns = EXPORT_COLUMNS[kind]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+
+    for batch in batches:
+        for record in batch:
+            if kind == "orders":
+                record["items"] = _format_items(record["items"])
+            writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_ndjson(kind: str, batches):
+    """Stream batches as newline-delimited JSON"""
+    for batch in batches:
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+
+def iter_parquet(kind: str, batches):
+    """Stream batches as a Parquet file, one row group per batch"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    fields = []
+    for col in EXPORT_COLUMNS[kind]:
+        if col == "id":
+            fields.append(pa.field(col, pa.int64()))
+        elif col == "total_amount":
+            fields.append(pa.field(col, pa.float64()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    schema = pa.schema(fields)
+
+    sink = io.BytesIO()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            if kind == "orders":
+                for record in batch:
+                    record["items"] = json.dumps(record["items"], ensure_ascii=False)
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+            # Hand each finished row group to the client and reset the buffer
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate(0)
+    finally:
+        writer.close()
+
+    yield sink.getvalue()
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "parquet": iter_parquet,
+}
+
+def stream_export(kind: str, fmt: str, filters):
+    """Return a generator producing the export body"""
+    return EXPORT_WRITERS[fmt](kind, iter_export_rows(kind, filters))
@@ -0,0 +1,71 @@
+"""
+Offline stand-in for google.generativeai models, for load tests and
+benchmarks. Enable with FAKE_LLM=1; FAKE_LLM_LATENCY_MS simulates API latency.
+
+Responses are deterministic: menu questions trigger get_menu_items,
+everything else gets a short text reply. Usage metadata is estimated
+from the replayed history so token accounting behaves like the real API.
+"""
+
+import os
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from .tokens import estimate_tokens
+
+FAKE_LLM_ENABLED = os.getenv("FAKE_LLM", "").lower() in ("1", "true", "yes")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+
+def _history_text(entry) -> str:
+    parts = entry["parts"] if isinstance(entry, dict) else entry.parts
+    return " ".join(str(part) for part in parts)
+
+class FakeChatSession:
+    def __init__(self, model: "FakeGenerativeModel", history: Optional[List] = None):
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(self, message: str):
+        if self.model.latency_ms:
+            time.sleep(self.model.latency_ms / 1000)
+
+        prompt_tokens = (
+            estimate_tokens(self.model.system_instruction)
+            + sum(estimate_tokens(_history_text(entry)) for entry in self.history)
+            + estimate_tokens(message)
+        )
+
+        text = message.lower()
+        tool_names = self.model.tool_names
+        if "menu" in text and "get_menu_items" in tool_names and not self.history_ends_with_call():
+            part = SimpleNamespace(function_call=SimpleNamespace(name="get_menu_items", args={}))
+            reply = "[called get_menu_items]"
+        else:
+            reply = f"Happy to help with that. ({len(self.history) // 2 + 1})"
+            part = SimpleNamespace(text=reply)
+
+        self.history.append({"role": "user", "parts": [message]})
+        self.history.append({"role": "model", "parts": [reply]})
+
+        output_tokens = estimate_tokens(reply)
+        usage = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+        return SimpleNamespace(parts=[part], text=reply, usage_metadata=usage)
+
+    def history_ends_with_call(self) -> bool:
+        return bool(self.history) and _history_text(self.history[-1]).startswith("[called")
+
+class FakeGenerativeModel:
+    def __init__(self, model_name: str = "fake", tools: Optional[List] = None,
+                 system_instruction: str = "", latency_ms: float = FAKE_LLM_LATENCY_MS):
+        self.model_name = model_name
+        self.system_instruction = system_instruction or ""
+        self.tool_names = {tool.get("name", "") if isinstance(tool, dict) else getattr(tool, "name", "")
+                           for tool in (tools or [])}
+        self.latency_ms = latency_ms
+
+    def start_chat(self, history: Optional[List[Dict]] = None, **kwargs) -> FakeChatSession:
+        return FakeChatSession(self, history)
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+# Identical submissions within this many seconds are treated as duplicates
+IDEMPOTENCY_WINDOW_SECONDS = 120
+DEDUPE_CACHE_SIZE = 10000
+
+class DedupeCache:
+    """Bounded, thread-safe LRU map of idempotency key -> record id with TTL"""
+
+    def __init__(self, maxsize: int = DEDUPE_CACHE_SIZE, ttl: float = IDEMPOTENCY_WINDOW_SECONDS * 2):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            record_id, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return record_id
+
+    def put(self, key: str, record_id: int):
+        with self._lock:
+            self._entries[key] = (record_id, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+order_cache = DedupeCache()
+request_cache = DedupeCache()
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join((text or "").lower().split())
+
+def normalize_items(items_dict: Dict) -> List:
+    """Order-independent representation of an items dict"""
+    normalized = {}
+    for name, quantity in (items_dict or {}).items():
+        key = normalize_text(str(name))
+        try:
+            qty = int(float(quantity))
+        except (TypeError, ValueError):
+            qty = 1
+        normalized[key] = normalized.get(key, 0) + qty
+    return sorted(normalized.items())
+
+def derive_keys(scope: str, session_id: Optional[str], room_number: str, content) -> List[str]:
+    """
+    Derive idempotency keys for the current and previous time window.
+
+    The first key is the one to store; both should be checked so a retry
+    that straddles a window boundary is still caught.
+    """
+    bucket = int(time.time() // IDEMPOTENCY_WINDOW_SECONDS)
+    keys = []
+    for b in (bucket, bucket - 1):
+        payload = json.dumps([scope, session_id or "", room_number, content, b], sort_keys=True)
+        keys.append(f"{scope}:{hashlib.sha256(payload.encode()).hexdigest()[:32]}")
+    return keys
+
+def order_keys(session_id: Optional[str], room_number: str, items_dict: Dict,
+               idempotency_key: Optional[str] = None) -> List[str]:
+    """Keys identifying a restaurant order submission"""
+    if idempotency_key:
+        return [f"order:{idempotency_key}"]
+    return derive_keys("order", session_id, room_number, normalize_items(items_dict))
+
+def request_keys(session_id: Optional[str], room_number: str, request_type: str, details: str = "",
+                 idempotency_key: Optional[str] = None) -> List[str]:
+    """Keys identifying a service request submission"""
+    if idempotency_key:
+        return [f"request:{idempotency_key}"]
+    content = [normalize_text(request_type), normalize_text(details)]
+    return derive_keys("request", session_id, room_number, content)
+
+def lookup(cache: DedupeCache, keys: List[str]) -> Optional[int]:
+    """Return the record id stored under any of the keys"""
+    for key in keys:
+        record_id = cache.get(key)
+        if record_id is not None:
+            return record_id
+    return None
@@ -0,0 +1,175 @@
+"""
+Resort policies and facilities, answered locally with BM25.
+
+Passages come from a Markdown file (one `## Title` section per passage,
+optional `Keywords:` line) or a YAML list of {title, text, keywords}.
+All term statistics are computed at load time: each term's posting list
+stores its final BM25 weight per passage, so a query only sums the
+postings of its own terms.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from heapq import nlargest
+from operator import itemgetter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RESORT_INFO_PATH = os.getenv(
+    "RESORT_INFO_PATH", os.path.join(os.path.dirname(__file__), "knowledge", "resort_info.md")
+)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Title and keyword terms count as this many occurrences in the passage
+TITLE_WEIGHT = 3
+KEYWORD_WEIGHT = 2
+# Direct answers need the top passage to cover this share of the query's (idf-weighted) terms
+# and to beat the runner-up by this factor
+DIRECT_ANSWER_MIN_COVERAGE = float(os.getenv("KB_DIRECT_ANSWER_MIN_COVERAGE", "0.7"))
+DIRECT_ANSWER_MIN_MARGIN = float(os.getenv("KB_DIRECT_ANSWER_MIN_MARGIN", "1.3"))
+# Requests (bookings, orders, specific times) need the agent and its tools, not a canned answer
+ACTION_PATTERN = re.compile(r"\b(book|booking|reserve|hold|confirm|cancel my|available|availability|order)\b|\d")
+
+# Question words and filler verbs ("can I bring...", "do you allow...") carry no topic
+STOPWORDS = {
+    "a", "about", "allow", "allowed", "also", "an", "and", "any", "are", "at", "be", "bring", "can",
+    "could", "do", "does", "for", "from", "get", "have", "hi", "how", "i", "if", "in", "is", "it",
+    "know", "like", "me", "my", "need", "of", "offer", "on", "or", "our", "please", "possible",
+    "provide", "should", "tell", "the", "there", "to", "want", "we", "what", "whats", "when",
+    "where", "which", "will", "with", "would", "you", "your",
+}
+
+def _stem(word: str) -> str:
+    """Minimal suffix folding so 'dogs' matches 'dog' and 'charging' matches 'charge'"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(w) for w in re.findall(r"[a-z0-9]+", (text or "").lower()) if w not in STOPWORDS]
+
+def parse_markdown(content: str) -> List[Dict]:
+    passages = []
+    current = None
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("## "):
+            current = {"title": stripped[3:].strip(), "text": [], "keywords": ""}
+            passages.append(current)
+        elif current is None or not stripped:
+            continue
+        elif stripped.lower().startswith("keywords:"):
+            current["keywords"] = stripped.split(":", 1)[1].strip()
+        else:
+            current["text"].append(stripped)
+    for passage in passages:
+        passage["text"] = " ".join(passage["text"])
+    return [p for p in passages if p["text"]]
+
+def load_passages(path: str = RESORT_INFO_PATH) -> List[Dict]:
+    """Passages from a .md or .yaml/.yml knowledge file"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+        data = yaml.safe_load(content) or []
+        if isinstance(data, dict):
+            data = data.get("passages", [])
+        return [
+            {"title": str(p.get("title", "")), "text": str(p.get("text", "")).strip(),
+             "keywords": ", ".join(p["keywords"]) if isinstance(p.get("keywords"), list) else str(p.get("keywords", ""))}
+            for p in data if p.get("text")
+        ]
+    return parse_markdown(content)
+
+class KnowledgeBase:
+    """BM25 index over passages with per-term weights precomputed"""
+
+    def __init__(self, passages: List[Dict], k1: float = BM25_K1, b: float = BM25_B):
+        self.passages = passages
+        term_counts = []
+        for passage in passages:
+            counts = Counter(tokenize(passage["text"]))
+            for term in tokenize(passage["title"]):
+                counts[term] += TITLE_WEIGHT
+            for term in tokenize(passage.get("keywords", "")):
+                counts[term] += KEYWORD_WEIGHT
+            term_counts.append(counts)
+
+        total = len(passages)
+        lengths = [sum(counts.values()) for counts in term_counts]
+        avg_length = sum(lengths) / total if total else 1.0
+        document_frequency = Counter(term for counts in term_counts for term in counts)
+
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()
+        }
+        # Weight of a word that appears in no passage, when judging how much of a query was matched
+        self.unknown_idf = sum(self.idf.values()) / len(self.idf) if self.idf else 1.0
+        self.postings: Dict[str, List] = defaultdict(list)
+        for doc_id, counts in enumerate(term_counts):
+            norm = k1 * (1 - b + b * lengths[doc_id] / avg_length)
+            for term, tf in counts.items():
+                self.postings[term].append((doc_id, self.idf[term] * tf * (k1 + 1) / (tf + norm)))
+        self.doc_terms = [set(counts) for counts in term_counts]
+
+    def search(self, query: str, limit: int = 3) -> List[Dict]:
+        """Best passages for a query, each with its BM25 score and query coverage"""
+        terms = set(tokenize(query))
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            for doc_id, weight in self.postings.get(term, ()):
+                scores[doc_id] += weight
+
+        query_weight = sum(self.idf.get(term, self.unknown_idf) for term in terms) or 1.0
+        results = []
+        for doc_id, score in nlargest(limit, scores.items(), key=itemgetter(1)):
+            matched = sum(self.idf[term] for term in terms & self.doc_terms[doc_id])
+            results.append({**self.passages[doc_id], "score": round(score, 3), "coverage": round(matched / query_weight, 3)})
+        return results
+
+    def direct_answer(self, query: str) -> Optional[Dict]:
+        """The top passage when it clearly answers the question on its own, else None"""
+        if ACTION_PATTERN.search(query.lower()):
+            return None
+        results = self.search(query, limit=2)
+        if not results or results[0]["coverage"] < DIRECT_ANSWER_MIN_COVERAGE:
+            return None
+        if len(results) > 1 and results[0]["score"] < DIRECT_ANSWER_MIN_MARGIN * results[1]["score"]:
+            return None
+        return results[0]
+
+_knowledge_base: Optional[KnowledgeBase] = None
+_lock = threading.Lock()
+
+def get_knowledge_base() -> KnowledgeBase:
+    """Shared index over RESORT_INFO_PATH, built on first use"""
+    global _knowledge_base
+    if _knowledge_base is None:
+        with _lock:
+            if _knowledge_base is None:
+                try:
+                    passages = load_passages(RESORT_INFO_PATH)
+                except Exception as e:
+                    logger.error(f"Could not load resort info from {RESORT_INFO_PATH}: {e}")
+                    passages = []
+                _knowledge_base = KnowledgeBase(passages)
+                logger.info(f"Resort knowledge base loaded: {len(passages)} passages")
+    return _knowledge_base
+
+def reload_knowledge_base() -> KnowledgeBase:
+    global _knowledge_base
+    with _lock:
+        _knowledge_base = None
+    return get_knowledge_base()
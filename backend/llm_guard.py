@@ -0,0 +1,179 @@
+"""
+Deadlines, a circuit breaker and optional hedging around Gemini calls.
+
+Every send runs on a bounded thread pool and is abandoned after
+LLM_TIMEOUT_SECONDS, so a slow API cannot tie up request threads.
+LLM_BREAKER_FAILURES consecutive failures open the circuit: calls fail
+immediately with LLMUnavailable (agents answer from local paths) until
+LLM_BREAKER_RESET_SECONDS pass, then a single probe call is let through
+(half-open) and its result closes or re-opens the circuit.
+
+With LLM_HEDGE_AFTER_SECONDS set, a call still running after that long
+is raced against a second one on a copy of the chat session; whichever
+answers first wins.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "15"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+# Start a second, racing call when the first is slower than this (0 = never hedge)
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+# Calls in flight at once, including abandoned ones still waiting on the API
+LLM_MAX_CONCURRENT_CALLS = int(os.getenv("LLM_MAX_CONCURRENT_CALLS", "32"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class LLMUnavailable(Exception):
+    """The model could not answer in time; reason is circuit_open, timeout or error"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"LLM unavailable: {reason}")
+        self.reason = reason
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_seconds: float = LLM_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (at most one probe while half-open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("LLM circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                    logger.warning(f"LLM circuit open after {self.failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.probe_in_flight = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 1) if self.state == OPEN else 0.0,
+            }
+
+class LLMGuard:
+    def __init__(self, timeout: float = LLM_TIMEOUT_SECONDS, hedge_after: float = LLM_HEDGE_AFTER_SECONDS,
+                 max_concurrent: int = LLM_MAX_CONCURRENT_CALLS, breaker: CircuitBreaker = None):
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="llm-call")
+        self._lock = threading.Lock()
+        self.counts = {"calls": 0, "succeeded": 0, "timeouts": 0, "errors": 0, "rejected": 0,
+                       "hedged": 0, "hedge_wins": 0}
+        self.fallbacks: Dict[str, int] = {}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def record_fallback(self, path: str):
+        """Count a turn answered locally because the model was unavailable"""
+        with self._lock:
+            self.fallbacks[path] = self.fallbacks.get(path, 0) + 1
+
+    def send(self, chat_session, message: str) -> Tuple[object, object]:
+        """
+        Send a message within the deadline; returns (response, chat session
+        that produced it), which is a copy when a hedged call won.
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailable("circuit_open")
+        self._count("calls")
+
+        deadline = time.monotonic() + self.timeout
+        history = list(getattr(chat_session, "history", []) or [])
+        futures = {self.executor.submit(chat_session.send_message, message): chat_session}
+
+        if self.hedge_after and self.hedge_after < self.timeout:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done:
+                try:
+                    hedge = chat_session.model.start_chat(history=history)
+                    futures[self.executor.submit(hedge.send_message, message)] = hedge
+                    self._count("hedged")
+                except Exception as e:
+                    logger.warning(f"Could not start hedged LLM call: {e}")
+
+        last_error = None
+        while futures:
+            done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                session = futures.pop(future)
+                if future.exception() is None:
+                    self.breaker.record_success()
+                    self._count("succeeded")
+                    if session is not chat_session:
+                        self._count("hedge_wins")
+                    return future.result(), session
+                last_error = future.exception()
+
+        self.breaker.record_failure()
+        if futures:
+            self._count("timeouts")
+            logger.warning(f"LLM call timed out after {self.timeout:.0f}s")
+            raise LLMUnavailable("timeout")
+        self._count("errors")
+        logger.error(f"LLM call failed: {last_error}")
+        raise LLMUnavailable("error") from last_error
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+            fallbacks = dict(self.fallbacks)
+        return {
+            "circuit": self.breaker.snapshot(),
+            "calls": counts,
+            "fallbacks": fallbacks,
+            "settings": {
+                "timeout_seconds": self.timeout,
+                "hedge_after_seconds": self.hedge_after,
+                "breaker_failures": self.breaker.failure_threshold,
+                "breaker_reset_seconds": self.breaker.reset_seconds,
+            },
+        }
+
+llm_guard = LLMGuard()
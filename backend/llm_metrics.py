@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from .tokens import estimate_tokens
+from .llm_guard import llm_guard
+from .tracing import span
+
+# USD per 1M tokens (gemini-2.0-flash list price); override per deployment
+COST_PER_1M_INPUT = float(os.getenv("LLM_COST_PER_1M_INPUT", "0.10"))
+COST_PER_1M_OUTPUT = float(os.getenv("LLM_COST_PER_1M_OUTPUT", "0.40"))
+
+MAX_TRACKED_SESSIONS = 10000
+RECENT_CALLS_PER_SESSION = 20
+
+def _empty_totals() -> Dict:
+    return {
+        "calls": 0,
+        "turns": 0,
+        "prompt_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "latency_ms": 0.0,
+        "cost_usd": 0.0,
+        "tool_calls": 0,
+        "tool_output_chars": 0,
+        "tool_output_tokens": 0,
+    }
+
+def _add(totals: Dict, call: Dict):
+    totals["calls"] += 1
+    totals["turns"] += 1 if call["kind"] == "message" else 0
+    totals["prompt_tokens"] += call["prompt_tokens"]
+    totals["output_tokens"] += call["output_tokens"]
+    totals["total_tokens"] += call["total_tokens"]
+    totals["latency_ms"] += call["latency_ms"]
+    totals["cost_usd"] += call["cost_usd"]
+    totals["tool_calls"] += len(call["tools"])
+    totals["tool_output_chars"] += call["tool_output_chars"]
+    totals["tool_output_tokens"] += call["tool_output_tokens"]
+
+def _with_averages(totals: Dict) -> Dict:
+    result = dict(totals)
+    result["latency_ms"] = round(totals["latency_ms"], 1)
+    result["cost_usd"] = round(totals["cost_usd"], 6)
+    result["avg_latency_ms"] = round(totals["latency_ms"] / totals["calls"], 1) if totals["calls"] else 0.0
+    result["avg_tokens_per_turn"] = round(totals["total_tokens"] / totals["turns"], 1) if totals["turns"] else 0.0
+    return result
+
+def usage_from_response(response) -> Dict:
+    """Token counts from a Gemini response's usage_metadata (zeros if missing)"""
+    usage = getattr(response, "usage_metadata", None)
+    prompt = int(getattr(usage, "prompt_token_count", 0) or 0)
+    output = int(getattr(usage, "candidates_token_count", 0) or 0)
+    total = int(getattr(usage, "total_token_count", 0) or 0) or prompt + output
+    return {"prompt_tokens": prompt, "output_tokens": output, "total_tokens": total}
+
+class LLMMetrics:
+    """Thread-safe aggregation of LLM call usage per session, agent and tool"""
+
+    def __init__(self, max_sessions: int = MAX_TRACKED_SESSIONS):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._totals = _empty_totals()
+        self._by_agent: Dict[str, Dict] = {}
+        self._by_tool: Dict[str, Dict] = {}
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def record_call(self, session_id: str, agent_type: str, kind: str, response, latency_ms: float,
+                    tools: Optional[List[str]] = None, tool_output: str = "") -> Dict:
+        """
+        Record one Gemini call.
+
+        kind is "message" for the guest's turn or "tool_result" for a call
+        carrying tool output back to the model; `tools` and `tool_output`
+        attribute that input to the tools that produced it.
+        """
+        usage = usage_from_response(response)
+        call = {
+            "timestamp": datetime.now().isoformat(),
+            "session_id": session_id,
+            "agent_type": agent_type,
+            "kind": kind,
+            "latency_ms": round(latency_ms, 1),
+            "tools": tools or [],
+            "tool_output_chars": len(tool_output or ""),
+            "tool_output_tokens": estimate_tokens(tool_output or ""),
+            "cost_usd": (usage["prompt_tokens"] * COST_PER_1M_INPUT
+                         + usage["output_tokens"] * COST_PER_1M_OUTPUT) / 1_000_000,
+            **usage,
+        }
+
+        with self._lock:
+            _add(self._totals, call)
+            _add(self._by_agent.setdefault(agent_type, _empty_totals()), call)
+
+            for tool in call["tools"]:
+                stats = self._by_tool.setdefault(tool, {"calls": 0, "output_chars": 0, "output_tokens": 0})
+                stats["calls"] += 1
+                stats["output_chars"] += call["tool_output_chars"] // len(call["tools"])
+                stats["output_tokens"] += call["tool_output_tokens"] // len(call["tools"])
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = {"totals": _empty_totals(), "by_agent": {}, "recent": deque(maxlen=RECENT_CALLS_PER_SESSION)}
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session_id)
+            _add(session["totals"], call)
+            _add(session["by_agent"].setdefault(agent_type, _empty_totals()), call)
+            session["recent"].append(call)
+
+        return call
+
+    def session_summary(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            return {
+                "session_id": session_id,
+                "totals": _with_averages(session["totals"]),
+                "by_agent": {agent: _with_averages(t) for agent, t in session["by_agent"].items()},
+                "recent_calls": list(session["recent"]),
+            }
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "totals": _with_averages(self._totals),
+                "by_agent": {agent: _with_averages(t) for agent, t in self._by_agent.items()},
+                "by_tool": {tool: dict(t) for tool, t in self._by_tool.items()},
+                "sessions_tracked": len(self._sessions),
+                "pricing_per_1m_tokens": {"input": COST_PER_1M_INPUT, "output": COST_PER_1M_OUTPUT},
+            }
+
+llm_metrics = LLMMetrics()
+
+class PathMetrics:
+    """How guest turns were answered: by an agent (LLM) or a local fast path"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths: Dict[str, Dict] = {}
+        self._fallbacks: Dict[str, int] = {}
+
+    def record(self, path: str, latency_ms: float, fallback_reason: Optional[str] = None):
+        """Record one turn; fallback_reason says why a fast path declined it"""
+        with self._lock:
+            stats = self._paths.setdefault(path, {"turns": 0, "latency_ms": 0.0})
+            stats["turns"] += 1
+            stats["latency_ms"] += latency_ms
+            if fallback_reason:
+                self._fallbacks[fallback_reason] = self._fallbacks.get(fallback_reason, 0) + 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            total = sum(stats["turns"] for stats in self._paths.values())
+            return {
+                "turns": total,
+                "paths": {
+                    path: {
+                        "turns": stats["turns"],
+                        "share": round(stats["turns"] / total, 3),
+                        "avg_latency_ms": round(stats["latency_ms"] / stats["turns"], 2),
+                    }
+                    for path, stats in self._paths.items()
+                },
+                "order_fast_path_fallbacks": dict(self._fallbacks),
+            }
+
+path_metrics = PathMetrics()
+
+def timed_send(chat_session, message: str, session_id: str, agent_type: str, kind: str = "message",
+               tools: Optional[List[str]] = None, tool_output: str = ""):
+    """
+    Send a chat message to Gemini under the LLM guard and record its usage
+    and wall time. Returns (response, chat session to continue with);
+    raises LLMUnavailable on timeout, error or an open circuit.
+    """
+    start = time.perf_counter()
+    with span(f"llm.{kind}", agent=agent_type):
+        response, chat_session = llm_guard.send(chat_session, message)
+    latency_ms = (time.perf_counter() - start) * 1000
+    llm_metrics.record_call(session_id, agent_type, kind, response, latency_ms, tools, tool_output)
+    return response, chat_session
@@ -1,14 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime
+import hashlib
 import logging
-from .database import get_db
-from .models import Order, ServiceRequest, MenuItem
-from .agents import manager
+import threading
+from .database import get_db, init_db
+from .write_queue import WRITE_QUEUE_ENABLED, start_writer, stop_writer
+from .models import Order, ServiceRequest, MenuItem, Booking
+from .export import EXPORT_MODELS, EXPORT_MEDIA_TYPES, parquet_available, stream_export
+from .agents import get_manager, tool_calls, warm_up
+from .llm_metrics import llm_metrics, path_metrics
+from .llm_guard import llm_guard
+from .tracing import TracingMiddleware, render_metrics, span, stop_exporter
+from .admin import ADMIN_TOKEN, router as admin_router
+from .profiler import PROFILING_ENABLED, maybe_profile, router as profiler_router
+from .availability import get_availability_index, parse_stay
+from . import reservations
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,7 +35,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# Request ids, root spans and HTTP latency histograms (outermost, so it times everything)
+app.add_middleware(TracingMiddleware)
+
+# Front desk booking actions (refused until ADMIN_TOKEN is set)
+app.include_router(admin_router)
+
+# Admin-only live profiling, mounted only when opted in
+if PROFILING_ENABLED:
+    if not ADMIN_TOKEN:
+        logger.warning("PROFILING_ENABLED is set but ADMIN_TOKEN is not; profiling endpoints will refuse all requests")
+    app.include_router(profiler_router)
 
 # --- Schemas ---
 class ChatRequest(BaseModel):
@@ -40,17 +64,52 @@ class OrderUpdate(BaseModel):
 class ServiceRequestUpdate(BaseModel):
     status: str
 
+# --- Helpers ---
+def apply_filters(query, model, since=None, until=None, statuses=None, room_numbers=None):
+    """Apply time range, status and room filters to a query or select"""
+    if since:
+        query = query.filter(model.created_at >= since)
+    if until:
+        query = query.filter(model.created_at < until)
+    if statuses:
+        query = query.filter(model.status.in_(statuses))
+    if room_numbers:
+        query = query.filter(model.room_number.in_(room_numbers))
+    return query
+
+def data_etag(request: Request, db: Session, model, *filters) -> str:
+    """
+    Validator for a filtered list: row count, newest id and last update
+    (updated_at changes on every write), plus the query string. Costs one
+    aggregate query instead of loading the rows.
+    """
+    count, max_id, last_update = apply_filters(
+        db.query(func.count(model.id), func.max(model.id), func.max(model.updated_at)), model, *filters
+    ).one()
+    state = f"{request.url.query}|{count}|{max_id}|{last_update}".encode()
+    return f'"{hashlib.blake2b(state, digest_size=16).hexdigest()}"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 without a body when the client already holds this version"""
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
 # --- Endpoints ---
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+def chat_endpoint(request: ChatRequest):
     """
     Main chat endpoint - ALWAYS use agent system
+    
+    Sync so the blocking LLM calls run in the threadpool instead of
+    stalling the event loop for every other request.
     """
     try:
         logger.info(f"Chat request for session: {request.session_id}")
         
         # ALWAYS use agent manager - no direct handling
-        response_text = manager.chat(request.history, request.session_id)
+        with span("chat"), maybe_profile():
+            response_text = get_manager().chat(request.history, request.session_id)
         
         # Simple agent type detection for response
         last_user_message = ""
@@ -74,19 +133,22 @@ async def chat_endpoint(request: ChatRequest):
 
 @app.get("/orders")
 def get_orders(
+    request: Request,
     db: Session = Depends(get_db),
-    status: Optional[str] = None,
-    room_number: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    room_number: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     limit: Optional[int] = 100
 ):
     """Get orders with filtering"""
     try:
-        query = db.query(Order)
+        etag = data_etag(request, db, Order, since, until, status, room_number)
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
         
-        if status:
-            query = query.filter(Order.status == status)
-        if room_number:
-            query = query.filter(Order.room_number == room_number)
+        query = apply_filters(db.query(Order), Order, since, until, status, room_number)
         
         query = query.order_by(Order.created_at.desc())
         
@@ -108,7 +170,8 @@ def get_orders(
             }
             result.append(order_dict)
         
-        return result
+        # Dashboards revalidate with If-None-Match; unchanged data is answered above without loading rows
+        return JSONResponse(result, headers={"ETag": etag, "Cache-Control": "no-cache"})
         
     except Exception as e:
         logger.error(f"Error fetching orders: {e}")
@@ -149,19 +212,22 @@ def update_order(
 
 @app.get("/requests")
 def get_requests(
+    request: Request,
     db: Session = Depends(get_db),
-    status: Optional[str] = None,
-    room_number: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    room_number: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
     limit: Optional[int] = 100
 ):
     """Get service requests"""
     try:
-        query = db.query(ServiceRequest)
+        etag = data_etag(request, db, ServiceRequest, since, until, status, room_number)
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
         
-        if status:
-            query = query.filter(ServiceRequest.status == status)
-        if room_number:
-            query = query.filter(ServiceRequest.room_number == room_number)
+        query = apply_filters(db.query(ServiceRequest), ServiceRequest, since, until, status, room_number)
         
         query = query.order_by(ServiceRequest.created_at.desc())
         
@@ -183,7 +249,7 @@ def get_requests(
             }
             result.append(req_dict)
         
-        return result
+        return JSONResponse(result, headers={"ETag": etag, "Cache-Control": "no-cache"})
         
     except Exception as e:
         logger.error(f"Error fetching requests: {e}")
@@ -222,6 +288,142 @@ def update_request(
         logger.error(f"Error updating request {request_id}: {e}")
         raise HTTPException(status_code=500, detail="Error updating request")
 
+# --- Export ---
+@app.get("/export/{kind}")
+def export_data(
+    kind: str,
+    format: str = "csv",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[List[str]] = Query(None),
+    room_number: Optional[List[str]] = Query(None)
+):
+    """Stream orders or service requests as CSV, NDJSON or Parquet"""
+    if kind not in EXPORT_MODELS:
+        raise HTTPException(status_code=404, detail="Unknown export. Use 'orders' or 'requests'")
+    
+    fmt = format.lower()
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Must be one of: {', '.join(EXPORT_MEDIA_TYPES)}"
+        )
+    if fmt == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow")
+    
+    def filters(stmt, model):
+        return apply_filters(stmt, model, since, until, status, room_number)
+    
+    filename = f"eco_{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    logger.info(f"Exporting {kind} as {fmt}")
+    
+    return StreamingResponse(
+        stream_export(kind, fmt, filters),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/availability")
+def room_availability(
+    check_in: Optional[date] = None,
+    check_out: Optional[date] = None,
+    guests: int = 1,
+    room_type: Optional[str] = None
+):
+    """Free rooms per room type for a stay (check_out exclusive, defaults to tonight)"""
+    try:
+        start, end = parse_stay(check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    summary = get_availability_index().summary(start, end, guests, room_type.lower() if room_type else None)
+    from .pricing import get_price_table  # numpy-backed; kept off the import path
+    prices = get_price_table()
+    for name, data in summary.items():
+        data["quote"] = prices.quote(name, start, end)
+    return {
+        "check_in": start.isoformat(),
+        "check_out": end.isoformat(),
+        "guests": guests,
+        "room_types": summary
+    }
+
+class HoldCreate(BaseModel):
+    room_type: str
+    check_in: date
+    check_out: date
+    guests: int = 1
+    guest_name: Optional[str] = None
+    session_id: str
+
+class HoldConfirm(BaseModel):
+    session_id: str
+    guest_name: Optional[str] = None
+
+@app.post("/bookings/hold")
+def create_booking_hold(hold: HoldCreate):
+    """Hold a room for HOLD_MINUTES; confirm it with POST /bookings/{id}/confirm"""
+    try:
+        start, end = parse_stay(hold.check_in, hold.check_out)
+        return reservations.create_hold(hold.room_type.lower(), start, end, hold.guests,
+                                        hold.guest_name, hold.session_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except reservations.BookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.post("/bookings/{booking_id}/confirm")
+def confirm_booking_hold(booking_id: int, body: HoldConfirm):
+    """Atomically turn the session's live hold into a confirmed booking (staff: /admin/bookings)"""
+    try:
+        return reservations.confirm_hold(booking_id, body.session_id, body.guest_name)
+    except reservations.BookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.delete("/bookings/{booking_id}")
+def cancel_booking(booking_id: int, session_id: str):
+    """Cancel the session's hold or booking (staff: /admin/bookings)"""
+    try:
+        return reservations.cancel_booking(booking_id, session_id)
+    except reservations.BookingError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@app.get("/bookings")
+def get_bookings(
+    db: Session = Depends(get_db),
+    status: Optional[List[str]] = Query(None),
+    room_number: Optional[List[str]] = Query(None),
+    limit: Optional[int] = 100
+):
+    """Bookings and holds, newest first"""
+    try:
+        query = apply_filters(db.query(Booking), Booking, statuses=status, room_numbers=room_number)
+        query = query.order_by(Booking.created_at.desc())
+        
+        if limit:
+            query = query.limit(limit)
+        
+        # Session ids are left out: they are what authorizes confirming and cancelling
+        return [
+            {
+                "id": booking.id,
+                "room_number": booking.room_number,
+                "guest_name": booking.guest_name,
+                "guests": booking.guests,
+                "check_in": booking.check_in.isoformat() if booking.check_in else None,
+                "check_out": booking.check_out.isoformat() if booking.check_out else None,
+                "status": booking.status,
+                "expires_at": booking.expires_at.isoformat() if booking.expires_at else None,
+                "total_amount": float(booking.total_amount) if booking.total_amount else 0.0,
+                "created_at": booking.created_at.isoformat() if booking.created_at else None
+            }
+            for booking in query.all()
+        ]
+        
+    except Exception as e:
+        logger.error(f"Error fetching bookings: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching bookings")
+
 # --- Direct Menu Endpoint (Optional) ---
 @app.get("/menu")
 def get_menu_direct():
@@ -234,12 +436,79 @@ def get_menu_direct():
         logger.error(f"Error getting menu: {e}")
         raise HTTPException(status_code=500, detail="Error fetching menu")
 
+@app.get("/menu/search")
+def search_menu_endpoint(q: str, limit: int = Query(5, ge=1, le=50)):
+    """Ranked full-text search over menu name, description and category"""
+    try:
+        from .menu_search import search_menu_items
+        return {"query": q, "results": search_menu_items(q, limit)}
+    except Exception as e:
+        logger.error(f"Error searching menu: {e}")
+        raise HTTPException(status_code=500, detail="Error searching menu")
+
+# --- LLM Usage ---
+@app.get("/metrics/llm")
+def llm_usage_metrics():
+    """Token, latency and cost totals per agent and per tool"""
+    return llm_metrics.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus exposition: latency histograms plus LLM, path and tool counters"""
+    llm = llm_metrics.snapshot()["totals"]
+    guard = llm_guard.snapshot()
+    paths = path_metrics.snapshot()["paths"]
+    tools = tool_calls.snapshot()
+    lines = [
+        "# TYPE resort_llm_calls_total counter",
+        f"resort_llm_calls_total {llm['calls']}",
+        "# TYPE resort_llm_tokens_total counter",
+        f'resort_llm_tokens_total{{type="prompt"}} {llm["prompt_tokens"]}',
+        f'resort_llm_tokens_total{{type="output"}} {llm["output_tokens"]}',
+        "# HELP resort_llm_circuit_open 1 while the LLM circuit breaker is open or probing",
+        "# TYPE resort_llm_circuit_open gauge",
+        f"resort_llm_circuit_open {0 if guard['circuit']['state'] == 'closed' else 1}",
+        "# TYPE resort_llm_guard_calls_total counter",
+        *(f'resort_llm_guard_calls_total{{outcome="{k}"}} {v}' for k, v in guard["calls"].items() if k != "calls"),
+        "# TYPE resort_llm_fallbacks_total counter",
+        *(f'resort_llm_fallbacks_total{{path="{k}"}} {v}' for k, v in guard["fallbacks"].items()),
+        "# TYPE resort_turns_total counter",
+        *(f'resort_turns_total{{path="{k}"}} {v["turns"]}' for k, v in paths.items()),
+        "# TYPE resort_tool_calls_total counter",
+        f'resort_tool_calls_total{{result="executed"}} {tools["executed"]}',
+        f'resort_tool_calls_total{{result="shared"}} {tools["shared"]}',
+    ]
+    return PlainTextResponse(render_metrics(lines), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/llm/guard")
+def llm_guard_metrics():
+    """Circuit breaker state, timeouts, hedged calls and local fallbacks"""
+    return llm_guard.snapshot()
+
+@app.get("/metrics/tools")
+def tool_call_metrics():
+    """Read-only tool calls executed versus served from an identical call already in flight"""
+    return tool_calls.snapshot()
+
+@app.get("/metrics/paths")
+def answer_path_metrics():
+    """Share of guest turns answered by the agent versus local fast paths"""
+    return path_metrics.snapshot()
+
+@app.get("/sessions/{session_id}/usage")
+def session_usage(session_id: str):
+    """Token, latency and cost summary for one chat session"""
+    summary = llm_metrics.session_summary(session_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No LLM usage recorded for this session")
+    return summary
+
 # --- Health Check ---
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """Health check"""
     try:
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         
         order_count = db.query(Order).count()
         request_count = db.query(ServiceRequest).count()
@@ -248,6 +517,7 @@ async def health_check(db: Session = Depends(get_db)):
         return {
             "status": "healthy",
             "timestamp": datetime.now().isoformat(),
+            "llm_circuit": llm_guard.breaker.state,
             "stats": {
                 "orders": order_count,
                 "requests": request_count,
@@ -269,6 +539,17 @@ async def root():
             "orders": "GET /orders",
             "requests": "GET /requests",
             "menu": "GET /menu",
+            "menu_search": "GET /menu/search?q=",
+            "export": "GET /export/{orders|requests}",
+            "prometheus": "GET /metrics",
+            "llm_metrics": "GET /metrics/llm",
+            "llm_guard": "GET /metrics/llm/guard",
+            "path_metrics": "GET /metrics/paths",
+            "tool_metrics": "GET /metrics/tools",
+            "session_usage": "GET /sessions/{session_id}/usage",
+            "availability": "GET /availability",
+            "bookings": "GET /bookings, POST /bookings/hold, POST /bookings/{id}/confirm, DELETE /bookings/{id}",
+            "staff_bookings": "POST /admin/bookings/{id}/confirm, DELETE /admin/bookings/{id} (X-Admin-Token)",
             "health": "GET /health"
         }
     }
@@ -277,6 +558,18 @@ async def root():
 @app.on_event("startup")
 async def startup_event():
     logger.info("API starting up...")
+    init_db()
+    if WRITE_QUEUE_ENABLED:
+        start_writer()
+    reservations.start_reaper()
+    # Agents and the Gemini SDK load lazily; warm them off the startup path so the first guest doesn't wait
+    threading.Thread(target=warm_up, name="agent-warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    reservations.stop_reaper()
+    stop_writer()
+    stop_exporter()
 
 if __name__ == "__main__":
     import uvicorn
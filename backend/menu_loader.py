@@ -0,0 +1,130 @@
+import csv
+import json
+import logging
+import os
+from typing import Dict, Iterable, Iterator
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .database import engine
+from .models import MenuItem
+from .order_parser import invalidate_order_parser
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany() of the INSERT ... ON CONFLICT statement
+UPSERT_CHUNK_SIZE = 1000
+
+def _clean_item(raw: Dict) -> Dict:
+    """Normalize a raw menu row; returns None for rows without a name"""
+    name = (raw.get("name") or "").strip()
+    if not name:
+        return None
+
+    try:
+        price = float(raw.get("price") or 0)
+    except (TypeError, ValueError):
+        price = 0.0
+
+    return {
+        "name": name,
+        "description": (raw.get("description") or "").strip() or None,
+        "price": price,
+        "category": (raw.get("category") or "").strip() or None,
+    }
+
+def read_menu_file(path: str) -> Iterator[Dict]:
+    """Stream raw menu rows from a .csv or .jsonl file"""
+    ext = os.path.splitext(path)[1].lower()
+
+    with open(path, newline="", encoding="utf-8") as f:
+        if ext == ".csv":
+            rows = csv.DictReader(f)
+        elif ext in (".jsonl", ".ndjson"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            raise ValueError(f"Unsupported menu file type: {ext} (use .csv or .jsonl)")
+
+        for row in rows:
+            yield row
+
+def upsert_menu_items(items: Iterable[Dict], prune: bool = False, chunk_size: int = UPSERT_CHUNK_SIZE) -> Dict:
+    """
+    Bulk upsert menu items keyed on name.
+
+    Unchanged rows are skipped; new and changed rows are written in chunks
+    through a single INSERT ... ON CONFLICT(name) DO UPDATE statement. With
+    prune=True, items missing from the input are deleted.
+
+    Returns a diff: {"added": [...], "updated": [...], "removed": [...], "unchanged": n},
+    with "missing" instead of "removed" when prune is False.
+    """
+    diff = {"added": [], "updated": [], "unchanged": 0}
+    table = MenuItem.__table__
+
+    with engine.begin() as conn:
+        existing = {
+            row.name: (row.description, row.price, row.category)
+            for row in conn.execute(select(table.c.name, table.c.description, table.c.price, table.c.category))
+        }
+        seen = set()
+        pending = {}
+
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={
+                "description": stmt.excluded.description,
+                "price": stmt.excluded.price,
+                "category": stmt.excluded.category,
+            }
+        )
+
+        def flush():
+            # One compiled statement, executed over the whole chunk
+            if pending:
+                conn.execute(stmt, list(pending.values()))
+                pending.clear()
+
+        for raw in items:
+            item = _clean_item(raw)
+            if not item:
+                continue
+            name = item["name"]
+            current = existing.get(name)
+            new_values = (item["description"], item["price"], item["category"])
+
+            # Repeated names in the input are written again (last one wins)
+            if name not in seen:
+                seen.add(name)
+                if current is None:
+                    diff["added"].append(name)
+                elif current != new_values:
+                    diff["updated"].append(name)
+                else:
+                    diff["unchanged"] += 1
+                    continue
+
+            pending[name] = item
+            if len(pending) >= chunk_size:
+                flush()
+
+        flush()
+
+        missing = [name for name in existing if name not in seen]
+        if prune:
+            for start in range(0, len(missing), chunk_size):
+                conn.execute(delete(table).where(table.c.name.in_(missing[start:start + chunk_size])))
+            diff["removed"] = missing
+        else:
+            diff["missing"] = missing
+
+    logger.info(
+        f"Menu upsert: {len(diff['added'])} added, {len(diff['updated'])} updated, "
+        f"{len(missing)} {'removed' if prune else 'not in input'}, {diff['unchanged']} unchanged"
+    )
+    invalidate_order_parser()
+    return diff
+
+def load_menu_file(path: str, prune: bool = False) -> Dict:
+    """Load a CSV/JSONL menu file into the database"""
+    return upsert_menu_items(read_menu_file(path), prune=prune)
@@ -0,0 +1,124 @@
+import logging
+import re
+from typing import Dict, List
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# bm25() column weights: name, description, category
+BM25_WEIGHTS = (10.0, 2.0, 5.0)
+DEFAULT_SEARCH_LIMIT = 5
+
+# Filler words guests use that should not affect ranking
+STOPWORDS = {
+    "a", "an", "and", "any", "are", "can", "do", "for", "get", "have", "i", "in", "is",
+    "like", "me", "my", "of", "or", "please", "some", "something", "the", "to", "want",
+    "what", "with", "would", "you", "your", "dish", "food", "item", "items",
+}
+
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5(
+        name, description, category,
+        content='menu_items', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS menu_items_fts_ai AFTER INSERT ON menu_items BEGIN
+        INSERT INTO menu_items_fts(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS menu_items_fts_ad AFTER DELETE ON menu_items BEGIN
+        INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS menu_items_fts_au AFTER UPDATE ON menu_items BEGIN
+        INSERT INTO menu_items_fts(menu_items_fts, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+        INSERT INTO menu_items_fts(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END""",
+]
+
+FTS_AVAILABLE = True
+
+def ensure_menu_fts():
+    """Create the FTS5 index and sync triggers, rebuilding the index on first creation"""
+    global FTS_AVAILABLE
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='menu_items_fts'")
+            ).first()
+            for ddl in FTS_DDL:
+                conn.execute(text(ddl))
+            if not exists:
+                conn.execute(text("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')"))
+                logger.info("Menu search index built")
+    except OperationalError as e:
+        # SQLite built without FTS5 - search falls back to LIKE matching
+        FTS_AVAILABLE = False
+        logger.warning(f"FTS5 unavailable, using LIKE menu search: {e}")
+
+def _tokenize(query: str) -> List[str]:
+    """Lowercase words from the query, without filler words"""
+    words = re.findall(r"\w+", (query or "").lower())
+    return [w for w in words if w not in STOPWORDS]
+
+def _fts_search(conn, terms: List[str], limit: int) -> List[Dict]:
+    # Quote each term (no FTS syntax injection) and allow prefix matches
+    match = " OR ".join(f'"{term}"*' for term in terms)
+    rows = conn.execute(
+        text(f"""
+            SELECT m.id, m.name, m.description, m.price, m.category,
+                   bm25(menu_items_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}) AS score
+            FROM menu_items_fts
+            JOIN menu_items m ON m.id = menu_items_fts.rowid
+            WHERE menu_items_fts MATCH :match
+            ORDER BY score
+            LIMIT :limit
+        """),
+        {"match": match, "limit": limit}
+    )
+    # bm25() is lower-is-better; flip it so higher scores rank first
+    return [dict(row._mapping, score=round(-row.score, 3)) for row in rows]
+
+def _like_search(conn, terms: List[str], limit: int) -> List[Dict]:
+    conditions = []
+    params = {"limit": limit}
+    score_parts = []
+    for i, term in enumerate(terms):
+        params[f"t{i}"] = f"%{term}%"
+        conditions.append(f"(name LIKE :t{i} OR description LIKE :t{i} OR category LIKE :t{i})")
+        score_parts.append(
+            f"(CASE WHEN name LIKE :t{i} THEN {BM25_WEIGHTS[0]} ELSE 0 END"
+            f" + CASE WHEN description LIKE :t{i} THEN {BM25_WEIGHTS[1]} ELSE 0 END"
+            f" + CASE WHEN category LIKE :t{i} THEN {BM25_WEIGHTS[2]} ELSE 0 END)"
+        )
+    rows = conn.execute(
+        text(f"""
+            SELECT id, name, description, price, category, ({' + '.join(score_parts)}) AS score
+            FROM menu_items
+            WHERE {' OR '.join(conditions)}
+            ORDER BY score DESC, name
+            LIMIT :limit
+        """),
+        params
+    )
+    return [dict(row._mapping) for row in rows]
+
+def search_menu_items(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict]:
+    """Return the top menu items for a free-text query, best first"""
+    terms = _tokenize(query)
+    if not terms:
+        return []
+
+    with engine.connect() as conn:
+        if FTS_AVAILABLE:
+            try:
+                return _fts_search(conn, terms, limit)
+            except OperationalError as e:
+                # Index not created yet (init_db not run) or FTS5 missing
+                logger.warning(f"Menu FTS search failed, falling back to LIKE: {e}")
+                conn.rollback()
+        return _like_search(conn, terms, limit)
@@ -1,11 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON, Index, LargeBinary, ForeignKey, Boolean
 from datetime import datetime
-
-Base = declarative_base()
+from .database import Base
 
 class MenuItem(Base):
     __tablename__ = "menu_items"
+    __table_args__ = (
+        Index("uq_menu_items_name", "name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -15,20 +16,70 @@ class MenuItem(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_room_number_created_at", "room_number", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     room_number = Column(String, index=True)
     items = Column(JSON)
     total_amount = Column(Float)
     status = Column(String, default="Pending")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
 
 class ServiceRequest(Base):
     __tablename__ = "service_requests"
+    __table_args__ = (
+        Index("ix_service_requests_status_created_at", "status", "created_at"),
+        Index("ix_service_requests_room_number_created_at", "room_number", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     room_number = Column(String, index=True)
     request_type = Column(String)
     details = Column(String)
     status = Column(String, default="Pending")
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    idempotency_key = Column(String, unique=True, index=True, nullable=True)
+
+class ChatSessionState(Base):
+    __tablename__ = "chat_sessions"
+
+    session_id = Column(String, primary_key=True)
+    data = Column(LargeBinary)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class Room(Base):
+    __tablename__ = "rooms"
+
+    id = Column(Integer, primary_key=True, index=True)
+    room_number = Column(String, unique=True, index=True)
+    room_type = Column(String, index=True)
+    nightly_rate = Column(Float)
+    capacity = Column(Integer, default=2)
+    is_active = Column(Boolean, default=True)
+
+class Booking(Base):
+    __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_room_id_check_in", "room_id", "check_in"),
+        Index("ix_bookings_status_check_out", "status", "check_out"),
+        Index("ix_bookings_status_expires_at", "status", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    room_number = Column(String, index=True)
+    guest_name = Column(String)
+    guests = Column(Integer, default=1)
+    check_in = Column(Date, nullable=False)
+    check_out = Column(Date, nullable=False)  # exclusive: the guest leaves that morning
+    status = Column(String, default="Confirmed")  # Held, Confirmed, Cancelled, Expired
+    expires_at = Column(DateTime, nullable=True)  # set while Held
+    total_amount = Column(Float)
+    session_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,158 @@
+"""
+Fast path for clearly structured food orders.
+
+"2 masala dosa and a cold coffee to room 204" needs no model: the
+parser splits it into quantity + dish segments, matches each against
+the menu and picks up the room number. Only when every word is
+accounted for and every dish matches exactly one menu item is the parse
+confident; AgentManager then places the order directly. Anything else
+(questions, modifiers like "no onions", "naan" with two naans on the
+menu) goes to the restaurant agent as before.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from .database import SessionLocal
+from .models import MenuItem
+from .slots import NUMBER_WORDS, find_room
+
+logger = logging.getLogger(__name__)
+
+ORDER_FAST_PATH_ENABLED = os.getenv("ORDER_FAST_PATH", "1").lower() not in ("0", "false", "no")
+# Re-read menu item names this often, to pick up menu changes made by other workers (0 = never)
+ORDER_PARSER_REFRESH_SECONDS = float(os.getenv("ORDER_PARSER_REFRESH_SECONDS", "60"))
+# Larger quantities are more likely typos or group orders worth a human-sounding confirmation
+MAX_FAST_PATH_QUANTITY = int(os.getenv("ORDER_FAST_PATH_MAX_QUANTITY", "10"))
+
+ORDER_INTENT = re.compile(
+    r"\b(order|send|bring|deliver|get me|i'?d like|i would like|i want|we want|we'?d like|can i have|"
+    r"can i get|could i have|could i get|can we have|can we get)\b"
+)
+# "... to 204" at the end of an order
+DELIVER_TO_PATTERN = re.compile(r"\b(?:to|for)\s+#?(\d{3,4})\W*$", re.I)
+SEGMENT_SPLIT = re.compile(r",|;|&|\+|\band\b|\bplus\b")
+# Words that change what is being ordered; these need the agent
+MODIFIERS = {
+    "no", "not", "without", "with", "extra", "less", "more", "instead", "cancel", "change", "but",
+    "only", "except", "spicy", "mild", "half", "large", "small", "jain", "don", "dont", "remove",
+}
+# Words that carry no dish or quantity ("I'd like a plate of ... please")
+FILLER = {
+    "i", "id", "we", "wed", "would", "like", "want", "to", "order", "get", "have", "please", "pls",
+    "can", "could", "me", "us", "send", "bring", "deliver", "up", "for", "the", "of", "some", "my",
+    "our", "room", "plate", "plates", "portion", "portions", "serving", "servings", "glass",
+    "glasses", "cup", "cups", "bowl", "bowls", "piece", "pieces", "hi", "hello", "hey", "thanks",
+    "thank", "you", "also", "just", "in", "at", "now", "asap", "quickly", "x",
+}
+QUANTITY_WORDS = {**NUMBER_WORDS, "a": 1, "an": 1}
+
+def _singular(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower().replace("'", ""))
+
+def _quantity(word: str) -> Optional[int]:
+    if word in QUANTITY_WORDS:
+        return QUANTITY_WORDS[word]
+    match = re.fullmatch(r"(\d{1,3})x?|x(\d{1,3})", word)
+    return int(match.group(1) or match.group(2)) if match else None
+
+class OrderParser:
+    """Menu-aware parser for orders that need no interpretation"""
+
+    def __init__(self, names: List[str]):
+        self.built_at = time.monotonic()
+        # Singular name words → menu item name, for matching dishes in any word order
+        self.items = {frozenset(_singular(w) for w in _words(name)): name for name in names}
+
+    def match_dishes(self, words: List[str]) -> List[str]:
+        """Menu items these words could name: the exact match, else every item containing them"""
+        wanted = frozenset(_singular(w) for w in words)
+        if wanted in self.items:
+            return [self.items[wanted]]
+        return [name for key, name in self.items.items() if wanted <= key]
+
+    def parse(self, text: str) -> Dict:
+        """
+        Items, quantities and room number in a guest message.
+
+        "reason" is None for a confident parse, otherwise why the message
+        has to go to the agent.
+        """
+        result = {"items": {}, "room_number": None, "reason": None}
+        text = (text or "").strip()
+        lowered = text.lower()
+        if not lowered:
+            result["reason"] = "empty"
+            return result
+
+        match = find_room(text) or DELIVER_TO_PATTERN.search(text)
+        if match:
+            result["room_number"] = match.group(1)
+            lowered = lowered[:match.start()] + " " + lowered[match.end():]
+
+        if not ORDER_INTENT.search(lowered) and not re.match(r"\s*\d", lowered):
+            result["reason"] = "no_order_intent"
+            return result
+
+        for segment in SEGMENT_SPLIT.split(lowered):
+            words = _words(segment)
+            if not words:
+                continue
+            if MODIFIERS.intersection(words):
+                result["reason"] = "modifier"
+                return result
+
+            quantities = [q for q in map(_quantity, words) if q is not None]
+            dish_words = [w for w in words if w not in FILLER and _quantity(w) is None]
+            if not dish_words:
+                if quantities:
+                    result["reason"] = "unmatched_words"
+                    return result
+                continue
+            if len(quantities) > 1 or (quantities and not 0 < quantities[0] <= MAX_FAST_PATH_QUANTITY):
+                result["reason"] = "quantity"
+                return result
+
+            dishes = self.match_dishes(dish_words)
+            if len(dishes) != 1:
+                result["reason"] = "ambiguous_item" if dishes else "unmatched_words"
+                return result
+            result["items"][dishes[0]] = result["items"].get(dishes[0], 0) + (quantities[0] if quantities else 1)
+
+        if not result["items"]:
+            result["reason"] = "no_items"
+        return result
+
+_parser: Optional[OrderParser] = None
+_parser_lock = threading.Lock()
+
+def get_order_parser() -> OrderParser:
+    """Shared parser over the current menu, rebuilt every ORDER_PARSER_REFRESH_SECONDS"""
+    global _parser
+    parser = _parser
+    stale = parser is not None and ORDER_PARSER_REFRESH_SECONDS and \
+        time.monotonic() - parser.built_at > ORDER_PARSER_REFRESH_SECONDS
+    if parser is None or stale:
+        with _parser_lock:
+            if _parser is parser:
+                db = SessionLocal()
+                try:
+                    names = [name for (name,) in db.query(MenuItem.name).all()]
+                finally:
+                    db.close()
+                _parser = OrderParser(names)
+                logger.info(f"Order parser loaded {len(names)} menu items")
+            parser = _parser
+    return parser
+
+def invalidate_order_parser():
+    """Force a menu reload on next use (after menu changes)"""
+    global _parser
+    with _parser_lock:
+        _parser = None
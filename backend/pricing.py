@@ -0,0 +1,154 @@
+"""
+Dynamic nightly pricing.
+
+Rates for every room type and each of the next PRICING_HORIZON_DAYS nights
+are precomputed as one NumPy matrix (nights × room types):
+
+    rate = base rate × weekday factor × season factor × occupancy factor
+
+Occupancy comes from the availability index. When a booking or hold
+changes a room's nights, only those nights of that room type's column
+are recomputed, and a per-column prefix sum makes any stay's quote two
+array reads.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional
+import numpy as np
+from .availability import EPOCH, AvailabilityIndex, get_availability_index
+
+logger = logging.getLogger(__name__)
+
+PRICING_HORIZON_DAYS = int(os.getenv("PRICING_HORIZON_DAYS", "365"))
+
+# Monday .. Sunday
+WEEKDAY_FACTORS = np.array([1.0, 1.0, 1.0, 1.0, 1.15, 1.2, 1.05])
+# January .. December: winter peak, monsoon low season
+SEASON_FACTORS = np.array([1.25, 1.1, 1.1, 1.0, 1.0, 0.85, 0.85, 0.85, 0.95, 1.1, 1.15, 1.3])
+# Occupancy above the target raises prices, below it discounts them, within the bounds
+OCCUPANCY_TARGET = 0.6
+OCCUPANCY_SLOPE = 0.75
+OCCUPANCY_FACTOR_BOUNDS = (0.85, 1.5)
+
+def _bit_matrix(bitmaps: List[int], offset: int, length: int) -> np.ndarray:
+    """Rows of 0/1 nights [offset, offset + length) from integer occupancy bitmaps"""
+    width = (length + 7) // 8
+    window = (1 << length) - 1
+    raw = b"".join(((bits >> offset) & window).to_bytes(width, "little") for bits in bitmaps)
+    matrix = np.frombuffer(raw, dtype=np.uint8).reshape(len(bitmaps), width)
+    return np.unpackbits(matrix, axis=1, bitorder="little")[:, :length]
+
+def calendar_factors(start: date, nights: int) -> np.ndarray:
+    """Weekday × season factor for each night from start"""
+    days = np.arange(np.datetime64(start), np.datetime64(start) + nights, dtype="datetime64[D]")
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    month = days.astype("datetime64[M]").astype(np.int64) % 12
+    return WEEKDAY_FACTORS[weekday] * SEASON_FACTORS[month]
+
+def occupancy_factors(occupancy: np.ndarray) -> np.ndarray:
+    return np.clip(1 + OCCUPANCY_SLOPE * (occupancy - OCCUPANCY_TARGET), *OCCUPANCY_FACTOR_BOUNDS)
+
+class PriceTable:
+    """Precomputed nightly rates per room type for a fixed horizon starting today"""
+
+    def __init__(self, index: AvailabilityIndex, start: Optional[date] = None, horizon: int = PRICING_HORIZON_DAYS):
+        self.index = index
+        self.start = start or date.today()
+        self.horizon = horizon
+        self.room_types = sorted(index.by_type)
+        self.columns = {room_type: i for i, room_type in enumerate(self.room_types)}
+        self._lock = threading.Lock()
+
+        rooms_by_type = [[index.rooms[n] for n in index.by_type[t]] for t in self.room_types]
+        self.base_rates = np.array([min(r["nightly_rate"] for r in rooms) for rooms in rooms_by_type], dtype=float)
+        self.room_counts = np.array([len(rooms) for rooms in rooms_by_type], dtype=float)
+        self.calendar = calendar_factors(self.start, horizon)
+
+        # Booked rooms per night and type: (nights × rooms) bits @ (rooms × types) one-hot
+        offset = (self.start - EPOCH).days
+        numbers = [n for t in self.room_types for n in index.by_type[t]]
+        if numbers:
+            bits = _bit_matrix([index.rooms[n]["bits"] for n in numbers], offset, horizon)
+            onehot = np.zeros((len(numbers), len(self.room_types)))
+            onehot[np.arange(len(numbers)), [self.columns[index.rooms[n]["room_type"]] for n in numbers]] = 1
+            self.booked = bits.T.astype(float) @ onehot
+        else:
+            self.booked = np.zeros((horizon, 0))
+
+        self.rates = np.zeros((horizon, len(self.room_types)))
+        self.cumulative = np.zeros((horizon + 1, len(self.room_types)))
+        self._recompute(slice(0, horizon), slice(None))
+
+    def _recompute(self, nights: slice, columns):
+        """Rates for a block of nights and types, then the prefix sums they feed"""
+        occupancy = self.booked[nights, columns] / self.room_counts[columns]
+        self.rates[nights, columns] = np.round(
+            self.base_rates[columns] * self.calendar[nights, None] * occupancy_factors(occupancy)
+        )
+        first = nights.start or 0
+        self.cumulative[first + 1:, columns] = (
+            self.cumulative[first, columns] + np.cumsum(self.rates[first:, columns], axis=0)
+        )
+
+    def on_occupancy_change(self, room_type: str, changed_bits: int, delta: int):
+        """Availability index listener: nights in changed_bits gained (+1) or lost (-1) a booked room"""
+        column = self.columns.get(room_type)
+        if column is None:
+            return
+        nights = _bit_matrix([changed_bits], (self.start - EPOCH).days, self.horizon)[0].astype(float)
+        touched = np.flatnonzero(nights)
+        if not len(touched):
+            return
+        with self._lock:
+            self.booked[:, column] += delta * nights
+            self._recompute(slice(int(touched[0]), int(touched[-1]) + 1), slice(column, column + 1))
+
+    def nightly_rates(self, room_type: str, check_in: date, check_out: date) -> np.ndarray:
+        """Rate for each night of a stay; nights past the horizon use calendar factors only"""
+        column = self.columns[room_type]
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        with self._lock:
+            if 0 <= first and last <= self.horizon:
+                return self.rates[first:last, column].copy()
+        return np.round(self.base_rates[column] * calendar_factors(check_in, (check_out - check_in).days))
+
+    def quote(self, room_type: str, check_in: date, check_out: date) -> Dict:
+        """Total and average nightly price for a stay: two prefix-sum reads inside the horizon"""
+        column = self.columns[room_type]
+        first = (check_in - self.start).days
+        last = (check_out - self.start).days
+        nights = last - first
+        if 0 <= first and last <= self.horizon:
+            with self._lock:
+                total = float(self.cumulative[last, column] - self.cumulative[first, column])
+        else:
+            total = float(self.nightly_rates(room_type, check_in, check_out).sum())
+        return {"room_type": room_type, "nights": nights, "total": total, "average_nightly_rate": round(total / nights)}
+
+_table: Optional[PriceTable] = None
+_table_lock = threading.Lock()
+
+def get_price_table() -> PriceTable:
+    """Shared table, rebuilt when the availability index is rebuilt or the day rolls over"""
+    global _table
+    index = get_availability_index()
+    table = _table
+    if table is None or table.index is not index or table.start != date.today():
+        with _table_lock:
+            if _table is table:
+                start = time.perf_counter()
+                table = PriceTable(index)
+                index.listeners.append(table.on_occupancy_change)
+                _table = table
+                logger.info(f"Price table built: {table.horizon} nights × {len(table.room_types)} room types "
+                            f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+            table = _table
+    return table
+
+def quote_stay(room_type: str, check_in: date, check_out: date) -> Dict:
+    return get_price_table().quote(room_type, check_in, check_out)
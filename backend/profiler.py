@@ -0,0 +1,198 @@
+"""
+On-demand profiling of the live backend (admin only, opt in).
+
+Two modes, both off unless PROFILING_ENABLED=1 and ADMIN_TOKEN is set:
+
+- Stack sampling: GET /admin/profile/stacks samples every thread's
+  stack for N seconds and returns collapsed stacks ("a;b;c count"),
+  ready for flamegraph.pl, speedscope or inferno.
+- Request profiling: POST /admin/profile/requests arms cProfile for
+  every Kth /chat request; GET returns the merged pstats dump (or a
+  text summary) once some have been captured.
+
+When profiling is disabled the admin routes are not mounted, no
+sampler thread exists and maybe_profile() is a no-op.
+Requests must send the token in the X-Admin-Token header.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from .admin import ADMIN_TOKEN, require_admin
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+MAX_SAMPLE_SECONDS = 60
+MAX_PROFILED_REQUESTS = 200
+
+# Innermost frames of threads parked on a lock, queue or socket; dropped unless idle stacks are requested
+IDLE_FRAMES = ("wait (threading.py", "get (queue.py", "select (selectors.py", "accept (socket.py",
+               "_wait_for_tstate_lock (threading.py", "_worker (thread.py")
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+def sample_stacks(seconds: float, interval: float = 0.005, include_idle: bool = False) -> Dict:
+    """
+    Wall-clock stack samples of every other thread, as collapsed-stack
+    counts keyed "thread;outermost;...;innermost"
+    """
+    own_thread = threading.get_ident()
+    counts: Counter = Counter()
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name.replace(";", ",") for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_thread:
+                continue
+            if not include_idle and _frame_label(frame).startswith(IDLE_FRAMES):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            counts[";".join(reversed(stack))] += 1
+        samples += 1
+        time.sleep(interval)
+    return {"samples": samples, "stacks": counts}
+
+class RequestProfiler:
+    """cProfile for every Kth request, until `remaining` profiles are captured"""
+
+    def __init__(self, every: int, count: int):
+        self.every = every
+        self.remaining = count
+        self.seen = 0
+        self.armed_at = datetime.now().isoformat()
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def should_profile(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.seen += 1
+            if self.seen % self.every:
+                return False
+            self.remaining -= 1
+            return True
+
+    def add(self, profile: cProfile.Profile):
+        with self._lock:
+            self.profiles.append(profile)
+
+    def merged(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self.profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {"every": self.every, "requests_seen": self.seen, "captured": len(self.profiles),
+                    "remaining": self.remaining, "armed_at": self.armed_at}
+
+_request_profiler: Optional[RequestProfiler] = None
+_sampling_lock = threading.Lock()
+
+@contextmanager
+def maybe_profile():
+    """Profile the enclosed work in this thread when request profiling is armed and it is this request's turn"""
+    profiler = _request_profiler
+    if profiler is None or not profiler.should_profile():
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profiler.add(profile)
+
+router = APIRouter(prefix="/admin/profile", tags=["admin"])
+
+@router.get("/stacks", response_class=PlainTextResponse)
+def profile_stacks(seconds: float = Query(10, gt=0, le=MAX_SAMPLE_SECONDS),
+                   interval_ms: float = Query(5, ge=1, le=1000), include_idle: bool = False,
+                   x_admin_token: Optional[str] = Header(None)):
+    """Sample all thread stacks for `seconds`; collapsed-stack text for flamegraph tools"""
+    require_admin(x_admin_token)
+    if not _sampling_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A stack capture is already running")
+    try:
+        logger.info(f"Sampling thread stacks for {seconds}s every {interval_ms} ms")
+        result = sample_stacks(seconds, interval_ms / 1000, include_idle)
+    finally:
+        _sampling_lock.release()
+
+    body = "\n".join(f"{stack} {count}" for stack, count in result["stacks"].most_common()) + "\n"
+    filename = f"stacks-{datetime.now():%Y%m%d-%H%M%S}.folded"
+    return PlainTextResponse(body, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Profile-Samples": str(result["samples"]),
+    })
+
+@router.post("/requests")
+def arm_request_profiling(every: int = Query(10, ge=1), count: int = Query(20, ge=1, le=MAX_PROFILED_REQUESTS),
+                          x_admin_token: Optional[str] = Header(None)):
+    """Profile every Kth chat request until `count` profiles are captured (replaces earlier captures)"""
+    global _request_profiler
+    require_admin(x_admin_token)
+    _request_profiler = RequestProfiler(every, count)
+    logger.info(f"Request profiling armed: every {every}th request, {count} captures")
+    return _request_profiler.status()
+
+@router.get("/requests")
+def request_profile(format: str = Query("pstats", pattern="^(pstats|text)$"), limit: int = Query(40, ge=1, le=500),
+                    x_admin_token: Optional[str] = Header(None)):
+    """Merged profile of the captured requests: a pstats dump, or the top functions by cumulative time"""
+    require_admin(x_admin_token)
+    profiler = _request_profiler
+    stats = profiler.merged() if profiler else None
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No requests profiled yet")
+
+    if format == "text":
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(limit)
+        return PlainTextResponse(out.getvalue())
+
+    with tempfile.NamedTemporaryFile(suffix=".prof") as f:
+        stats.dump_stats(f.name)
+        data = f.read()
+    filename = f"requests-{datetime.now():%Y%m%d-%H%M%S}.prof"
+    return Response(data, media_type="application/octet-stream", headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Profiled-Requests": str(profiler.status()["captured"]),
+    })
+
+@router.delete("/requests")
+def disarm_request_profiling(x_admin_token: Optional[str] = Header(None)):
+    """Stop request profiling and drop captured profiles"""
+    global _request_profiler
+    require_admin(x_admin_token)
+    status = _request_profiler.status() if _request_profiler else None
+    _request_profiler = None
+    return {"disarmed": True, "last": status}
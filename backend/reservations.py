@@ -0,0 +1,253 @@
+"""
+Room holds and bookings.
+
+A hold reserves a specific room for HOLD_MINUTES while the guest
+confirms. Both steps are single conditional statements, so two guests
+racing for the last room can never both get it:
+
+- create_hold inserts the Held row only if no Confirmed booking or live
+  hold overlaps the stay (INSERT ... SELECT ... WHERE NOT EXISTS).
+- confirm_hold flips Held → Confirmed only while the hold is unexpired
+  and still the only claim on those nights (UPDATE ... WHERE ...).
+
+Guests can only confirm or cancel bookings made by their own session;
+the staff_* variants (admin routes) act on any booking.
+
+SQLite runs each statement under its single-writer lock, so the check and
+the write cannot interleave with another session's. Expired holds stop
+blocking the room immediately; the reaper just marks them Expired and
+frees them in the availability index.
+"""
+
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import Date, DateTime, bindparam, text
+from sqlalchemy.exc import OperationalError
+from .database import engine
+from .availability import get_availability_index
+
+logger = logging.getLogger(__name__)
+
+HOLD_MINUTES = float(os.getenv("BOOKING_HOLD_MINUTES", "10"))
+REAPER_INTERVAL_SECONDS = float(os.getenv("BOOKING_REAPER_INTERVAL_SECONDS", "30"))
+
+# Another claim on any night of the stay: a booking, or a hold that hasn't lapsed
+_OVERLAP = """
+    SELECT 1 FROM bookings b
+    WHERE b.room_id = :room_id
+      AND b.check_in < :check_out AND b.check_out > :check_in
+      AND (b.status = 'Confirmed' OR (b.status = 'Held' AND b.expires_at > :now))
+"""
+
+_DATE_PARAMS = [
+    bindparam("check_in", type_=Date),
+    bindparam("check_out", type_=Date),
+    bindparam("now", type_=DateTime),
+]
+
+INSERT_HOLD = text(f"""
+    INSERT INTO bookings (room_id, room_number, guest_name, guests, check_in, check_out,
+                          status, expires_at, total_amount, session_id, created_at)
+    SELECT :room_id, :room_number, :guest_name, :guests, :check_in, :check_out,
+           'Held', :expires_at, :total_amount, :session_id, :now
+    WHERE NOT EXISTS ({_OVERLAP})
+""").bindparams(*_DATE_PARAMS, bindparam("expires_at", type_=DateTime))
+
+CONFIRM_HOLD = text(f"""
+    UPDATE bookings SET status = 'Confirmed', expires_at = NULL, guest_name = COALESCE(:guest_name, guest_name)
+    WHERE id = :booking_id AND status = 'Held' AND expires_at > :now
+      AND (:by_staff OR session_id = :session_id)
+      AND NOT EXISTS ({_OVERLAP.replace("WHERE b.room_id", "WHERE b.id != :booking_id AND b.room_id")})
+""").bindparams(*_DATE_PARAMS)
+
+class BookingError(Exception):
+    """A hold or booking could not be made; the message is guest-facing"""
+
+def _booking_row(conn, booking_id: int) -> Optional[Dict]:
+    row = conn.execute(
+        text("""SELECT b.id, b.room_id, b.room_number, r.room_type, b.guest_name, b.guests,
+                       b.check_in, b.check_out, b.status, b.expires_at, b.total_amount
+                FROM bookings b JOIN rooms r ON r.id = b.room_id WHERE b.id = :id"""),
+        {"id": booking_id}
+    ).first()
+    if row is None:
+        return None
+    booking = dict(row._mapping)
+    for key in ("check_in", "check_out"):
+        booking[key] = date.fromisoformat(str(booking[key]))
+    return booking
+
+def _owns(conn, booking_id: int, session_id: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM bookings WHERE id = :id AND session_id = :session_id"),
+        {"id": booking_id, "session_id": session_id}
+    ).first() is not None
+
+def create_hold(room_type: str, check_in: date, check_out: date, guests: int = 1,
+                guest_name: Optional[str] = None, session_id: Optional[str] = None,
+                hold_minutes: float = HOLD_MINUTES) -> Dict:
+    """Hold the first room of the type that is free for the stay; raises BookingError if none is"""
+    index = get_availability_index()
+    candidates = index.free_rooms(room_type, check_in, check_out, guests)
+    if not candidates:
+        raise BookingError(f"No {room_type} rooms are free for those dates.")
+
+    from .pricing import quote_stay  # numpy-backed; kept off the import path
+    total_amount = quote_stay(room_type, check_in, check_out)["total"]
+    for room_number in candidates:
+        now = datetime.now()
+        with engine.begin() as conn:
+            room_id = conn.execute(
+                text("SELECT id FROM rooms WHERE room_number = :n"), {"n": room_number}
+            ).scalar()
+            result = conn.execute(INSERT_HOLD, {
+                "room_id": room_id,
+                "room_number": room_number,
+                "guest_name": guest_name,
+                "guests": guests,
+                "check_in": check_in,
+                "check_out": check_out,
+                "expires_at": now + timedelta(minutes=hold_minutes),
+                "total_amount": total_amount,
+                "session_id": session_id,
+                "now": now,
+            })
+            if result.rowcount != 1:
+                # Taken by another session since the index was built; try the next room
+                continue
+            booking = _booking_row(conn, result.lastrowid)
+
+        index.occupy(room_number, check_in, check_out)
+        logger.info(f"Hold #{booking['id']} on room {room_number} ({check_in} → {check_out})")
+        return booking
+
+    raise BookingError(f"No {room_type} rooms are free for those dates.")
+
+def confirm_hold(booking_id: int, session_id: str, guest_name: Optional[str] = None) -> Dict:
+    """Turn your live hold into a confirmed booking; raises BookingError if it lapsed or isn't yours"""
+    if not session_id:
+        raise BookingError("A session is required to confirm a hold.")
+    return _confirm(booking_id, session_id, guest_name, by_staff=False)
+
+def staff_confirm_hold(booking_id: int, guest_name: Optional[str] = None) -> Dict:
+    """Confirm any guest's live hold (front desk)"""
+    return _confirm(booking_id, None, guest_name, by_staff=True)
+
+def _confirm(booking_id: int, session_id: Optional[str], guest_name: Optional[str], by_staff: bool) -> Dict:
+    with engine.begin() as conn:
+        booking = _booking_row(conn, booking_id)
+        # Another session's booking is reported as missing, whatever its status
+        if booking is None or not (by_staff or _owns(conn, booking_id, session_id)):
+            raise BookingError(f"Hold #{booking_id} not found.")
+        if booking["status"] == "Confirmed":
+            return booking
+
+        result = conn.execute(CONFIRM_HOLD, {
+            "booking_id": booking_id,
+            "room_id": booking["room_id"],
+            "check_in": booking["check_in"],
+            "check_out": booking["check_out"],
+            "now": datetime.now(),
+            "session_id": session_id,
+            "by_staff": by_staff,
+            "guest_name": guest_name,
+        })
+        if result.rowcount != 1:
+            raise BookingError(f"Hold #{booking_id} has expired or is no longer available. Please check availability again.")
+        booking = _booking_row(conn, booking_id)
+
+    logger.info(f"Booking #{booking_id} confirmed for room {booking['room_number']}")
+    return booking
+
+def cancel_booking(booking_id: int, session_id: str) -> Dict:
+    """Cancel your hold or booking and free its nights"""
+    if not session_id:
+        raise BookingError(f"Booking #{booking_id} cannot be cancelled.")
+    return _cancel(booking_id, session_id, by_staff=False)
+
+def staff_cancel_booking(booking_id: int) -> Dict:
+    """Cancel any guest's hold or booking (front desk)"""
+    return _cancel(booking_id, None, by_staff=True)
+
+def _cancel(booking_id: int, session_id: Optional[str], by_staff: bool) -> Dict:
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""UPDATE bookings SET status = 'Cancelled', expires_at = NULL
+                    WHERE id = :id AND status IN ('Held', 'Confirmed')
+                      AND (:by_staff OR session_id = :session_id)"""),
+            {"id": booking_id, "session_id": session_id, "by_staff": by_staff}
+        )
+        booking = _booking_row(conn, booking_id)
+    if booking is None or result.rowcount != 1:
+        raise BookingError(f"Booking #{booking_id} cannot be cancelled.")
+
+    get_availability_index().release(booking["room_number"], booking["check_in"], booking["check_out"])
+    return booking
+
+def expire_holds() -> int:
+    """Mark lapsed holds Expired and free their nights in the availability index"""
+    now = datetime.now()
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text("""SELECT id, room_number, check_in, check_out FROM bookings
+                    WHERE status = 'Held' AND expires_at <= :now""").bindparams(bindparam("now", type_=DateTime)),
+            {"now": now}
+        ).all()
+        expired = []
+        for row in rows:
+            # Conditional, so a hold confirmed in the meantime is left alone
+            result = conn.execute(
+                text("UPDATE bookings SET status = 'Expired' WHERE id = :id AND status = 'Held'"), {"id": row.id}
+            )
+            if result.rowcount:
+                expired.append(row)
+
+    index = get_availability_index()
+    for row in expired:
+        index.release(row.room_number, date.fromisoformat(str(row.check_in)), date.fromisoformat(str(row.check_out)))
+    if expired:
+        logger.info(f"Expired {len(expired)} booking holds")
+    return len(expired)
+
+class HoldReaper:
+    """Background thread that runs expire_holds() every interval"""
+
+    def __init__(self, interval: float = REAPER_INTERVAL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="hold-reaper", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                expire_holds()
+            except OperationalError as e:
+                logger.warning(f"Hold reaper skipped a run: {e}")
+            except Exception as e:
+                logger.error(f"Hold reaper error: {e}")
+
+_reaper = None
+
+def start_reaper(interval: float = REAPER_INTERVAL_SECONDS) -> HoldReaper:
+    """Start the shared hold reaper"""
+    global _reaper
+    if _reaper is None:
+        _reaper = HoldReaper(interval)
+        _reaper.start()
+    return _reaper
+
+def stop_reaper():
+    global _reaper
+    if _reaper is not None:
+        _reaper.stop()
+        _reaper = None
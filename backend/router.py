@@ -0,0 +1,194 @@
+"""
+Session-affinity router for `run.py serve --workers N`.
+
+Used when conversation state is kept in process (SESSION_STORE=memory):
+every request carrying a session id is forwarded to the worker chosen by
+hashing that id, so a conversation always lands on the worker that holds
+its state. Everything else is spread round-robin, except metrics: every
+worker counts only its own traffic, so GET /metrics is collected from all
+of them and each sample gets a worker label (sum by the other labels for
+totals), and the JSON /metrics/... snapshots come back keyed by worker.
+
+Upstreams come from ROUTER_UPSTREAMS (comma-separated base URLs).
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS = [u.strip().rstrip("/") for u in os.getenv("ROUTER_UPSTREAMS", "").split(",") if u.strip()]
+# How long to keep retrying a worker that refuses connections (e.g. during a rolling reload)
+ROUTER_RETRY_SECONDS = float(os.getenv("ROUTER_RETRY_SECONDS", "15"))
+ROUTER_TIMEOUT_SECONDS = float(os.getenv("ROUTER_TIMEOUT_SECONDS", "120"))
+
+# Hop-by-hop headers are per connection and must not be forwarded
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+def pick_upstream(session_id: str, upstreams: List[str]) -> str:
+    """Stable worker for a session: crc32 of the id modulo the worker count"""
+    return upstreams[zlib.crc32(session_id.encode("utf-8")) % len(upstreams)]
+
+def session_key(path: str, body: bytes) -> Optional[str]:
+    """Session id from /sessions/{id}/... paths or a JSON body's session_id"""
+    if path.startswith("/sessions/"):
+        return path.split("/")[2] or None
+    if path == "/chat" and body:
+        try:
+            return json.loads(body).get("session_id") or "default"
+        except (ValueError, AttributeError):
+            return None
+    return None
+
+def _forward_headers(headers) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS}
+
+def is_metrics(method: str, path: str) -> bool:
+    return method == "GET" and (path == "/metrics" or path.startswith("/metrics/"))
+
+METRIC_NAME = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+
+def with_worker_label(sample: str, worker: str) -> str:
+    """'name{a="b"} 1' -> 'name{worker="0",a="b"} 1'"""
+    name = METRIC_NAME.match(sample).group(0)
+    rest = sample[len(name):]
+    if rest.startswith("{}"):
+        rest = rest[2:]
+    if rest.startswith("{"):
+        return f'{name}{{worker="{worker}",{rest[1:]}'
+    return f'{name}{{worker="{worker}"}}{rest}'
+
+def merge_metrics(texts: Dict[str, str]) -> str:
+    """One Prometheus exposition from each worker's: HELP/TYPE once, then every worker's samples"""
+    headers: Dict[str, List[str]] = {}
+    samples: Dict[str, List[str]] = {}
+    for worker, text in texts.items():
+        family = ""
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            if line.startswith("#"):
+                parts = line.split(None, 3)
+                if len(parts) >= 3 and parts[1] in ("HELP", "TYPE"):
+                    family = parts[2]
+                    samples.setdefault(family, [])
+                    if line not in headers.setdefault(family, []):
+                        headers[family].append(line)
+                continue
+            samples.setdefault(family, []).append(with_worker_label(line, worker))
+    lines = []
+    for family, family_samples in samples.items():
+        lines.extend(headers.get(family, []))
+        lines.extend(family_samples)
+    return "\n".join(lines) + "\n"
+
+class SessionRouter:
+    def __init__(self, upstreams: List[str]):
+        if not upstreams:
+            raise ValueError("ROUTER_UPSTREAMS is empty")
+        self.upstreams = upstreams
+        self._round_robin = itertools.cycle(upstreams)
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(ROUTER_TIMEOUT_SECONDS, connect=2.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=200),
+        )
+
+    async def stop(self):
+        if self.client:
+            await self.client.aclose()
+
+    def choose(self, path: str, body: bytes) -> str:
+        key = session_key(path, body)
+        return pick_upstream(key, self.upstreams) if key else next(self._round_robin)
+
+    async def collect_metrics(self, request: Request):
+        """Ask every worker for the same metrics path; a worker that does not answer is left out"""
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        responses = await asyncio.gather(
+            *(self.client.get(upstream + path, headers=_forward_headers(request.headers)) for upstream in self.upstreams),
+            return_exceptions=True,
+        )
+        results = {}
+        for worker, (upstream, response) in enumerate(zip(self.upstreams, responses)):
+            if isinstance(response, httpx.Response) and response.status_code == 200:
+                results[str(worker)] = response
+            else:
+                logger.warning(f"No metrics from worker {upstream}: {response}")
+        if not results:
+            return JSONResponse({"detail": "Worker unavailable"}, status_code=503)
+        if request.url.path == "/metrics":
+            merged = merge_metrics({worker: response.text for worker, response in results.items()})
+            return PlainTextResponse(merged, media_type="text/plain; version=0.0.4")
+        return JSONResponse({"workers": {worker: response.json() for worker, response in results.items()}})
+
+    async def handle(self, request: Request):
+        if is_metrics(request.method, request.url.path):
+            return await self.collect_metrics(request)
+        body = await request.body()
+        upstream = self.choose(request.url.path, body)
+        url = upstream + request.url.path
+        if request.url.query:
+            url += "?" + request.url.query
+
+        upstream_request = self.client.build_request(
+            request.method, url, headers=_forward_headers(request.headers), content=body
+        )
+
+        # Connection refused means the request never reached the worker, so retrying is safe
+        deadline = time.monotonic() + ROUTER_RETRY_SECONDS
+        while True:
+            try:
+                response = await self.client.send(upstream_request, stream=True)
+                break
+            except httpx.ConnectError:
+                if time.monotonic() >= deadline:
+                    logger.error(f"Worker {upstream} unavailable")
+                    return JSONResponse({"detail": "Worker unavailable"}, status_code=503)
+                await asyncio.sleep(0.1)
+
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers=_forward_headers(response.headers),
+            background=BackgroundTask(response.aclose),
+        )
+
+router = SessionRouter(UPSTREAMS) if UPSTREAMS else None
+
+@asynccontextmanager
+async def lifespan(app):
+    await router.start()
+    logger.info(f"Routing sessions across {len(router.upstreams)} workers")
+    yield
+    await router.stop()
+
+async def proxy(request: Request):
+    return await router.handle(request)
+
+METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+
+app = Starlette(
+    routes=[Route("/{path:path}", proxy, methods=METHODS)],
+    lifespan=lifespan,
+)
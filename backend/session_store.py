@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# memory (single worker), sqlite (shared resort.db) or redis (REDIS_URL; needs the optional `pip install redis`)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(14 * 24 * 3600)))
+MAX_MEMORY_SESSIONS = 10000
+
+def encode_state(state: Dict) -> bytes:
+    """Compact serialization: minified JSON, zlib-compressed"""
+    return zlib.compress(json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+def decode_state(data: bytes) -> Dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+class SessionStore(ABC):
+    """Persists per-session state: messages, routing state, context and agent windows"""
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def save(self, session_id: str, state: Dict):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; only valid with a single worker"""
+
+    def __init__(self, max_sessions: int = MAX_MEMORY_SESSIONS):
+        self.max_sessions = max_sessions
+        self._states: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            state = self._states.get(session_id)
+            if state is not None:
+                self._states.move_to_end(session_id)
+            return state
+
+    def save(self, session_id: str, state: Dict):
+        with self._lock:
+            self._states[session_id] = state
+            self._states.move_to_end(session_id)
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in the chat_sessions table of the application database"""
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        from .database import SessionLocal
+        from .models import ChatSessionState
+
+        db = SessionLocal()
+        try:
+            row = db.query(ChatSessionState.data).filter(ChatSessionState.session_id == session_id).first()
+            return decode_state(row.data) if row else None
+        finally:
+            db.close()
+
+    def save(self, session_id: str, state: Dict):
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        from .database import engine
+        from .models import ChatSessionState
+
+        stmt = sqlite_insert(ChatSessionState.__table__).values(
+            session_id=session_id, data=encode_state(state), updated_at=datetime.now()
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["session_id"],
+            set_={"data": stmt.excluded.data, "updated_at": stmt.excluded.updated_at}
+        )
+        with engine.begin() as conn:
+            conn.execute(stmt)
+
+    def delete(self, session_id: str):
+        from sqlalchemy import delete
+        from .database import engine
+        from .models import ChatSessionState
+
+        with engine.begin() as conn:
+            conn.execute(delete(ChatSessionState.__table__).where(ChatSessionState.session_id == session_id))
+
+class RedisSessionStore(SessionStore):
+    """Sessions in Redis (or any client with Redis get/set/delete), expiring after SESSION_TTL_SECONDS"""
+
+    def __init__(self, client=None, url: str = REDIS_URL, prefix: str = "resort:session:",
+                 ttl: int = SESSION_TTL_SECONDS):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("SESSION_STORE=redis needs the redis package: pip install redis") from None
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        data = self.client.get(self.prefix + session_id)
+        return decode_state(data) if data else None
+
+    def save(self, session_id: str, state: Dict):
+        self.client.set(self.prefix + session_id, encode_state(state), ex=self.ttl)
+
+    def delete(self, session_id: str):
+        self.client.delete(self.prefix + session_id)
+
+def create_session_store(kind: str = SESSION_STORE) -> SessionStore:
+    """Build the store selected by SESSION_STORE"""
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    if kind == "redis":
+        return RedisSessionStore()
+    if kind != "memory":
+        logger.warning(f"Unknown SESSION_STORE '{kind}', using memory")
+    return InMemorySessionStore()
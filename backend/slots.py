@@ -0,0 +1,148 @@
+"""
+Slot filling: guest details pulled out of messages once and reused.
+
+extract_slots() finds the room number, guest name and party size in a
+guest message. AgentManager stores them in the session context, which
+every agent shares, and fill_tool_args() supplies them to tool calls
+that leave those arguments empty - so the model never has to ask again.
+The room number is the exception: tools that bill a room never get it
+from memory.
+"""
+
+import os
+import re
+from typing import Dict, Optional
+
+SLOT_FILLING_ENABLED = os.getenv("SLOT_FILLING", "1").lower() not in ("0", "false", "no")
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "a couple": 2, "couple": 2,
+}
+_COUNT = r"(\d{1,2}|one|two|three|four|five|six|seven|eight|nine|ten|a couple|couple)"
+
+# Not a room number when it is a year, or the digits run on into a date ("2026-03-01") or a price ("150 rupees")
+_ROOM = r"(?!(?:19|20)\d\d\b)(\d{3,4})\b(?![-/.,:]?\d|\s*(?:rs\b|rs\.|rupees?\b|inr\b|/-))"
+
+_ROOM_WORD = r"(?:room|rm|suite|villa|cottage)\.?\s*(?:no\.?|number|#)?\s*"
+# Only where the guest says the room is theirs or where something should go;
+# "where is room 101?" mentions a room without being the guest's
+ROOM_PATTERNS = [
+    re.compile(rf"\b(?:i'?m|i am|we'?re|we are|staying)\s+(?:in|at)\s+(?:the\s+)?(?:{_ROOM_WORD})?#?{_ROOM}", re.I),
+    re.compile(rf"\b(?:my|our)\s+{_ROOM_WORD}(?:is\s+)?#?{_ROOM}", re.I),
+    re.compile(rf"\b(?:to|for|from|in|at)\s+(?:the\s+)?{_ROOM_WORD}#?{_ROOM}", re.I),
+    re.compile(rf"^\W*{_ROOM_WORD}#?{_ROOM}", re.I),
+    re.compile(rf"{_ROOM_WORD}#?{_ROOM}\W*$", re.I),
+    re.compile(rf"\b(?i:this is)\s+(?:[A-Z][a-z]+\s+(?i:from|in)\s+)?(?i:{_ROOM_WORD})?#?{_ROOM}"),
+]
+# A sentence opening like this asks about a room rather than naming the guest's own
+QUESTION_START = re.compile(r"\s*(?:where|what|which|whose|who|how|when|why|is|are|does|do)\b", re.I)
+
+# Names only after an explicit cue: "I'm <Word>" is as often a mood or a diet as a name
+NAME_PATTERN = re.compile(
+    r"(?i:\bmy name is|\bmy name'?s|\bthe name'?s|\bunder the name(?: of)?|\bbook(?:ed|ing)?(?: it)? under|\bname\s*:)"
+    r"\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)"
+)
+# A reply that is just a name ("Priya Sharma", "It's Priya"), taken only when we asked for one
+NAME_PROMPT_PATTERN = re.compile(r"\b(?:your|guest'?s?|full) name\b|\bwhat name\b|\bname for the booking\b", re.I)
+NAME_ANSWER_PATTERN = re.compile(
+    r"^(?i:it'?s\s+|i'?m\s+|i am\s+|this is\s+)?([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\W*$"
+)
+
+PARTY_PATTERNS = [
+    re.compile(rf"\b{_COUNT}\s+(?:people|persons|guests|pax|of us)\b", re.I),
+    re.compile(rf"\b(?:party|table|group) (?:of|for)\s+{_COUNT}\b", re.I),
+    re.compile(rf"\b(?:we are|we're|there are|there will be)\s+{_COUNT}\b(?!\s+(?:night|day|room))", re.I),
+]
+MEMBER_PATTERN = re.compile(rf"\b{_COUNT}\s+(?:adults?|children|child|kids?)\b", re.I)
+
+# Tool argument → session slot it can be filled from. Never the room for orders and service
+# requests: those bill the room, so it has to come from the guest in that conversation turn
+TOOL_SLOTS = {
+    "check_room_availability": {"guests": "party_size"},
+    "hold_room": {"guests": "party_size", "guest_name": "guest_name"},
+    "confirm_booking": {"guest_name": "guest_name"},
+}
+
+def _count(value: str) -> int:
+    value = value.lower()
+    return int(value) if value.isdigit() else NUMBER_WORDS[value]
+
+def find_room(text: str) -> Optional[re.Match]:
+    """First mention of the guest's own room, skipping rooms asked about in questions"""
+    for pattern in ROOM_PATTERNS:
+        for match in pattern.finditer(text):
+            sentence_start = max(text.rfind(mark, 0, match.start()) for mark in ".?!\n") + 1
+            if not QUESTION_START.match(text, sentence_start):
+                return match
+    return None
+
+def extract_room_number(text: str) -> Optional[str]:
+    match = find_room(text)
+    return match.group(1) if match else None
+
+def extract_guest_name(text: str, previous_reply: str = "") -> Optional[str]:
+    match = NAME_PATTERN.search(text)
+    if not match and NAME_PROMPT_PATTERN.search(previous_reply or ""):
+        match = NAME_ANSWER_PATTERN.match(text.strip())
+    return match.group(1) if match else None
+
+def extract_party_size(text: str) -> Optional[int]:
+    members = MEMBER_PATTERN.findall(text)
+    if members:
+        return sum(_count(m) for m in members)
+    for pattern in PARTY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return _count(match.group(1))
+    return None
+
+# A bare number answering "what's your room number?"
+BARE_ROOM_PATTERN = re.compile(rf"^\D{{0,20}}?#?{_ROOM}\D{{0,40}}$")
+# A reply that mentions a room but refuses it ("no, not 204", "dont send to 204!")
+NEGATION_PATTERN = re.compile(r"\b(?:no|nope|nah|not|never|dont|don't|do not|cancel|stop|wrong|wait)\b|n't\b", re.I)
+
+# A short yes to "shall I send it to room 204?"
+AFFIRMATIVE_PATTERN = re.compile(
+    r"^\W*(?:yes|yeah|yep|yup|sure|ok|okay|correct|confirm(?:ed)?|right|go ahead|please do|"
+    r"that'?s (?:right|correct)|y)\b[^?]{0,30}$", re.I
+)
+
+def is_refusal(text: str) -> bool:
+    return bool(NEGATION_PATTERN.search(text or ""))
+
+def is_affirmative(text: str) -> bool:
+    return bool(AFFIRMATIVE_PATTERN.match((text or "").strip())) and not is_refusal(text)
+
+def room_answer(text: str) -> Optional[str]:
+    """Room number given in reply to "what's your room number?", unless the reply refuses it"""
+    if is_refusal(text):
+        return None
+    match = BARE_ROOM_PATTERN.match((text or "").strip())
+    return match.group(1) if match else None
+
+def extract_slots(text: str, previous_reply: str = "") -> Dict:
+    """Room number, guest name and party size mentioned in a guest message"""
+    if not text:
+        return {}
+    room_number = extract_room_number(text)
+    if not room_number and "room number" in (previous_reply or "").lower():
+        room_number = room_answer(text)
+    slots = {
+        "room_number": room_number,
+        "guest_name": extract_guest_name(text, previous_reply),
+        "party_size": extract_party_size(text),
+    }
+    return {slot: value for slot, value in slots.items() if value}
+
+def fill_tool_args(func_name: str, args: Dict, context: Dict) -> Dict:
+    """Tool arguments with empty slots filled from the session context"""
+    filled = dict(args)
+    for arg, slot in TOOL_SLOTS.get(func_name, {}).items():
+        if not filled.get(arg) and context.get(slot):
+            filled[arg] = context[slot]
+    return filled
+
+def slots_from_tool_args(func_name: str, args: Dict) -> Dict:
+    """Slots the model supplied itself, so later tools reuse them"""
+    return {slot: args[arg] for arg, slot in TOOL_SLOTS.get(func_name, {}).items() if args.get(arg)}
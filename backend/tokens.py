@@ -0,0 +1,10 @@
+import math
+
+# Rough average for English text with Gemini/SentencePiece tokenizers
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used for budgeting prompt content"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -1,9 +1,13 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-import random
+import os
 import logging
 from .models import MenuItem, Order, ServiceRequest
 from .database import SessionLocal
+from . import availability, idempotency, pricing, reservations, write_queue
+from .tokens import estimate_tokens
+from .knowledge_base import get_knowledge_base
 
 logger = logging.getLogger(__name__)
 
@@ -14,41 +18,67 @@ def get_db_session():
     except:
         return None
 
+def save_record(db: Session, record):
+    """Insert a new record, through the group-commit writer when it is running"""
+    writer = write_queue.get_writer()
+    if writer:
+        return writer.submit(record)
+    
+    db.add(record)
+    db.commit()
+    return record
+
 # --- Receptionist Tools ---
-def check_room_availability(room_type: str = None) -> str:
-    """Check room availability"""
+CHECK_IN_OUT_TIMES = "Check-in: 2:00 PM, Check-out: 11:00 AM"
+
+def _format_stay(check_in, check_out) -> str:
+    nights = (check_out - check_in).days
+    return f"{check_in:%b %d} → {check_out:%b %d}, {nights} night{'s' if nights != 1 else ''}"
+
+def check_room_availability(room_type: str = None, check_in: str = None, check_out: str = None,
+                            guests: int = 1) -> str:
+    """Check room availability for a stay (defaults to tonight) from the occupancy index"""
     try:
-        if room_type:
-            room_type = room_type.lower()
-            
-            room_data = {
-                "deluxe": {"price": 250, "available": random.choice([True, True, False])},
-                "suite": {"price": 500, "available": random.choice([True, False, False])},
-                "standard": {"price": 150, "available": random.choice([True, True, True])},
-                "premium": {"price": 350, "available": random.choice([True, True, False])}
-            }
-            
-            matched_type = "standard"
-            for key in room_data:
-                if key in room_type:
-                    matched_type = key
-                    break
-            
-            data = room_data.get(matched_type, room_data["standard"])
+        try:
+            start, end = availability.parse_stay(check_in, check_out)
+        except ValueError as e:
+            return f"❌ {e} Please give dates as YYYY-MM-DD."
+        
+        index = availability.get_availability_index()
+        if not index.rooms:
+            return "⚠️ Room inventory is not set up yet. Please contact the front desk."
+        
+        guests = max(1, int(guests or 1))
+        summary = index.summary(start, end, guests)
+        prices = pricing.get_price_table()
+        quotes = {name: prices.quote(name, start, end) for name in summary}
+        stay = _format_stay(start, end)
+        matched_type = availability.match_room_type(room_type, index.by_type)
+        
+        if matched_type:
+            data = summary[matched_type]
+            quote = quotes[matched_type]
+            if data["free"]:
+                total = f", ₹{quote['total']:.0f} total" if quote["nights"] > 1 else ""
+                return (f"✅ {matched_type.capitalize()} rooms available for {stay} "
+                        f"at ₹{quote['average_nightly_rate']}/night{total} ({data['free']} left).")
             
-            if data["available"]:
-                return f"✅ {matched_type.capitalize()} rooms available at ₹{data['price']}/night."
+            alternatives = [name.capitalize() for name, d in summary.items() if d["free"]]
+            if data["capacity"] < guests:
+                message = f"❌ {matched_type.capitalize()} rooms sleep up to {data['capacity']} guests."
             else:
-                return f"❌ {matched_type.capitalize()} rooms are currently full."
+                message = f"❌ {matched_type.capitalize()} rooms are full for {stay}."
+            if alternatives:
+                message += f" Available instead: {', '.join(alternatives)}."
+            return message
         
-        else:
-            return """🏨 **Room Availability:**
-• Standard: ₹150/night (Available)
-• Deluxe: ₹250/night (Available) 
-• Premium: ₹350/night (Limited)
-• Suite: ₹500/night (Full)
-
-Check-in: 2:00 PM, Check-out: 11:00 AM"""
+        lines = [f"🏨 **Room Availability** ({stay}):"]
+        for name, data in summary.items():
+            status = f"{data['free']} of {data['total']} free" if data["free"] else "Full"
+            lines.append(f"• {name.capitalize()}: ₹{quotes[name]['average_nightly_rate']}/night ({status})")
+        lines.append("")
+        lines.append(CHECK_IN_OUT_TIMES)
+        return "\n".join(lines)
             
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -75,6 +105,11 @@ def get_facility_info(facility_name: str) -> str:
             if key in facility_name:
                 return value
         
+        # Anything else: best match from the resort knowledge base
+        results = get_knowledge_base().search(facility_name, limit=1)
+        if results:
+            return results[0]["text"]
+        
         # If not found, list available facilities
         return f"Facilities: {', '.join(facilities.keys())}. Which one?"
         
@@ -82,9 +117,146 @@ def get_facility_info(facility_name: str) -> str:
         logger.error(f"Error: {e}")
         return "Unable to get facility information."
 
+def search_resort_info(query: str, limit: int = 3) -> str:
+    """Resort policies and facilities matching a question, from the local knowledge base"""
+    try:
+        results = get_knowledge_base().search(query, limit=limit)
+        if not results:
+            return "No resort information found for that. Please ask the front desk."
+        return "\n".join(f"• **{r['title']}**: {r['text']}" for r in results)
+    except Exception as e:
+        logger.error(f"Error searching resort info: {e}")
+        return "Unable to search resort information."
+
+def hold_room(room_type: str, check_in: str = None, check_out: str = None, guests: int = 1,
+              guest_name: str = None, session_id: str = None) -> str:
+    """Hold a room of the given type for the stay while the guest confirms"""
+    try:
+        try:
+            start, end = availability.parse_stay(check_in, check_out)
+        except ValueError as e:
+            return f"❌ {e} Please give dates as YYYY-MM-DD."
+        
+        index = availability.get_availability_index()
+        matched_type = availability.match_room_type(room_type, index.by_type)
+        if not matched_type:
+            return f"❌ Unknown room type. Choose from: {', '.join(t.capitalize() for t in index.by_type)}."
+        
+        booking = reservations.create_hold(matched_type, start, end, max(1, int(guests or 1)), guest_name, session_id)
+        return f"""⏳ **Room Held** (Hold #{booking['id']})
+🏨 Room {booking['room_number']} ({matched_type.capitalize()})
+📅 {_format_stay(start, end)}
+💰 Total: ₹{booking['total_amount']:.0f}
+Please confirm within {reservations.HOLD_MINUTES:.0f} minutes to keep this room."""
+    
+    except reservations.BookingError as e:
+        return f"❌ {e}"
+    except Exception as e:
+        logger.error(f"Error holding room: {e}")
+        return "Unable to hold a room right now. Please try again."
+
+def confirm_booking(hold_id: int, guest_name: str = None, session_id: str = None) -> str:
+    """Confirm a held room"""
+    try:
+        booking = reservations.confirm_hold(int(hold_id), session_id, guest_name)
+        return f"""✅ **Booking Confirmed!**
+📋 Booking #{booking['id']} for {booking['guest_name'] or 'Guest'}
+🏨 Room {booking['room_number']} ({booking['room_type'].capitalize()})
+📅 {_format_stay(booking['check_in'], booking['check_out'])}
+💰 Total: ₹{booking['total_amount']:.0f}
+{CHECK_IN_OUT_TIMES}"""
+    
+    except reservations.BookingError as e:
+        return f"❌ {e}"
+    except Exception as e:
+        logger.error(f"Error confirming booking: {e}")
+        return "Unable to confirm the booking right now. Please try again."
+
 # --- Restaurant Tools ---
-def get_menu_items(compact: bool = False, category: str = None) -> str:
-    """Get menu"""
+MENU_TOKEN_BUDGET = int(os.getenv("MENU_TOKEN_BUDGET", "250"))
+
+def _group_by_category(items) -> dict:
+    """Group menu items by category, preserving order"""
+    categories = {}
+    for item in items:
+        categories.setdefault(item.category or "Other", []).append(item)
+    return categories
+
+def _match_categories(categories, category: str) -> list:
+    """Resolve a requested category: exact, then prefix, then substring match (case-insensitive)"""
+    wanted = category.lower().strip()
+    for matches in (lambda cat: cat == wanted, lambda cat: cat.startswith(wanted), lambda cat: wanted in cat):
+        matched = [cat for cat in categories if matches(cat.lower())]
+        if matched:
+            return matched
+    return []
+
+def _render_menu_rich(items, compact: bool = False) -> str:
+    """Menu formatted for guests (markdown, descriptions)"""
+    categories = _group_by_category(items)
+    
+    if compact:
+        menu_text = "🍽️ **Popular Items:**\n\n"
+        
+        for cat in ["Breakfast", "Main Course", "Drinks"]:
+            if cat in categories:
+                menu_text += f"**{cat}:**\n"
+                for item in categories[cat][:3]:
+                    menu_text += f"• {item.name} - ₹{item.price}\n"
+                menu_text += "\n"
+        
+        menu_text += "💚 *Say 'full menu' for complete menu*"
+        return menu_text
+    
+    menu_text = "🍽️ **RESTAURANT MENU** 🍽️\n\n"
+    
+    for cat, cat_items in categories.items():
+        menu_text += f"════════════════════\n**{cat.upper()}**\n════════════════════\n\n"
+        for item in cat_items:
+            menu_text += f"• **{item.name}** - ₹{item.price}\n"
+            if item.description:
+                menu_text += f"  _{item.description}_\n"
+            menu_text += "\n"
+    
+    menu_text += "💚 *Compostable packaging* | 📞 *Extension 2*"
+    return menu_text
+
+def _render_menu_for_llm(items, page: int = 1, token_budget: int = MENU_TOKEN_BUDGET, category: str = None) -> str:
+    """
+    Menu formatted for the model: one plain line per category, no
+    descriptions or markup, split into pages that fit the token budget.
+    """
+    # Greedily pack items into pages of at most token_budget tokens
+    pages = [{}]
+    used = 0
+    for item in items:
+        cat = item.category or "Other"
+        entry = f"{item.name} ₹{item.price:g}"
+        cost = estimate_tokens(entry + "; ")
+        header = 0 if cat in pages[-1] else estimate_tokens(f"{cat}: \n")
+        if used + header + cost > token_budget and pages[-1]:
+            pages.append({})
+            used = 0
+            header = estimate_tokens(f"{cat}: \n")
+        pages[-1].setdefault(cat, []).append(entry)
+        used += header + cost
+    pages = [[f"{cat}: {'; '.join(entries)}" for cat, entries in p.items()] for p in pages]
+    
+    page = max(1, min(page, len(pages)))
+    text = f"Menu page {page}/{len(pages)}\n" + "\n".join(pages[page - 1])
+    if page < len(pages):
+        scope = f"category='{category}', " if category else ""
+        text += f"\nMore: get_menu_items({scope}page={page + 1})"
+    return text
+
+def get_menu_items(compact: bool = False, category: str = None, page: int = 1,
+                   style: str = "rich", token_budget: int = None) -> str:
+    """
+    Get menu.
+    
+    style="rich" renders for guests; style="llm" renders a compact,
+    token-budgeted page for the model (see MENU_TOKEN_BUDGET).
+    """
     db = get_db_session()
     if not db:
         return "🍽️ Menu unavailable. Please contact restaurant."
@@ -95,48 +267,16 @@ def get_menu_items(compact: bool = False, category: str = None) -> str:
         if not items:
             return "🍽️ Menu is being updated. Please check back."
         
-        if compact:
-            menu_text = "🍽️ **Popular Items:**\n\n"
-            
-            # Group by category
-            categories = {}
-            for item in items:
-                cat = item.category or "Other"
-                if cat not in categories:
-                    categories[cat] = []
-                categories[cat].append(item)
-            
-            for cat in ["Breakfast", "Main Course", "Drinks"]:
-                if cat in categories:
-                    menu_text += f"**{cat}:**\n"
-                    for item in categories[cat][:3]:
-                        menu_text += f"• {item.name} - ₹{item.price}\n"
-                    menu_text += "\n"
-            
-            menu_text += "💚 *Say 'full menu' for complete menu*"
-            return menu_text
+        if category:
+            categories = _group_by_category(items)
+            matched = _match_categories(categories, category)
+            if not matched:
+                return f"No '{category}' category. Categories: {', '.join(categories)}"
+            items = [item for cat in matched for item in categories[cat]]
         
-        else:
-            menu_text = "🍽️ **RESTAURANT MENU** 🍽️\n\n"
-            
-            # Group by category
-            categories = {}
-            for item in items:
-                cat = item.category or "Other"
-                if cat not in categories:
-                    categories[cat] = []
-                categories[cat].append(item)
-            
-            for cat, cat_items in categories.items():
-                menu_text += f"════════════════════\n**{cat.upper()}**\n════════════════════\n\n"
-                for item in cat_items:
-                    menu_text += f"• **{item.name}** - ₹{item.price}\n"
-                    if item.description:
-                        menu_text += f"  _{item.description}_\n"
-                    menu_text += "\n"
-            
-            menu_text += "💚 *Compostable packaging* | 📞 *Extension 2*"
-            return menu_text
+        if style == "llm":
+            return _render_menu_for_llm(items, int(page or 1), token_budget or MENU_TOKEN_BUDGET, category)
+        return _render_menu_rich(items, compact)
             
     except Exception as e:
         logger.error(f"Error: {e}")
@@ -144,8 +284,51 @@ def get_menu_items(compact: bool = False, category: str = None) -> str:
     finally:
         db.close()
 
-def place_restaurant_order(room_number: str, items_dict: dict) -> str:
-    """Place food order"""
+def search_menu(query: str, limit: int = 5) -> str:
+    """Search the menu for dishes matching a free-text request"""
+    from .menu_search import search_menu_items
+    
+    try:
+        limit = max(1, min(int(limit or 5), 20))
+        results = search_menu_items(query, limit)
+        
+        if not results:
+            return f"🔎 No menu items match '{query}'."
+        
+        lines = [f"🔎 Top matches for '{query}':"]
+        for item in results:
+            line = f"• {item['name']} - ₹{item['price']} ({item['category'] or 'Other'})"
+            if item["description"]:
+                line += f": {item['description']}"
+            lines.append(line)
+        return "\n".join(lines)
+        
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return "🔎 Unable to search the menu."
+
+def _format_order_confirmation(order: Order, duplicate: bool = False) -> str:
+    """Build the order confirmation message"""
+    items_text = "\n".join([f"• {item['quantity']}x {item['name']} - ₹{item['total']}" for item in order.items])
+    header = "✅ **ORDER ALREADY PLACED**" if duplicate else "✅ **ORDER PLACED!**"
+    
+    return f"""{header}
+        
+📋 Order #{order.id}
+🏨 Room {order.room_number}
+💰 Total: ₹{order.total_amount}
+
+**Items:**
+{items_text}
+
+⏰ Delivery: 20-30 minutes
+💚 Compostable packaging used
+        
+Thank you for ordering!"""
+
+def place_restaurant_order(room_number: str, items_dict: dict, session_id: str = None,
+                           idempotency_key: str = None) -> str:
+    """Place food order (duplicate submissions return the original order)"""
     db = get_db_session()
     if not db:
         return "❌ Unable to place order. Please try again."
@@ -161,6 +344,21 @@ def place_restaurant_order(room_number: str, items_dict: dict) -> str:
         if not items_dict:
             return "❌ No items specified."
         
+        # Return the original order for retries and double submissions
+        keys = idempotency.order_keys(session_id, room_number, items_dict, idempotency_key)
+        existing_id = idempotency.lookup(idempotency.order_cache, keys)
+        if existing_id is not None:
+            existing = db.query(Order).filter(Order.id == existing_id).first()
+        else:
+            # Stored by another worker or before a restart, possibly under the previous window's key
+            existing = db.query(Order).filter(Order.idempotency_key.in_(keys)).first()
+            if existing:
+                # Under the key it was stored with, so the dedupe window never slides past the original
+                idempotency.order_cache.put(existing.idempotency_key, existing.id)
+        if existing:
+            logger.info(f"Duplicate order submission, returning order #{existing.id}")
+            return _format_order_confirmation(existing, duplicate=True)
+        
         # Find menu items
         valid_items = []
         total = 0
@@ -186,28 +384,24 @@ def place_restaurant_order(room_number: str, items_dict: dict) -> str:
             items=valid_items,
             total_amount=total,
             status="Pending",
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            idempotency_key=keys[0]
         )
         
-        db.add(order)
-        db.commit()
-        
-        # Build response
-        items_text = "\n".join([f"• {item['quantity']}x {item['name']} - ₹{item['total']}" for item in valid_items])
-        
-        return f"""✅ **ORDER PLACED!**
-        
-📋 Order #{order.id}
-🏨 Room {room_number}
-💰 Total: ₹{total}
-
-**Items:**
-{items_text}
-
-⏰ Delivery: 20-30 minutes
-💚 Compostable packaging used
+        try:
+            order = save_record(db, order)
+        except IntegrityError:
+            # Another submission with the same key won the race
+            db.rollback()
+            existing = db.query(Order).filter(Order.idempotency_key.in_(keys)).first()
+            if not existing:
+                raise
+            idempotency.order_cache.put(existing.idempotency_key, existing.id)
+            logger.info(f"Duplicate order submission, returning order #{existing.id}")
+            return _format_order_confirmation(existing, duplicate=True)
         
-Thank you for ordering!"""
+        idempotency.order_cache.put(keys[0], order.id)
+        return _format_order_confirmation(order)
         
     except Exception as e:
         db.rollback()
@@ -217,8 +411,33 @@ Thank you for ordering!"""
         db.close()
 
 # --- Room Service Tools ---
-def create_room_service_request(room_number: str, request_type: str, details: str = "") -> str:
-    """Create service request"""
+def _format_request_confirmation(request: ServiceRequest, duplicate: bool = False) -> str:
+    """Build the service request confirmation message"""
+    # Eco message based on request type
+    eco_msg = ""
+    request_lower = request.request_type.lower()
+    if "clean" in request_lower:
+        eco_msg = "💚 Using plant-based cleaners"
+    elif "towel" in request_lower:
+        eco_msg = "💚 Towel reuse saves water"
+    
+    header = "✅ **SERVICE ALREADY REQUESTED**" if duplicate else "✅ **SERVICE REQUESTED**"
+    
+    return f"""{header}
+        
+📋 Request #{request.id}
+🏨 Room {request.room_number}
+🔧 {request.request_type}
+📝 {request.details if request.details else 'Standard request'}
+
+{eco_msg}
+⏰ ETA: 30 minutes
+        
+Thank you!"""
+
+def create_room_service_request(room_number: str, request_type: str, details: str = "",
+                                session_id: str = None, idempotency_key: str = None) -> str:
+    """Create service request (duplicate submissions return the original request)"""
     db = get_db_session()
     if not db:
         return "❌ Unable to create request. Please try again."
@@ -234,41 +453,49 @@ def create_room_service_request(room_number: str, request_type: str, details: st
         if not request_type or not request_type.strip():
             return "❌ Please specify request type."
         
+        # Return the original request for retries and double submissions
+        keys = idempotency.request_keys(session_id, room_number, request_type, details, idempotency_key)
+        existing_id = idempotency.lookup(idempotency.request_cache, keys)
+        if existing_id is not None:
+            existing = db.query(ServiceRequest).filter(ServiceRequest.id == existing_id).first()
+        else:
+            # Stored by another worker or before a restart, possibly under the previous window's key
+            existing = db.query(ServiceRequest).filter(ServiceRequest.idempotency_key.in_(keys)).first()
+            if existing:
+                # Under the key it was stored with, so the dedupe window never slides past the original
+                idempotency.request_cache.put(existing.idempotency_key, existing.id)
+        if existing:
+            logger.info(f"Duplicate service request, returning request #{existing.id}")
+            return _format_request_confirmation(existing, duplicate=True)
+        
         # Create request
         request = ServiceRequest(
             room_number=room_number,
             request_type=request_type,
             details=details[:200] if details else None,
             status="Pending",
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            idempotency_key=keys[0]
         )
         
-        db.add(request)
-        db.commit()
-        
-        # Eco message based on request type
-        eco_msg = ""
-        request_lower = request_type.lower()
-        if "clean" in request_lower:
-            eco_msg = "💚 Using plant-based cleaners"
-        elif "towel" in request_lower:
-            eco_msg = "💚 Towel reuse saves water"
-        
-        return f"""✅ **SERVICE REQUESTED**
-        
-📋 Request #{request.id}
-🏨 Room {room_number}
-🔧 {request_type}
-📝 {details if details else 'Standard request'}
-
-{eco_msg}
-⏰ ETA: 30 minutes
+        try:
+            request = save_record(db, request)
+        except IntegrityError:
+            # Another submission with the same key won the race
+            db.rollback()
+            existing = db.query(ServiceRequest).filter(ServiceRequest.idempotency_key.in_(keys)).first()
+            if not existing:
+                raise
+            idempotency.request_cache.put(existing.idempotency_key, existing.id)
+            logger.info(f"Duplicate service request, returning request #{existing.id}")
+            return _format_request_confirmation(existing, duplicate=True)
         
-Thank you!"""
+        idempotency.request_cache.put(keys[0], request.id)
+        return _format_request_confirmation(request)
         
     except Exception as e:
         db.rollback()
         logger.error(f"Request error: {e}")
         return f"❌ Request failed: {str(e)[:50]}"
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,282 @@
+"""
+Request tracing and Prometheus metrics, without extra dependencies.
+
+Every HTTP request gets a request id (X-Request-ID, echoed back) and a
+root span; code inside wraps interesting steps in span("name") and
+SQLAlchemy queries are timed through engine events. Span durations feed
+Prometheus histograms served by GET /metrics.
+
+With TRACE_EXPORT_PATH set, finished spans are also written there as
+OTLP/JSON (one ExportTraceServiceRequest per line) for offline analysis
+in any OpenTelemetry-compatible tool. Without it, a span costs two clock
+reads and a histogram update - no ids, no context bookkeeping.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+# Share of requests whose spans are exported (histograms always see every span)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_FLUSH_SECONDS = 2.0
+TRACE_MAX_BUFFERED_SPANS = 10000
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "resort-backend")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+# (trace id, current span id) while the request is sampled for export
+_trace_var: contextvars.ContextVar[Optional[Tuple[str, Optional[str]]]] = contextvars.ContextVar("trace", default=None)
+
+def current_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+class Histogram:
+    """Prometheus histogram with a fixed label set per series"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # per-bucket counts (non-cumulative, last slot is +Inf), sum, count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total:.6f}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+span_duration = Histogram("resort_span_duration_seconds", "Time spent in traced steps", ("span",))
+http_duration = Histogram("resort_http_request_duration_seconds", "HTTP request latency",
+                          ("method", "route", "status"))
+db_duration = Histogram("resort_db_query_duration_seconds", "SQL statement latency", ("operation",))
+
+class SpanExporter:
+    """Buffers finished spans and appends them to a file as OTLP/JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._spans: List[Dict] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def add(self, span: Dict):
+        with self._lock:
+            if len(self._spans) >= TRACE_MAX_BUFFERED_SPANS:
+                self.dropped += 1
+                return
+            self._spans.append(span)
+
+    def flush(self):
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        batch = {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "backend.tracing"}, "spans": spans}],
+        }]}
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(batch, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.error(f"Could not write traces to {self.path}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(TRACE_FLUSH_SECONDS):
+            self.flush()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+def _attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+exporter: Optional[SpanExporter] = SpanExporter(TRACE_EXPORT_PATH) if TRACE_EXPORT_PATH else None
+
+@contextmanager
+def span(name: str, kind: int = 1, **attributes):
+    """Time a step; exported as a child of the current span when the request is sampled"""
+    trace = _trace_var.get() if exporter else None
+    start = time.perf_counter()
+    if trace is None:
+        try:
+            yield
+        finally:
+            span_duration.observe((name,), time.perf_counter() - start)
+        return
+
+    trace_id, parent_id = trace
+    span_id = uuid.uuid4().hex[:16]
+    token = _trace_var.set((trace_id, span_id))
+    start_ns = time.time_ns()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _trace_var.reset(token)
+        span_duration.observe((name,), duration)
+        _export(trace_id, span_id, parent_id, name, kind, start_ns, duration, attributes, error)
+
+def _export(trace_id: str, span_id: str, parent_id: Optional[str], name: str, kind: int, start_ns: int,
+            duration: float, attributes: Dict, error: Optional[BaseException] = None):
+    if error is not None:
+        attributes["error.type"] = type(error).__name__
+    exporter.add({
+        "traceId": trace_id,
+        "spanId": span_id,
+        **({"parentSpanId": parent_id} if parent_id else {}),
+        "name": name,
+        "kind": kind,
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(start_ns + int(duration * 1e9)),
+        "attributes": [_attribute(k, v) for k, v in attributes.items() if v is not None],
+        "status": {"code": 2 if error is not None else 0},
+    })
+
+def traced(name: str):
+    """Decorator form of span()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class TracingMiddleware:
+    """ASGI middleware: request id, root span and HTTP latency histogram"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        id_token = request_id_var.set(request_id)
+        trace_token = None
+        if exporter and random.random() < TRACE_SAMPLE_RATE:
+            trace_id = request_id if re.fullmatch(r"[0-9a-f]{32}", request_id) else uuid.uuid4().hex
+            span_id = uuid.uuid4().hex[:16]
+            trace_token = _trace_var.set((trace_id, span_id))
+            start_ns = time.time_ns()
+
+        status = {"code": 500}
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            # Name by route template (/bookings/{booking_id}), not the raw path, to bound cardinality
+            route_path = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_duration.observe((scope["method"], route_path, str(status["code"])), duration)
+            if trace_token is not None:
+                _trace_var.reset(trace_token)
+                _export(trace_id, span_id, None, f"{scope['method']} {route_path}", 2, start_ns, duration,
+                        {"http.request_id": request_id, "http.target": scope["path"],
+                         "http.status_code": status["code"]}, error)
+            request_id_var.reset(id_token)
+
+def instrument_engine(engine):
+    """Time every SQL statement run through a SQLAlchemy engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        operation = statement.lstrip()[:8].split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_duration.observe((operation,), duration)
+        trace = _trace_var.get() if exporter else None
+        if trace is not None:
+            end_ns = time.time_ns()
+            trace_id, parent_id = trace
+            _export(trace_id, uuid.uuid4().hex[:16], parent_id, f"db.{operation.lower()}", 3,
+                    end_ns - int(duration * 1e9), duration, {"db.system": "sqlite", "db.statement": statement[:500]})
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    """Prometheus text exposition of all histograms plus extra pre-rendered lines"""
+    lines = []
+    for histogram in (http_duration, span_duration, db_duration):
+        lines.extend(histogram.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+def stop_exporter():
+    if exporter:
+        exporter.stop()
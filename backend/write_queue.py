@@ -0,0 +1,141 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy.orm import Session
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "").lower() in ("1", "true", "yes")
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "100"))
+WRITE_QUEUE_MAX_LATENCY_MS = float(os.getenv("WRITE_QUEUE_MAX_LATENCY_MS", "10"))
+
+_STOP = object()
+
+class WriteQueue:
+    """
+    Background writer that group-commits inserts.
+
+    Callers block on submit() until the batch containing their row is
+    committed, so each one still gets its own id or its own error.
+    """
+
+    def __init__(self, max_batch: int = WRITE_QUEUE_MAX_BATCH, max_latency_ms: float = WRITE_QUEUE_MAX_LATENCY_MS):
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self.batches = 0
+        self.rows = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+        logger.info(f"Write queue started (batch={self.max_batch}, latency={self.max_latency * 1000:.0f}ms)")
+
+    def stop(self, timeout: float = 5.0):
+        """Flush pending writes and stop the writer thread"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        logger.info(f"Write queue stopped ({self.rows} rows in {self.batches} batches)")
+
+    def submit(self, record, timeout: float = 5.0):
+        """Queue a new ORM object and wait until it is committed"""
+        if not self._running:
+            raise RuntimeError("Write queue is not running")
+        future = Future()
+        self._queue.put((record, future))
+        return future.result(timeout)
+
+    def _run(self):
+        # A dedicated connection: callers waiting in submit() may hold the rest of the pool
+        self._conn = engine.connect()
+        try:
+            self._loop()
+        finally:
+            self._conn.close()
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # Collect more rows until the batch is full or the latency budget is spent
+            batch = [item]
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+
+    def _commit(self, batch):
+        # Keep attributes loaded after commit so callers can read ids from detached rows
+        db = Session(bind=self._conn, autoflush=False, expire_on_commit=False)
+        try:
+            db.add_all([record for record, _ in batch])
+            db.commit()
+            self.batches += 1
+            self.rows += len(batch)
+            for record, future in batch:
+                future.set_result(record)
+        except Exception as e:
+            # One bad row (e.g. a duplicate idempotency key) must not fail the others
+            db.rollback()
+            logger.warning(f"Batch commit failed, retrying {len(batch)} rows individually: {e}")
+            for record, future in batch:
+                try:
+                    db.add(record)
+                    db.commit()
+                    # Detach now so a later rollback cannot expire this row
+                    db.expunge(record)
+                    self.batches += 1
+                    self.rows += 1
+                    future.set_result(record)
+                except Exception as row_error:
+                    db.rollback()
+                    future.set_exception(row_error)
+        finally:
+            db.close()
+
+_writer = None
+
+def start_writer(max_batch: int = WRITE_QUEUE_MAX_BATCH, max_latency_ms: float = WRITE_QUEUE_MAX_LATENCY_MS) -> WriteQueue:
+    """Start the shared background writer"""
+    global _writer
+    if _writer is None:
+        _writer = WriteQueue(max_batch, max_latency_ms)
+        _writer.start()
+    return _writer
+
+def stop_writer():
+    """Flush and stop the shared background writer"""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+def get_writer():
+    """Return the running writer, or None when writes commit inline"""
+    return _writer
+
+atexit.register(stop_writer)
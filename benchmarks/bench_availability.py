@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Availability query latency over a year of bookings: occupancy-bitmap
+index versus the equivalent overlap query against the bookings table.
+Run with: python benchmarks/bench_availability.py [rooms] [queries]
+"""
+
+import os
+import sys
+import random
+import tempfile
+import time
+import logging
+from datetime import date, timedelta
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+logging.disable(logging.WARNING)
+
+from sqlalchemy import func
+from backend.database import SessionLocal, engine, init_db
+from backend.models import Room, Booking
+from backend.availability import AvailabilityIndex
+
+ROOM_TYPES = [("standard", 150, 2), ("deluxe", 250, 2), ("premium", 350, 3), ("suite", 500, 4)]
+
+def populate(room_count):
+    """room_count rooms, each booked back to back for the next year with random 1-7 night stays"""
+    rng = random.Random(7)
+    rooms = [
+        {"room_number": str(1000 + i), "room_type": ROOM_TYPES[i % 4][0],
+         "nightly_rate": ROOM_TYPES[i % 4][1], "capacity": ROOM_TYPES[i % 4][2]}
+        for i in range(room_count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Room.__table__.insert(), rooms)
+        room_ids = dict(conn.execute(Room.__table__.select().with_only_columns(Room.room_number, Room.id)).all())
+
+    bookings = []
+    today = date.today()
+    for room in rooms:
+        day = today + timedelta(days=rng.randint(0, 3))
+        while day < today + timedelta(days=365):
+            nights = rng.randint(1, 7)
+            if rng.random() < 0.7:
+                bookings.append({
+                    "room_id": room_ids[room["room_number"]], "room_number": room["room_number"],
+                    "guest_name": "Guest", "guests": 1, "check_in": day,
+                    "check_out": day + timedelta(days=nights), "status": "Confirmed",
+                })
+            day += timedelta(days=nights)
+    with engine.begin() as conn:
+        conn.execute(Booking.__table__.insert(), bookings)
+    return len(bookings)
+
+def sql_summary(db, check_in, check_out):
+    """Same answer as AvailabilityIndex.summary() via an overlap query"""
+    busy = db.query(Booking.room_id).filter(
+        Booking.status == "Confirmed",
+        Booking.check_in < check_out,
+        Booking.check_out > check_in
+    )
+    rows = db.query(Room.room_type, func.count(Room.id)).filter(~Room.id.in_(busy)).group_by(Room.room_type)
+    return dict(rows.all())
+
+def timed(label, fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(*q)
+    per_query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{label:<28} {per_query_ms * 1000:9.1f} µs/query")
+    return per_query_ms
+
+def main():
+    room_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    init_db()
+    booking_count = populate(room_count)
+    print(f"{room_count} rooms, {booking_count} bookings over the next year\n")
+
+    start = time.perf_counter()
+    index = AvailabilityIndex.from_db()
+    print(f"{'index build':<28} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+    rng = random.Random(1)
+    today = date.today()
+    queries = []
+    for _ in range(query_count):
+        check_in = today + timedelta(days=rng.randint(0, 360))
+        queries.append((check_in, check_in + timedelta(days=rng.randint(1, 14))))
+
+    # Both paths must agree before timing means anything
+    db = SessionLocal()
+    for check_in, check_out in queries[:50]:
+        expected = sql_summary(db, check_in, check_out)
+        got = {t: d["free"] for t, d in index.summary(check_in, check_out).items() if d["free"]}
+        assert got == expected, (check_in, check_out, got, expected)
+
+    timed("index summary (all types)", index.summary, queries)
+    timed("index free_rooms (one type)", lambda a, b: index.free_rooms("suite", a, b), queries)
+    timed("SQL overlap query", lambda a, b: sql_summary(db, a, b), queries[:200])
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Concurrent hold/confirm stress test against a small, heavily contended
+inventory. Sessions hold rooms, then confirm, cancel or abandon them
+(abandoned holds expire while the test runs). Afterwards the bookings
+table is checked for any room with overlapping claims - an oversell.
+Run with: python benchmarks/bench_booking_holds.py [sessions] [attempts_per_session]
+"""
+
+import os
+import sys
+import random
+import tempfile
+import threading
+import time
+import logging
+import contextlib
+import io
+from collections import Counter
+from datetime import date, timedelta
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+logging.disable(logging.WARNING)
+
+from sqlalchemy import text
+from backend.database import engine, init_db
+from backend import reservations
+from add_menu_items import seed_rooms
+
+ROOM_TYPES = ["standard", "deluxe", "premium", "suite"]
+# Short holds so abandoned ones lapse mid-run
+HOLD_MINUTES = 0.5 / 60
+
+OVERSOLD = text("""
+    SELECT COUNT(*) FROM bookings a JOIN bookings b
+      ON a.room_id = b.room_id AND a.id < b.id
+     AND a.check_in < b.check_out AND b.check_in < a.check_out
+    WHERE a.status = 'Confirmed' AND b.status = 'Confirmed'
+""")
+
+def last_room_race(sessions):
+    """Every session grabs a suite for the same night at the same moment"""
+    night = date.today() + timedelta(days=60)
+    barrier = threading.Barrier(sessions)
+    outcomes = Counter()
+
+    def guest(n):
+        barrier.wait()
+        try:
+            hold = reservations.create_hold("suite", night, night + timedelta(days=1), session_id=f"race-{n}")
+            reservations.confirm_hold(hold["id"], f"race-{n}")
+            outcomes["booked"] += 1
+        except reservations.BookingError:
+            outcomes["refused"] += 1
+
+    threads = [threading.Thread(target=guest, args=(n,)) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"last-suite race: {sessions} sessions → {outcomes['booked']} booked, {outcomes['refused']} refused")
+
+def mixed_load(sessions, attempts):
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def guest(n):
+        rng = random.Random(n)
+        for _ in range(attempts):
+            check_in = date.today() + timedelta(days=rng.randint(1, 10))
+            check_out = check_in + timedelta(days=rng.randint(1, 3))
+            try:
+                hold = reservations.create_hold(rng.choice(ROOM_TYPES), check_in, check_out,
+                                                session_id=f"s{n}", hold_minutes=HOLD_MINUTES)
+                roll = rng.random()
+                if roll < 0.6:
+                    time.sleep(rng.uniform(0, 0.05))
+                    reservations.confirm_hold(hold["id"], f"s{n}")
+                    result = "confirmed"
+                elif roll < 0.8:
+                    reservations.cancel_booking(hold["id"], f"s{n}")
+                    result = "cancelled"
+                else:
+                    result = "abandoned"
+            except reservations.BookingError:
+                result = "refused"
+            except Exception as e:
+                result = f"error: {type(e).__name__}"
+            with lock:
+                outcomes[result] += 1
+
+    reaper = reservations.start_reaper(interval=0.2)
+    threads = [threading.Thread(target=guest, args=(n,)) for n in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    reservations.stop_reaper()
+
+    total = sessions * attempts
+    print(f"mixed load: {total} attempts from {sessions} sessions in {elapsed:.2f}s → {total / elapsed:.0f} attempts/s")
+    for result, count in sorted(outcomes.items()):
+        print(f"   {result:<12} {count}")
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    attempts = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+    init_db()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_rooms()
+
+    last_room_race(sessions)
+    mixed_load(sessions, attempts)
+
+    with engine.connect() as conn:
+        oversold = conn.execute(OVERSOLD).scalar()
+        statuses = dict(conn.execute(text("SELECT status, COUNT(*) FROM bookings GROUP BY status")).all())
+    print(f"\nbookings by status: {statuses}")
+    print(f"overlapping confirmed bookings: {oversold}  {'✅ no oversell' if oversold == 0 else '❌ OVERSOLD'}")
+    return 0 if oversold == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
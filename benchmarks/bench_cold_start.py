@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Cold start of the API: wall time to import backend.main in a fresh
+interpreter, the slowest modules by cumulative import time (from
+python -X importtime), and the dependency check in run.py done with
+find_spec versus importing every package.
+Run with: python benchmarks/bench_cold_start.py [runs] [top]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+
+PACKAGES = ["fastapi", "uvicorn", "sqlalchemy", "google.generativeai", "streamlit", "requests"]
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    # A scratch cwd so the backend never touches ./resort.db
+    return subprocess.run([sys.executable, *flags, "-c", f"import sys; sys.path.insert(0, {ROOT!r})\n{code}"],
+                          cwd=tempfile.mkdtemp(prefix="resort_bench_"), capture_output=True, text=True,
+                          env={**os.environ, "FAKE_LLM": "1", "PYTHONWARNINGS": "ignore"})
+
+def timed_ms(statement: str) -> float:
+    code = f"import time\nstart = time.perf_counter()\n{statement}\nprint((time.perf_counter() - start) * 1000)"
+    result = run_python(code)
+    if result.returncode:
+        raise RuntimeError(result.stderr)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def import_times(module: str):
+    """(module, depth, self ms, cumulative ms) for every import made while importing `module`"""
+    rows = []
+    for line in run_python(f"import {module}", "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    wall = [timed_ms("import backend.main") for _ in range(runs)]
+    first_turn = [timed_ms("import backend.main\nfrom backend.database import init_db\n"
+                           "from backend.agents import get_manager\ninit_db()\n"
+                           "get_manager().chat([{'role': 'user', 'content': 'What time is checkout?'}], 'cold')")
+                  for _ in range(runs)]
+    print(f"import backend.main:            {statistics.median(wall):7.0f} ms (median of {runs})")
+    print(f"+ init_db + first chat turn:     {statistics.median(first_turn):7.0f} ms (fake LLM)\n")
+
+    rows = import_times("backend.main")
+    loaded = {name for name, _, _, _ in rows}
+    print(f"{'module':<40} {'self ms':>8} {'cumulative ms':>14}")
+    for name, depth, self_ms, cumulative_ms in sorted(rows, key=lambda row: -row[3])[:top]:
+        print(f"{'  ' * min(depth - 1, 4) + name:<40} {self_ms:8.1f} {cumulative_ms:14.1f}")
+    backend_ms = sum(self_ms for name, _, self_ms, _ in rows if name.startswith("backend"))
+    print(f"\nbackend.* own code: {backend_ms:.0f} ms; "
+          f"google.generativeai loaded: {'google.generativeai' in loaded}; numpy loaded: {'numpy' in loaded}\n")
+
+    checks = ", ".join(repr(p) for p in PACKAGES)
+    find_spec_ms = statistics.median(timed_ms(
+        f"from importlib.util import find_spec\nfor name in [{checks}]:\n"
+        f"    try: find_spec(name)\n    except ImportError: pass") for _ in range(runs))
+    import_ms = statistics.median(timed_ms(
+        f"for name in [{checks}]:\n    try: __import__(name)\n    except ImportError: pass") for _ in range(runs))
+    print(f"dependency check, find_spec:    {find_spec_ms:7.1f} ms")
+    print(f"dependency check, import all:   {import_ms:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Per-turn prompt size over a long conversation, with the bounded context
+window versus replaying the full transcript. Uses the offline fake LLM.
+Run with: python benchmarks/bench_context_window.py [turns]
+"""
+
+import os
+import sys
+import tempfile
+import logging
+import contextlib
+import io
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+os.environ["FAKE_LLM"] = "1"
+logging.disable(logging.WARNING)
+
+from backend import agents
+from backend.llm_metrics import llm_metrics
+from add_menu_items import setup_full_database
+
+GUEST_LINES = [
+    "Can I see the menu?",
+    "What would you recommend for dinner tonight in room 204?",
+    "Is the pool open in the evening?",
+    "Show me the drinks menu please",
+    "Thanks, that sounds great. Anything light to eat?",
+]
+
+class UnboundedWindow(agents.ContextWindow):
+    """Baseline: replay every turn verbatim, like a long-lived chat session"""
+    
+    def render(self, context=None):
+        return [{"role": e["role"], "parts": [e["text"]]} for turn in self.turns for e in turn]
+
+def run(label, window_cls, turns):
+    session_id = f"bench-{label}"
+    agent = agents.ResortAgent(agents.RESTAURANT_PROMPT, agents.restaurant_tools, "Restaurant", session_id)
+    agent.context = window_cls()
+    
+    sizes = []
+    for turn in range(turns):
+        before = llm_metrics.session_summary(session_id)
+        before_tokens = before["totals"]["prompt_tokens"] if before else 0
+        agent.process_message([{"role": "user", "content": GUEST_LINES[turn % len(GUEST_LINES)]}])
+        sizes.append(llm_metrics.session_summary(session_id)["totals"]["prompt_tokens"] - before_tokens)
+    return sizes
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    
+    bounded = run("bounded", agents.ContextWindow, turns)
+    unbounded = run("unbounded", UnboundedWindow, turns)
+    
+    print(f"Prompt tokens per guest turn (all Gemini calls in the turn), {turns} turns")
+    print(f"{'turn':>6} {'unbounded':>10} {'bounded':>10}")
+    for turn in sorted({1, 10, 25, 50, 75, turns}):
+        if turn <= turns:
+            print(f"{turn:>6} {unbounded[turn - 1]:>10} {bounded[turn - 1]:>10}")
+    print(f"{'total':>6} {sum(unbounded):>10} {sum(bounded):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Dashboard refresh latency against a live backend with N seeded orders:
+the old sequential requests.get calls (a new connection each) against
+the pooled ApiClient fetching /health, /orders and /requests at once,
+on first load and when revalidating unchanged data with ETags.
+Run with: python benchmarks/bench_dashboard_fetch.py [orders] [refreshes]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "dashboard"))
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+
+import requests
+import run
+from api_client import ApiClient
+from backend.database import SessionLocal, init_db
+from backend.models import Order, ServiceRequest
+
+ORDER_PARAMS = {"status": ["Pending", "Preparing"], "limit": 5000}
+REQUEST_PARAMS = {"status": ["Pending", "In Progress"], "limit": 5000}
+
+def seed(count: int):
+    init_db()
+    db = SessionLocal()
+    db.add_all(Order(room_number=str(101 + i % 40), total_amount=12.5, status=("Pending", "Preparing")[i % 2],
+                     items=[{"name": "Masala Chai", "quantity": 2}, {"name": "Paneer Tikka", "quantity": 1}])
+               for i in range(count))
+    db.add_all(ServiceRequest(room_number=str(101 + i % 40), request_type="towel", details="2 extra towels",
+                              status="Pending") for i in range(count // 10))
+    db.commit()
+    db.close()
+
+def sequential(base_url: str) -> float:
+    """Before: one call after another, each on a fresh connection"""
+    start = time.perf_counter()
+    requests.get(f"{base_url}/health", timeout=2)
+    requests.get(f"{base_url}/orders", params=ORDER_PARAMS, timeout=5).json()
+    requests.get(f"{base_url}/requests", params=REQUEST_PARAMS, timeout=5).json()
+    return (time.perf_counter() - start) * 1000
+
+def concurrent(client: ApiClient):
+    start = time.perf_counter()
+    results = client.get_many({"health": ("health", None), "orders": ("orders", ORDER_PARAMS),
+                               "requests": ("requests", REQUEST_PARAMS)})
+    total = (time.perf_counter() - start) * 1000
+    return total, max(r.elapsed_ms for r in results.values()), sum(r.elapsed_ms for r in results.values())
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    refreshes = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seed(count)
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.main:app", "--app-dir", ROOT,
+                               "--port", str(port)], env={**os.environ, "FAKE_LLM": "1"},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if run.wait_for_url(f"{base_url}/health", 30) is None:
+            raise RuntimeError("backend did not start")
+        sequential(base_url)
+
+        before = statistics.median(sequential(base_url) for _ in range(refreshes))
+        first = [concurrent(ApiClient(base_url)) for _ in range(refreshes)]
+        client = ApiClient(base_url)
+        concurrent(client)
+        revalidated = [concurrent(client) for _ in range(refreshes)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{count} orders, page refresh (median of {refreshes}):")
+    print(f"  sequential, new connections:     {before:7.1f} ms")
+    for label, runs in (("concurrent, first load:", first), ("concurrent, ETag revalidated:", revalidated)):
+        total, slowest, summed = (statistics.median(run[i] for run in runs) for i in range(3))
+        print(f"  {label:<32} {total:7.1f} ms (slowest call {slowest:.1f} ms, sum of calls {summed:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
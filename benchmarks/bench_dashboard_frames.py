@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Dashboard rerun cost with 10k orders: the old per-rerun pipeline
+(DataFrame from JSON, to_datetime, per-row apply for items and badges,
+iterrows for the order picker, CSV) against the cached frames, for a
+widget-only rerun, a rerun after new orders and status changes, and the
+first load. Cache reads include the pickle copy st.cache_data makes.
+Run with: python benchmarks/bench_dashboard_frames.py [orders] [reruns]
+"""
+
+import json
+import os
+import pickle
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "dashboard"))
+
+import pandas as pd
+from frames import OrderFrames
+
+DISHES = ["Masala Chai", "Paneer Tikka", "Butter Chicken", "Garlic Naan", "Veg Biryani", "Gulab Jamun",
+          "Masala Dosa", "Fresh Lime Soda", "Dal Makhani", "Chicken 65"]
+STATUSES = ["Pending", "Preparing", "Delivered", "Cancelled"]
+
+def make_orders(count: int, rng: random.Random):
+    start = datetime(2026, 10, 1)
+    return [{
+        "id": i + 1,
+        "room_number": str(rng.choice(range(101, 141))),
+        "items": [{"name": name, "quantity": rng.randint(1, 3), "price": 9.5}
+                  for name in rng.sample(DISHES, rng.randint(1, 4))],
+        "total_amount": round(rng.uniform(5, 80), 2),
+        "status": rng.choice(STATUSES),
+        "created_at": (start + timedelta(minutes=3 * i)).isoformat(),
+    } for i in range(count)]
+
+def old_rerun(cached_orders: bytes):
+    """What every rerun did before: rebuild everything from the cached JSON"""
+    orders = pickle.loads(cached_orders)
+    df_orders = pd.DataFrame(orders)
+    df_orders['created_at'] = pd.to_datetime(df_orders['created_at'])
+    df_orders['items_formatted'] = df_orders['items'].apply(
+        lambda x: ", ".join([f"{int(i.get('quantity', 1))}x {i.get('name', 'Unknown')}"
+                            for i in x]) if isinstance(x, list) else str(x)
+    )
+    df_display = df_orders.copy()
+    df_display['status_badge'] = df_display['status'].apply(
+        lambda x: f'<span class="status-badge status-{x.lower().replace(" ", "")}">{x}</span>'
+    )
+    df_orders['hour'] = df_orders['created_at'].dt.hour
+    df_orders['date'] = df_orders['created_at'].dt.date
+    order_options = []
+    for _, row in df_orders.iterrows():
+        order_text = f"#{row['id']} - Room {row['room_number']} - {row['status']}"
+        items_preview = row['items_formatted'][:30] + "..." if len(row['items_formatted']) > 30 else row['items_formatted']
+        order_text += f" ({items_preview})"
+        order_options.append((row['id'], order_text))
+    df_display[['id', 'room_number', 'status', 'total_amount', 'items_formatted', 'created_at']].to_csv(index=False)
+
+def new_rerun(frames: OrderFrames, cached_body: bytes):
+    df_orders = frames.get(pickle.loads(cached_body))
+    dict(zip(df_orders['option_label'].tolist(), df_orders['id'].tolist()))
+    frames.csv(df_orders)
+
+def median_ms(fn, reruns: int) -> float:
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    reruns = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rng = random.Random(7)
+    orders = make_orders(count, rng)
+    body = pickle.dumps(json.dumps(orders).encode())
+
+    old = median_ms(lambda: old_rerun(pickle.dumps(orders)), reruns)
+    cold = median_ms(lambda: new_rerun(OrderFrames(), body), reruns)
+
+    frames = OrderFrames()
+    new_rerun(frames, body)
+    unchanged = median_ms(lambda: new_rerun(frames, body), reruns * 20)
+
+    def changed_body():
+        # A few new orders at the top and some status changes, as between two refreshes
+        for order in rng.sample(orders, 20):
+            order["status"] = rng.choice(STATUSES)
+        orders[:0] = make_orders(5, rng)
+        for offset, order in enumerate(orders[:5]):
+            order["id"] = len(orders) + offset + 1
+        return pickle.dumps(json.dumps(orders).encode())
+
+    changed = []
+    for _ in range(reruns):
+        changed_cached = changed_body()
+        start = time.perf_counter()
+        new_rerun(frames, changed_cached)
+        changed.append((time.perf_counter() - start) * 1000)
+
+    print(f"{count} orders, data layer work per rerun (median):")
+    print(f"  before, every rerun:              {old:8.1f} ms")
+    print(f"  cached, widget-only rerun:        {unchanged:8.1f} ms")
+    print(f"  cached, 5 new + 20 changed:       {statistics.median(changed):8.1f} ms")
+    print(f"  cached, first load:               {cold:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
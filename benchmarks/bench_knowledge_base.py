@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Knowledge base query latency: BM25 with precomputed term weights versus
+scoring every passage at query time, over the resort file padded with
+synthetic passages. Also shows which guest questions get a direct answer.
+Run with: python benchmarks/bench_knowledge_base.py [passages] [queries]
+"""
+
+import os
+import sys
+import math
+import random
+import time
+import logging
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+logging.disable(logging.WARNING)
+
+from backend.knowledge_base import (KnowledgeBase, load_passages, tokenize, BM25_K1, BM25_B,
+                                    TITLE_WEIGHT, KEYWORD_WEIGHT)
+
+GUEST_QUESTIONS = [
+    "Can I bring my dog?", "Do you have airport pickup?", "What spa packages do you offer?",
+    "What time is check out?", "Is breakfast included?", "What is the cancellation policy?",
+    "Where can I charge my electric car?", "Is there a doctor on site?", "Is the pool heated?",
+    "Do you have a kids club?", "Can I get a late checkout?", "helicopter from the airport",
+]
+
+def synthetic_passages(real, count, rng):
+    """Passages built from the real vocabulary plus filler words, so term statistics stay realistic"""
+    vocabulary = [w for p in real for w in p["text"].split()] + [f"term{i}" for i in range(5000)]
+    return [
+        {"title": f"Note {i}", "text": " ".join(rng.choices(vocabulary, k=rng.randint(20, 60))), "keywords": ""}
+        for i in range(count)
+    ]
+
+def naive_search(passages, query, limit=3):
+    """BM25 computing document frequencies and lengths on every query"""
+    counts = []
+    for p in passages:
+        c = Counter(tokenize(p["text"]))
+        for term in tokenize(p["title"]):
+            c[term] += TITLE_WEIGHT
+        for term in tokenize(p.get("keywords", "")):
+            c[term] += KEYWORD_WEIGHT
+        counts.append(c)
+    avg = sum(sum(c.values()) for c in counts) / len(counts)
+    terms = set(tokenize(query))
+    scores = []
+    for doc_id, c in enumerate(counts):
+        score = 0.0
+        length = sum(c.values())
+        for term in terms:
+            tf = c.get(term, 0)
+            if tf:
+                df = sum(1 for other in counts if term in other)
+                idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg))
+        scores.append((score, doc_id))
+    return sorted(scores, reverse=True)[:limit]
+
+def main():
+    passage_count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    rng = random.Random(5)
+    real = load_passages()
+    passages = real + synthetic_passages(real, passage_count - len(real), rng)
+
+    start = time.perf_counter()
+    kb = KnowledgeBase(passages)
+    print(f"index build: {len(passages)} passages, {len(kb.postings)} terms in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    queries = [rng.choice(GUEST_QUESTIONS) for _ in range(query_count)]
+    start = time.perf_counter()
+    for q in queries:
+        kb.search(q)
+    indexed_us = (time.perf_counter() - start) * 1e6 / len(queries)
+
+    start = time.perf_counter()
+    for q in queries[:3]:
+        naive_search(passages, q)
+    naive_us = (time.perf_counter() - start) * 1e6 / 3
+
+    print(f"precomputed BM25: {indexed_us:10.1f} µs/query")
+    print(f"query-time BM25:  {naive_us:10.1f} µs/query  ({naive_us / indexed_us:.0f}x slower)\n")
+
+    real_kb = KnowledgeBase(real)
+    for q in GUEST_QUESTIONS:
+        hit = real_kb.direct_answer(q)
+        top = real_kb.search(q, limit=1)
+        print(f"{q:<38} → {top[0]['title'] if top else '-':<24} {'direct answer' if hit else 'via agent'}")
+
+if __name__ == "__main__":
+    main()
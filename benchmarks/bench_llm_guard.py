@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Chat latency through an LLM brownout, with and without the LLM guard.
+Guest threads chat continuously while the fake LLM goes from healthy
+(50 ms) to hanging (8 s per call) and back. Without deadlines every
+thread stalls for the whole brownout; with them, calls time out, the
+circuit opens and turns are answered locally until a probe succeeds.
+Run with: python benchmarks/bench_llm_guard.py [threads]
+"""
+
+import os
+import sys
+import tempfile
+import logging
+import contextlib
+import io
+import statistics
+import threading
+import time
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+os.environ["FAKE_LLM"] = "1"
+logging.disable(logging.CRITICAL)
+
+from backend import agents
+from backend.fake_llm import FakeChatSession, FakeGenerativeModel
+from backend.llm_guard import llm_guard, CircuitBreaker
+from add_menu_items import setup_full_database
+
+# (phase, seconds, LLM latency)
+PHASES = [("healthy", 2.0, 0.05), ("brownout", 4.0, 8.0), ("recovered", 3.0, 0.05)]
+MESSAGES = [
+    "Can you recommend something for dinner?",
+    "Could someone fix the shower, it is leaking",
+    "Tell me something nice to do this afternoon",
+    "I'd like 2 masala dosa",
+]
+llm_latency = [PHASES[0][2]]
+
+class BrownoutChatSession(FakeChatSession):
+    def send_message(self, message: str):
+        time.sleep(llm_latency[0])
+        return super().send_message(message)
+
+class BrownoutModel(FakeGenerativeModel):
+    def start_chat(self, history=None, **kwargs):
+        return BrownoutChatSession(self, history)
+
+def run(guarded: bool, threads: int):
+    llm_guard.timeout = 1.0 if guarded else 3600.0
+    llm_guard.breaker = CircuitBreaker(failure_threshold=5 if guarded else 10 ** 9, reset_seconds=1.0)
+    llm_guard.counts = {key: 0 for key in llm_guard.counts}
+    llm_guard.fallbacks = {}
+    llm_latency[0] = PHASES[0][2]
+    manager = agents.AgentManager()
+    results = []
+    stop = threading.Event()
+    start = time.perf_counter()
+
+    def guest(number):
+        turn = 0
+        while not stop.is_set():
+            turn += 1
+            began = time.perf_counter()
+            manager.chat([{"role": "user", "content": MESSAGES[turn % len(MESSAGES)]}], f"guest-{guarded}-{number}-{turn}")
+            results.append((began - start, (time.perf_counter() - began) * 1000))
+
+    workers = [threading.Thread(target=guest, args=(n,), daemon=True) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    boundaries = []
+    for _, seconds, latency in PHASES:
+        llm_latency[0] = latency
+        boundaries.append(time.perf_counter() - start)
+        time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=15)
+
+    print(f"\nLLM guard {'on' if guarded else 'off'}:")
+    for index, (phase, _, _) in enumerate(PHASES):
+        end = boundaries[index + 1] if index + 1 < len(boundaries) else float("inf")
+        latencies = sorted(ms for began, ms in results if boundaries[index] <= began < end)
+        if latencies:
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"  {phase:<10} turns started {len(latencies):5d}  median {statistics.median(latencies):8.1f} ms  p99 {p99:8.1f} ms")
+        else:
+            print(f"  {phase:<10} turns started     0")
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    agents.FakeGenerativeModel = BrownoutModel
+
+    run(False, threads)
+    run(True, threads)
+    snapshot = llm_guard.snapshot()
+    print(f"\ncircuit after recovery: {snapshot['circuit']['state']} (opened {snapshot['circuit']['times_opened']}x)")
+    print(f"calls: {snapshot['calls']}")
+    print(f"local fallbacks: {snapshot['fallbacks']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk menu upsert against a generated menu file.
+Run with: python benchmarks/bench_menu_loader.py [items]
+"""
+
+import os
+import sys
+import csv
+import random
+import tempfile
+import time
+import logging
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+logging.disable(logging.WARNING)
+
+from backend.database import init_db
+from backend.menu_loader import load_menu_file
+
+CATEGORIES = ["Breakfast", "Veg Starter", "Non-Veg Starter", "Veg Main Course",
+              "Non-Veg Main Course", "Breads", "Desserts", "Drinks"]
+
+def write_menu(path, items):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "description", "price", "category"])
+        writer.writeheader()
+        writer.writerows(items)
+
+def timed_load(label, path, prune=False):
+    start = time.perf_counter()
+    diff = load_menu_file(path, prune=prune)
+    elapsed = (time.perf_counter() - start) * 1000
+    removed = len(diff.get("removed", diff.get("missing", [])))
+    print(f"{label:<14} {elapsed:8.1f} ms  added={len(diff['added'])} updated={len(diff['updated'])} "
+          f"removed={removed} unchanged={diff['unchanged']}")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    init_db()
+    random.seed(42)
+    
+    items = [
+        {"name": f"Dish {i:05d}", "description": f"House special number {i}",
+         "price": random.randint(40, 600), "category": random.choice(CATEGORIES)}
+        for i in range(count)
+    ]
+    write_menu("menu_v1.csv", items)
+    
+    # Next day's menu: 10% price changes, 5% dropped, 5% new dishes
+    changed = [dict(item) for item in items[: int(count * 0.95)]]
+    for item in random.sample(changed, count // 10):
+        item["price"] += 10
+    changed += [{"name": f"New Dish {i:05d}", "description": "Chef's special", "price": 250, "category": "Desserts"}
+                for i in range(count // 20)]
+    write_menu("menu_v2.csv", changed)
+    
+    print(f"🏁 {count} menu items (database: {os.getcwd()})")
+    timed_load("initial load", "menu_v1.csv")
+    timed_load("no-op reload", "menu_v1.csv")
+    timed_load("daily update", "menu_v2.csv", prune=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compare menu tool output sent to the model: full rich menu vs the
+token-budgeted LLM rendering. Reports estimated tokens and render time;
+with GEMINI_API_KEY set it also reports exact prompt tokens and the
+latency of a chat turn carrying each rendering.
+Run with: python benchmarks/bench_menu_rendering.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import logging
+import contextlib
+import io
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+logging.disable(logging.WARNING)
+
+from backend.tools import get_menu_items
+from backend.tokens import estimate_tokens
+from backend import agents
+from add_menu_items import setup_full_database
+
+CASES = [
+    ("before: full rich menu", {"compact": False}),
+    ("after: llm page 1", {"style": "llm"}),
+    ("after: llm category=Drinks", {"style": "llm", "category": "Drinks"}),
+]
+
+def render_ms(kwargs, runs=50):
+    start = time.perf_counter()
+    for _ in range(runs):
+        get_menu_items(**kwargs)
+    return (time.perf_counter() - start) * 1000 / runs
+
+def gemini_stats(text):
+    """Exact prompt tokens and round-trip latency for a turn carrying `text`"""
+    model = agents.load_genai().GenerativeModel("gemini-2.0-flash", system_instruction=agents.RESTAURANT_PROMPT)
+    prompt_tokens = model.count_tokens(text).total_tokens
+    start = time.perf_counter()
+    response = model.generate_content(f"Menu:\n{text}\n\nGuest: what do you recommend for dinner?")
+    latency = (time.perf_counter() - start) * 1000
+    usage = getattr(response, "usage_metadata", None)
+    return prompt_tokens, latency, getattr(usage, "prompt_token_count", None)
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    
+    print(f"{'case':<30} {'chars':>7} {'~tokens':>8} {'render ms':>10}")
+    for label, kwargs in CASES:
+        text = get_menu_items(**kwargs)
+        print(f"{label:<30} {len(text):>7} {estimate_tokens(text):>8} {render_ms(kwargs):>10.2f}")
+    
+    if not agents.GEMINI_AVAILABLE:
+        print("\n(GEMINI_API_KEY not set - skipping exact token counts and response latency)")
+        return
+    
+    print(f"\n{'case':<30} {'tokens':>7} {'turn prompt':>12} {'latency ms':>11}")
+    for label, kwargs in CASES:
+        tokens, latency, turn_prompt = gemini_stats(get_menu_items(**kwargs))
+        print(f"{label:<30} {tokens:>7} {turn_prompt or '-':>12} {latency:>11.0f}")
+
+if __name__ == "__main__":
+    main()
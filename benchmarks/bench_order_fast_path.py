@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Chat turn latency for food orders with the deterministic fast path on
+and off, plus the share of turns each path handled. The fake LLM
+simulates API latency (default 300 ms per call).
+Run with: python benchmarks/bench_order_fast_path.py [llm_latency_ms] [rounds]
+"""
+
+import os
+import sys
+import tempfile
+import logging
+import contextlib
+import io
+import statistics
+import time
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+os.environ["FAKE_LLM"] = "1"
+os.environ["FAKE_LLM_LATENCY_MS"] = sys.argv[1] if len(sys.argv) > 1 else "300"
+logging.disable(logging.WARNING)
+
+from backend import agents
+from backend.llm_metrics import llm_metrics, path_metrics
+from add_menu_items import setup_full_database
+
+# A mix of clear orders, orders that need the agent, and other messages
+MESSAGES = [
+    "2 masala dosa and a cold coffee to room 204",
+    "Order 2 garlic naan and a dal makhani for room 311",
+    "Please send 3 masala chai to room 102",
+    "I'd like a paneer tikka and 2 sweet lassi, room 118",
+    "can I get butter naan x2 and a veg biryani to 305",
+    "send two gulab jamun to room 410",
+    "order naan to room 204",
+    "masala dosa without onions to room 204",
+    "order something spicy for room 212",
+    "What's on the menu?",
+    "order a fresh lime soda to room 109",
+    "I want 1 chicken biryani and 1 mineral water for room 220",
+]
+
+def run(enabled: bool, rounds: int):
+    agents.ORDER_FAST_PATH_ENABLED = enabled
+    manager = agents.AgentManager()
+    calls_before = llm_metrics.snapshot()["totals"]["calls"]
+    latencies = []
+    for turn in range(rounds):
+        message = MESSAGES[turn % len(MESSAGES)]
+        start = time.perf_counter()
+        manager.chat([{"role": "user", "content": message}], f"fast-{enabled}-{turn}")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, llm_metrics.snapshot()["totals"]["calls"] - calls_before
+
+def main():
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else len(MESSAGES) * 3
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    agents.manager.chat([{"role": "user", "content": "order a masala chai to room 101"}], "warmup")
+
+    for enabled in (False, True):
+        latencies, llm_calls = run(enabled, rounds)
+        print(f"fast path {'on ' if enabled else 'off'}  median {statistics.median(latencies):7.1f} ms  "
+              f"mean {statistics.mean(latencies):7.1f} ms  LLM calls {llm_calls}")
+
+    shares = path_metrics.snapshot()
+    print("\nturns by path (fast path on and off combined):")
+    for path, stats in shares["paths"].items():
+        print(f"  {path:<16} {stats['share']:6.1%}  avg {stats['avg_latency_ms']:7.1f} ms")
+    print(f"  fast path declined: {shares['order_fast_path_fallbacks']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Dynamic pricing: full table build, incremental update after a booking,
+and quote latency versus computing the price per request.
+Run with: python benchmarks/bench_pricing.py [rooms] [quotes]
+"""
+
+import os
+import sys
+import random
+import time
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+logging.disable(logging.WARNING)
+
+from backend.availability import AvailabilityIndex, night_mask
+from backend.pricing import (PriceTable, WEEKDAY_FACTORS, SEASON_FACTORS, OCCUPANCY_SLOPE,
+                             OCCUPANCY_TARGET, OCCUPANCY_FACTOR_BOUNDS)
+
+ROOM_TYPES = [("standard", 150, 2), ("deluxe", 250, 2), ("premium", 350, 3), ("suite", 500, 4)]
+
+def build_index(room_count):
+    """In-memory index: room_count rooms booked ~70% of the next year"""
+    rng = random.Random(7)
+    index = AvailabilityIndex()
+    today = date.today()
+    for i in range(room_count):
+        room_type, rate, capacity = ROOM_TYPES[i % 4]
+        number = str(1000 + i)
+        index.add_room(number, room_type, rate, capacity)
+        day = today
+        while day < today + timedelta(days=365):
+            nights = rng.randint(1, 7)
+            if rng.random() < 0.7:
+                index.occupy(number, day, day + timedelta(days=nights))
+            day += timedelta(days=nights)
+    return index
+
+def naive_quote(index, room_type, check_in, check_out):
+    """What a per-request calculation would do: count booked rooms night by night"""
+    rooms = [index.rooms[n] for n in index.by_type[room_type]]
+    base = min(r["nightly_rate"] for r in rooms)
+    total = 0.0
+    day = check_in
+    while day < check_out:
+        mask = night_mask(day, day + timedelta(days=1))
+        occupancy = sum(1 for r in rooms if r["bits"] & mask) / len(rooms)
+        factor = min(max(1 + OCCUPANCY_SLOPE * (occupancy - OCCUPANCY_TARGET), OCCUPANCY_FACTOR_BOUNDS[0]),
+                     OCCUPANCY_FACTOR_BOUNDS[1])
+        total += round(base * WEEKDAY_FACTORS[day.weekday()] * SEASON_FACTORS[day.month - 1] * factor)
+        day += timedelta(days=1)
+    return total
+
+def main():
+    room_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    quote_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    index = build_index(room_count)
+    start = time.perf_counter()
+    table = PriceTable(index)
+    print(f"full build ({table.horizon} nights × {len(table.room_types)} types, {room_count} rooms): "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms")
+    index.listeners.append(table.on_occupancy_change)
+
+    # Incremental updates: free and re-book stays, then compare with a fresh build
+    rng = random.Random(3)
+    numbers = list(index.rooms)
+    changes = []
+    for _ in range(200):
+        number = rng.choice(numbers)
+        check_in = date.today() + timedelta(days=rng.randint(0, 350))
+        changes.append((number, check_in, check_in + timedelta(days=rng.randint(1, 7))))
+    start = time.perf_counter()
+    for i, (number, check_in, check_out) in enumerate(changes):
+        (index.release if i % 2 else index.occupy)(number, check_in, check_out)
+    per_change = (time.perf_counter() - start) * 1000 / len(changes)
+    print(f"incremental update per booking change: {per_change * 1000:.0f} µs")
+    assert np.array_equal(table.rates, PriceTable(index).rates), "incremental table drifted from full rebuild"
+
+    stays = []
+    for _ in range(quote_count):
+        check_in = date.today() + timedelta(days=rng.randint(0, 350))
+        stays.append((rng.choice(table.room_types), check_in, check_in + timedelta(days=rng.randint(1, 14))))
+    for room_type, check_in, check_out in stays[:50]:
+        assert table.quote(room_type, check_in, check_out)["total"] == naive_quote(index, room_type, check_in, check_out)
+
+    start = time.perf_counter()
+    for stay in stays:
+        table.quote(*stay)
+    table_us = (time.perf_counter() - start) * 1e6 / len(stays)
+    start = time.perf_counter()
+    for stay in stays[:500]:
+        naive_quote(index, *stay)
+    naive_us = (time.perf_counter() - start) * 1e6 / 500
+    print(f"quote from table: {table_us:8.1f} µs")
+    print(f"quote per request: {naive_us:7.1f} µs  ({naive_us / table_us:.0f}x slower)")
+
+if __name__ == "__main__":
+    main()
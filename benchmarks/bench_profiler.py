@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+What live profiling costs a chat turn: disabled, armed but skipping
+this request, and profiling it with cProfile. Also times one second of
+stack sampling against a busy thread. Uses the offline fake LLM.
+Run with: python benchmarks/bench_profiler.py [turns]
+"""
+
+import os
+import sys
+import tempfile
+import logging
+import contextlib
+import io
+import statistics
+import threading
+import time
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+os.environ["FAKE_LLM"] = "1"
+logging.disable(logging.WARNING)
+
+from backend import agents, profiler
+from add_menu_items import setup_full_database
+
+def turn_ms(turns: int) -> float:
+    times = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        with profiler.maybe_profile():
+            agents.manager.chat([{"role": "user", "content": "Show me the menu"}], f"prof-{turn % 50}")
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    turn_ms(20)
+
+    disabled = turn_ms(turns)
+    profiler._request_profiler = profiler.RequestProfiler(every=10 ** 9, count=1)
+    armed = turn_ms(turns)
+    profiler._request_profiler = profiler.RequestProfiler(every=1, count=turns)
+    profiled = turn_ms(turns)
+    profiler._request_profiler = None
+
+    print(f"chat turn, profiling disabled:   {disabled:6.2f} ms")
+    print(f"chat turn, armed (not sampled):  {armed:6.2f} ms")
+    print(f"chat turn, cProfile on:          {profiled:6.2f} ms ({profiled / disabled:.1f}x)\n")
+
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            agents.manager.chat([{"role": "user", "content": "Show me the menu"}], "prof-busy")
+
+    worker = threading.Thread(target=busy, name="busy-guest")
+    worker.start()
+    result = profiler.sample_stacks(1.0, 0.005)
+    stop.set()
+    worker.join()
+    busy_samples = sum(count for stack, count in result["stacks"].items() if stack.startswith("busy-guest"))
+    print(f"1 s of stack sampling: {result['samples']} samples, {len(result['stacks'])} distinct stacks, "
+          f"{busy_samples} in the busy thread")
+
+if __name__ == "__main__":
+    main()
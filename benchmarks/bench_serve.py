@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+/chat throughput of `run.py serve` at 1 worker versus N workers, against
+the offline fake LLM. Also checks session affinity: every session's usage
+must be recorded on a single worker.
+Run with: python benchmarks/bench_serve.py [workers] [clients] [requests_per_client]
+"""
+
+import os
+import sys
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8700
+# Simulated Gemini latency; the workload is mostly waiting, as in production
+LLM_LATENCY_MS = 50
+
+GUEST_LINES = ["Can I see the menu?", "Is the pool open tonight?", "I need fresh towels in room 204"]
+
+def start_server(workers):
+    env = dict(os.environ, FAKE_LLM="1", FAKE_LLM_LATENCY_MS=str(LLM_LATENCY_MS), SESSION_STORE="memory")
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "run.py"), "serve", "--workers", str(workers), "--port", str(PORT)],
+        cwd=tempfile.mkdtemp(prefix="resort_bench_"), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{PORT}/health", timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+def run_load(label, clients, per_client):
+    errors = []
+
+    def client(n):
+        http = requests.Session()
+        history = []
+        for i in range(per_client):
+            history = (history + [{"role": "user", "content": GUEST_LINES[i % len(GUEST_LINES)]}])[-6:]
+            response = http.post(f"http://127.0.0.1:{PORT}/chat",
+                                 json={"history": history, "session_id": f"{label}-{n}"}, timeout=60)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+            history.append({"role": "assistant", "content": response.json()["response"]})
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = clients * per_client
+    print(f"{label:<10} {total:>5} chats in {elapsed:6.2f}s  →  {total / elapsed:7.1f} req/s  ({len(errors)} errors)")
+
+    # With affinity, one worker saw all of a session's turns
+    split = 0
+    for n in range(clients):
+        usage = requests.get(f"http://127.0.0.1:{PORT}/sessions/{label}-{n}/usage", timeout=5)
+        if usage.status_code != 200 or usage.json()["totals"]["turns"] != per_client:
+            split += 1
+    print(f"{'':<10} sessions split across workers: {split}/{clients}")
+    return total / elapsed
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 2)
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    per_client = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    print(f"{os.cpu_count()} CPUs, {clients} clients × {per_client} chats, {LLM_LATENCY_MS} ms fake LLM latency\n")
+    results = {}
+    for count in sorted({1, workers}):
+        server = start_server(count)
+        try:
+            results[count] = run_load(f"{count}-worker", clients, per_client)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    if len(results) > 1:
+        print(f"\nSpeedup with {workers} workers: {results[workers] / results[1]:.2f}x")
+
+if __name__ == "__main__":
+    main()
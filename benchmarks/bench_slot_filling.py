@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Guest turns per completed food order, with slot filling on and off.
+Replays scripted sessions where the guest mentions their room earlier
+(often to the receptionist) and later orders. A scripted model stands in
+for Gemini: it calls place_restaurant_order with a room number only when
+the current message contains one, and asks for it when the tool says it
+is missing. A remembered room is never billed without the guest stating
+it again, so for orders the two modes should now match; the count is a
+check that slot filling does not place orders on its own.
+Run with: python benchmarks/bench_slot_filling.py
+"""
+
+import os
+import re
+import sys
+import tempfile
+import logging
+import contextlib
+import io
+from types import SimpleNamespace
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+os.environ["FAKE_LLM"] = "1"
+logging.disable(logging.WARNING)
+
+from backend import agents
+from backend.fake_llm import FakeChatSession, FakeGenerativeModel
+from add_menu_items import setup_full_database
+
+ORDER = {"Masala Dosa": 1}
+
+# (earlier guest turns, order request, room number the guest gives when asked)
+SESSIONS = [
+    (["Hi, this is Priya from 204. Is the pool heated?"], "I'd like to order a masala dosa", "204"),
+    (["We're staying in 311, what time is check out?"], "Can I order a masala dosa please", "311"),
+    (["Room 118 here, is there a kids club?"], "I want to order food: one masala dosa", "118"),
+    (["Hello, I'm in 402 and need the wifi password"], "Order a masala dosa for me", "402"),
+    (["Can you send towels to room 207?"], "Also I'd like to order a masala dosa", "207"),
+    (["My name is Arjun Mehta, suite 410", "Is breakfast included?"], "Please order one masala dosa", "410"),
+    (["Hi! Room no. 305. Do you have airport pickup?"], "I'm hungry, order a masala dosa", "305"),
+    (["rm 109, is the spa open late?"], "order masala dosa", "109"),
+    (["This is room #212, what's the cancellation policy?"], "I'd like to order a masala dosa", "212"),
+    (["Good morning, staying at 301. Can I bring my dog?"], "Can I order a masala dosa", "301"),
+    (["I am in room 115 with two kids"], "Order a masala dosa please", "115"),
+    (["Room number 220, housekeeping please"], "I want to order one masala dosa", "220"),
+    (["Hi this is Sam in 408, is there a gym?"], "Order one masala dosa", "408"),
+    (["We are in 104, when does the restaurant open?"], "I'd like to order a masala dosa", "104"),
+    (["Room 316 - the AC is not working, please repair it"], "And order a masala dosa", "316"),
+    (["My room is 203", "What time is yoga?"], "Order a masala dosa for breakfast", "203"),
+    (["Is the pool heated?"], "I'd like to order a masala dosa", "112"),
+    (["Hi, what time is check in?"], "Can I order a masala dosa", "309"),
+    ([], "Order a masala dosa to room 217", "217"),
+    (["Hello", "Is there parking?"], "I want to order a masala dosa", "401"),
+]
+
+class ScriptedChatSession(FakeChatSession):
+    """Orders when asked, passing a room number only if this message has one"""
+
+    def send_message(self, message: str):
+        response = super().send_message(message)
+        text = message.lower()
+        if "please provide room number" in text:
+            reply = SimpleNamespace(text="What is your room number?")
+        elif "order" in text and "place_restaurant_order" in self.model.tool_names:
+            args = {"items_dict": dict(ORDER)}
+            room = re.search(r"\b(\d{3})\b", message)
+            if room:
+                args["room_number"] = room.group(1)
+            reply = SimpleNamespace(function_call=SimpleNamespace(name="place_restaurant_order", args=args))
+        else:
+            return response
+        self.history[-1] = {"role": "model", "parts": [getattr(reply, "text", "[called place_restaurant_order]")]}
+        return SimpleNamespace(parts=[reply], text=getattr(reply, "text", ""), usage_metadata=response.usage_metadata)
+
+class ScriptedModel(FakeGenerativeModel):
+    def start_chat(self, history=None, **kwargs):
+        return ScriptedChatSession(self, history)
+
+def run(enabled: bool):
+    agents.SLOT_FILLING_ENABLED = enabled
+    manager = agents.AgentManager()
+    turns_to_order = []
+    for number, (earlier, order_request, room) in enumerate(SESSIONS):
+        session_id = f"slots-{'on' if enabled else 'off'}-{number}"
+        history = []
+
+        def say(text):
+            history.append({"role": "user", "content": text})
+            reply = manager.chat(history, session_id)
+            history.append({"role": "assistant", "content": reply})
+            return reply
+
+        for line in earlier:
+            say(line)
+        reply = say(order_request)
+        turns = 1
+        while "ORDER PLACED" not in reply and turns < 4:
+            # Mention the order so the router keeps the guest with the restaurant agent
+            reply = say(f"It's {room}, for my order" if "room number" in reply.lower() else order_request)
+            turns += 1
+        turns_to_order.append(turns if "ORDER PLACED" in reply else None)
+    return turns_to_order
+
+def main():
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    agents.FakeGenerativeModel = ScriptedModel
+
+    results = {"off": run(False), "on": run(True)}
+    for label, turns in results.items():
+        done = [t for t in turns if t]
+        asked = sum(1 for t in done if t > 1)
+        print(f"slot filling {label:<3}  orders {len(done)}/{len(turns)}  "
+              f"guest turns per order {sum(done) / len(done):.2f}  asked for room {asked}x")
+
+if __name__ == "__main__":
+    main()
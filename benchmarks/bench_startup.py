@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Time until run.py would consider the backend started: the old fixed
+schedule (sleep 3 s, then poll /health every 2 s) against polling with
+exponential backoff from 5 ms. Each run launches a fresh uvicorn on a
+free port against a throwaway database.
+Run with: python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import run
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def launch(port: int) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "backend.main:app", "--app-dir", ROOT,
+                             "--host", "127.0.0.1", "--port", str(port)],
+                            cwd=tempfile.mkdtemp(prefix="resort_bench_"), env={**os.environ, "FAKE_LLM": "1"},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def fixed_schedule(url: str) -> float:
+    start = time.perf_counter()
+    time.sleep(3)
+    while not run.probe(url):
+        time.sleep(2)
+    return time.perf_counter() - start
+
+def backoff(url: str) -> float:
+    start = time.perf_counter()
+    if run.wait_for_url(url, 30) is None:
+        raise RuntimeError("backend did not start")
+    return time.perf_counter() - start
+
+def measure(wait, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        port = free_port()
+        process = launch(port)
+        try:
+            times.append(wait(f"http://127.0.0.1:{port}/health"))
+        finally:
+            process.terminate()
+            process.wait()
+    return statistics.median(times) * 1000
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"backend ready, fixed sleeps:        {measure(fixed_schedule, runs):7.0f} ms (median of {runs})")
+    print(f"backend ready, backoff from 5 ms:   {measure(backoff, runs):7.0f} ms")
+
+if __name__ == "__main__":
+    main()
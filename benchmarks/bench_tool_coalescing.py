@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Breakfast rush: many sessions ask for the menu in the same instant.
+Compares bursts of concurrent get_menu_items tool calls run one per
+session against the singleflight path, where identical in-flight calls
+share one DB read and render.
+Run with: python benchmarks/bench_tool_coalescing.py [sessions] [bursts] [menu_items]
+"""
+
+import os
+import sys
+import tempfile
+import logging
+import contextlib
+import io
+import statistics
+import threading
+import time
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+os.environ["FAKE_LLM"] = "1"
+logging.disable(logging.WARNING)
+
+from backend import agents
+from backend.menu_loader import upsert_menu_items
+from add_menu_items import setup_full_database
+
+def burst(agents_list, coalesce: bool) -> float:
+    """Seconds until every session has its menu"""
+    barrier = threading.Barrier(len(agents_list) + 1)
+
+    def ask(agent):
+        barrier.wait()
+        if coalesce:
+            agent._execute_tool("get_menu_items", {}, audience="guest")
+        else:
+            tools = agent._load_tools()
+            agent._run_tool(tools["get_menu_items"], "get_menu_items", {}, "guest")
+
+    threads = [threading.Thread(target=ask, args=(agent,)) for agent in agents_list]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    bursts = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    menu_items = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_full_database()
+    upsert_menu_items({"name": f"Chef Special {i}", "description": "Seasonal dish from the garden",
+                       "price": 200 + i % 300, "category": f"Specials {i % 8}"} for i in range(menu_items))
+
+    agents_list = [agents.ResortAgent(agents.RESTAURANT_PROMPT, agents.restaurant_tools, "Restaurant", f"rush-{n}")
+                   for n in range(sessions)]
+    print(f"{sessions} sessions asking for a {menu_items + 60}-item menu at once, {bursts} bursts\n")
+
+    for coalesce in (False, True):
+        before = agents.tool_calls.snapshot()
+        times = [burst(agents_list, coalesce) for _ in range(bursts)]
+        after = agents.tool_calls.snapshot()
+        executed = (after["executed"] - before["executed"]) if coalesce else sessions * bursts
+        print(f"{'singleflight' if coalesce else 'per session ':<12}  burst median {statistics.median(times) * 1000:7.1f} ms  "
+              f"menu renders {executed:5d} for {sessions * bursts} calls")
+
+if __name__ == "__main__":
+    main()
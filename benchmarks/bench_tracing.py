@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Cost of tracing: a span with histograms only, a span exported to an
+OTLP file, and the SQLAlchemy query timing hooks on a cheap SELECT.
+Run with: python benchmarks/bench_tracing.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+
+from sqlalchemy import create_engine, text
+from backend import tracing
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1e6 / iterations
+
+def empty():
+    pass
+
+def with_span():
+    with tracing.span("bench.step"):
+        pass
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    baseline = per_call_us(empty, iterations)
+    histogram_only = per_call_us(with_span, iterations)
+
+    tracing.exporter = tracing.SpanExporter(os.path.abspath("traces.jsonl"))
+    token = tracing._trace_var.set(("0" * 32, None))
+    exported = per_call_us(with_span, iterations // 10)
+    tracing._trace_var.reset(token)
+    tracing.exporter.stop()
+    tracing.exporter = None
+
+    print(f"empty call:               {baseline:6.2f} µs")
+    print(f"span, histogram only:     {histogram_only - baseline:6.2f} µs overhead")
+    print(f"span, exported to OTLP:   {exported - baseline:6.2f} µs overhead\n")
+
+    queries = iterations // 20
+    plain = create_engine("sqlite:///bench.db")
+    hooked = create_engine("sqlite:///bench.db")
+    tracing.instrument_engine(hooked)
+    for engine in (plain, hooked):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    with plain.connect() as conn:
+        plain_us = per_call_us(lambda: conn.execute(text("SELECT 1")).scalar(), queries)
+    with hooked.connect() as conn:
+        hooked_us = per_call_us(lambda: conn.execute(text("SELECT 1")).scalar(), queries)
+    print(f"SELECT 1 without hooks:   {plain_us:6.2f} µs")
+    print(f"SELECT 1 with timing:     {hooked_us:6.2f} µs ({hooked_us - plain_us:+.2f} µs)")
+
+if __name__ == "__main__":
+    main()
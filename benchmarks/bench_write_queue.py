@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark sustained order/request inserts with and without the write queue.
+Run with: python benchmarks/bench_write_queue.py [threads] [inserts_per_thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import logging
+import contextlib
+import io
+
+# Work against a throwaway database (the backend uses ./resort.db)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_bench_"))
+logging.disable(logging.WARNING)
+
+from backend.database import init_db
+from backend import write_queue
+from backend.tools import place_restaurant_order, create_room_service_request
+from add_menu_items import seed_menu
+
+def run_burst(label, threads, per_thread):
+    """Fire inserts from many threads at once and report inserts/sec"""
+    errors = []
+    
+    def worker(n):
+        for i in range(per_thread):
+            session_id = f"{label}-{n}-{i}"
+            if i % 2:
+                result = place_restaurant_order(str(100 + n), {"Masala Dosa": 1 + i}, session_id=session_id)
+            else:
+                result = create_room_service_request(str(100 + n), "towel", f"set {i}", session_id=session_id)
+            if not result.startswith("✅"):
+                errors.append(result)
+    
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    
+    total = threads * per_thread
+    print(f"{label:<10} {total:>6} inserts in {elapsed:6.2f}s  →  {total / elapsed:8.0f} inserts/s  ({len(errors)} errors)")
+    return total / elapsed
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    
+    init_db()
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_menu()
+    
+    print(f"🏁 {threads} threads × {per_thread} inserts (database: {os.getcwd()})")
+    inline = run_burst("inline", threads, per_thread)
+    
+    writer = write_queue.start_writer()
+    queued = run_burst("queued", threads, per_thread)
+    write_queue.stop_writer()
+    
+    print(f"   batches: {writer.batches}, avg batch size: {writer.rows / max(writer.batches, 1):.1f}")
+    print(f"   speedup: {queued / inline:.1f}x")
+
+if __name__ == "__main__":
+    main()
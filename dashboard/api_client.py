@@ -0,0 +1,100 @@
+"""
+Backend client for the dashboard.
+
+One keep-alive connection pool shared by every session, one timeout and
+retry policy for all calls, and concurrent fetches so a page refresh
+takes as long as its slowest call rather than the sum of them. GETs
+revalidate with If-None-Match; a 304 reuses the body already held, so an
+unchanged table costs a round trip but no transfer or parsing.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_CONNECT_TIMEOUT = 2.0
+API_READ_TIMEOUT = 5.0
+# Connection failures and gateway errors are retried twice (0.2 s, then 0.4 s)
+API_RETRIES = 2
+API_RETRY_BACKOFF = 0.2
+API_POOL_SIZE = 8
+MAX_CACHED_BODIES = 32
+
+class ApiResult:
+    """Outcome of one GET: body bytes on success, otherwise an error message for the page"""
+
+    def __init__(self, body: Optional[bytes] = None, status: Optional[int] = None,
+                 error: Optional[str] = None, elapsed_ms: float = 0.0, revalidated: bool = False):
+        self.body = body
+        self.status = status
+        self.error = error
+        self.elapsed_ms = elapsed_ms
+        self.revalidated = revalidated
+
+    @property
+    def ok(self) -> bool:
+        return self.body is not None
+
+class ApiClient:
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+        retry = Retry(total=API_RETRIES, backoff_factor=API_RETRY_BACKOFF, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset({"GET", "PUT"}), raise_on_status=False)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=API_POOL_SIZE, thread_name_prefix="dashboard-api")
+        # (path, params) -> (etag, body) for conditional GETs
+        self._bodies: "OrderedDict[Tuple, Tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, params: Optional[Dict] = None) -> ApiResult:
+        key = (path, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items())))
+        with self._lock:
+            cached = self._bodies.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}/{path}", params=params, headers=headers,
+                                        timeout=self.timeout)
+        except requests.exceptions.ConnectionError:
+            return ApiResult(error=f"❌ Cannot connect to backend at {self.base_url}")
+        except requests.exceptions.Timeout:
+            return ApiResult(error="Request timed out. The server might be slow.")
+        except Exception as e:
+            return ApiResult(error=f"Unexpected error: {str(e)}")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if response.status_code == 304 and cached:
+            with self._lock:
+                self._bodies.move_to_end(key)
+            return ApiResult(cached[1], 304, elapsed_ms=elapsed_ms, revalidated=True)
+        if response.status_code != 200:
+            return ApiResult(status=response.status_code, elapsed_ms=elapsed_ms,
+                             error=f"Failed to fetch {path}. Status: {response.status_code}")
+
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._bodies[key] = (etag, response.content)
+                self._bodies.move_to_end(key)
+                while len(self._bodies) > MAX_CACHED_BODIES:
+                    self._bodies.popitem(last=False)
+        return ApiResult(response.content, 200, elapsed_ms=elapsed_ms)
+
+    def get_many(self, calls: Dict[str, Tuple[str, Optional[Dict]]]) -> Dict[str, ApiResult]:
+        """Run several GETs at once: {name: (path, params)} -> {name: result}"""
+        futures = {name: self._executor.submit(self.get, path, params) for name, (path, params) in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+    def put(self, path: str, payload: Dict) -> requests.Response:
+        return self.session.put(f"{self.base_url}/{path}", json=payload, timeout=self.timeout)
@@ -1,10 +1,12 @@
 import streamlit as st
-import requests
 import pandas as pd
 import time
 import plotly.express as px
 from datetime import datetime, timedelta
 import json
+from urllib.parse import urlencode
+from api_client import ApiClient
+from frames import OrderFrames
 
 # Set page configuration
 st.set_page_config(
@@ -17,6 +19,13 @@ st.set_page_config(
 # Constants
 API_URL = "http://localhost:8000"
 REFRESH_INTERVAL = 30  # seconds
+TIME_RANGE_DELTAS = {
+    "Last 1 hour": timedelta(hours=1),
+    "Last 24 hours": timedelta(hours=24),
+    "Last 7 days": timedelta(days=7),
+    "Last 30 days": timedelta(days=30),
+}
+DASHBOARD_ROW_LIMIT = 5000  # max rows fetched per table
 
 # Initialize session state
 if 'auto_refresh' not in st.session_state:
@@ -34,6 +43,20 @@ if 'active_tab' not in st.session_state:
 if 'notification' not in st.session_state:
     st.session_state.notification = None
 
+def build_filter_params(time_range, statuses, room_filter):
+    """Translate sidebar filters into backend query parameters"""
+    params = {}
+    if time_range in TIME_RANGE_DELTAS:
+        since = datetime.now() - TIME_RANGE_DELTAS[time_range]
+        # Round to the minute so cached fetches are reused across reruns
+        params["since"] = since.replace(second=0, microsecond=0).isoformat()
+    if statuses:
+        params["status"] = statuses
+    room_numbers = [r.strip() for r in room_filter.split(',') if r.strip()] if room_filter else []
+    if room_numbers:
+        params["room_number"] = room_numbers
+    return params
+
 # Custom CSS for eco theme
 st.markdown("""
 <style>
@@ -174,20 +197,9 @@ st.markdown("""
 with st.sidebar:
     st.markdown("### ⚙️ Dashboard Controls")
     
-    # Backend Status
+    # Backend Status (filled in once the health check, fetched alongside the data, returns)
     st.markdown("#### 📊 System Status")
-    try:
-        health_response = requests.get(f"{API_URL}/health", timeout=2)
-        if health_response.status_code == 200:
-            status_data = health_response.json()
-            st.success(f"✅ **Backend Connected**")
-            st.caption(f"Status: {status_data.get('status', 'unknown')}")
-            st.caption(f"Database: {status_data.get('database', 'unknown')}")
-        else:
-            st.warning("⚠️ **Backend Issues**")
-    except:
-        st.error("❌ **Backend Unavailable**")
-        st.info("Start backend with: `uvicorn backend.main:app --reload`")
+    health_placeholder = st.empty()
     
     st.divider()
     
@@ -258,16 +270,26 @@ with st.sidebar:
     
     # Export section
     st.markdown("#### 📤 Export Data")
+    export_dataset = st.radio(
+        "Dataset",
+        options=["Orders", "Requests"],
+        horizontal=True,
+        index=0
+    )
     export_format = st.radio(
         "Export format",
-        options=["CSV", "Excel"],
+        options=["CSV", "NDJSON", "Parquet"],
         horizontal=True,
         index=0
     )
     
-    if st.button("📊 Download Current View", use_container_width=True):
-        st.session_state.last_update = datetime.now()
-        st.success("Export ready! (Feature in development)")
+    # The backend streams the whole filtered range, not just the rows loaded here
+    export_statuses = selected_order_status if export_dataset == "Orders" else selected_request_status
+    export_params = build_filter_params(time_range, export_statuses, room_filter)
+    export_params["format"] = export_format.lower()
+    
+    export_url = f"{API_URL}/export/{export_dataset.lower()}?{urlencode(export_params, doseq=True)}"
+    st.link_button("📊 Download Current View", export_url, use_container_width=True)
     
     st.divider()
     
@@ -279,36 +301,21 @@ with st.sidebar:
     if st.button("📋 Print Kitchen Tickets", use_container_width=True, type="secondary"):
         st.info("This would generate print jobs for pending orders")
 
-# Data fetching function with error handling
-@st.cache_data(ttl=10)  # Cache for 10 seconds
-def fetch_data(endpoint, params=None):
-    """Fetch data from backend API with error handling"""
-    try:
-        response = requests.get(f"{API_URL}/{endpoint}", params=params, timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Failed to fetch {endpoint}. Status: {response.status_code}")
-            return []
-    except requests.exceptions.ConnectionError:
-        st.error(f"❌ Cannot connect to backend at {API_URL}")
-        return []
-    except requests.exceptions.Timeout:
-        st.error("Request timed out. The server might be slow.")
-        return []
-    except Exception as e:
-        st.error(f"Unexpected error: {str(e)}")
-        return []
+# Backend client: pooled keep-alive connections, one timeout/retry policy, ETag revalidation
+@st.cache_resource
+def api_client():
+    return ApiClient(API_URL)
+
+@st.cache_resource
+def order_frames():
+    """Typed order frames shared across sessions and reruns, rebuilt only when the data changes"""
+    return OrderFrames()
 
 # Function to update order status via API
 def update_order_status(order_id, new_status):
     """Update order status by calling backend API"""
     try:
-        response = requests.put(
-            f"{API_URL}/orders/{order_id}",
-            json={"status": new_status},
-            timeout=5
-        )
+        response = api_client().put(f"orders/{order_id}", {"status": new_status})
         
         if response.status_code == 200:
             return True, "Order status updated successfully!"
@@ -321,11 +328,7 @@ def update_order_status(order_id, new_status):
 def update_request_status(request_id, new_status):
     """Update service request status by calling backend API"""
     try:
-        response = requests.put(
-            f"{API_URL}/requests/{request_id}",
-            json={"status": new_status},
-            timeout=5
-        )
+        response = api_client().put(f"requests/{request_id}", {"status": new_status})
         
         if response.status_code == 200:
             return True, "Request status updated successfully!"
@@ -351,60 +354,50 @@ if st.session_state.notification:
 
 # Load data with progress indicator
 with st.spinner("🌱 Loading eco-resort data..."):
-    # Build query parameters
-    params = {}
-    
-    # Apply room filter
-    if room_filter:
-        room_numbers = [r.strip() for r in room_filter.split(',') if r.strip()]
-        if len(room_numbers) == 1:
-            params['room_number'] = room_numbers[0]
-    
-    # Fetch data
-    orders = fetch_data("orders", params)
-    requests_data = fetch_data("requests", params)
+    # Build query parameters - filtering happens in the backend's SQL
+    order_params = build_filter_params(time_range, st.session_state.order_status_filter, room_filter)
+    order_params["limit"] = DASHBOARD_ROW_LIMIT
+    request_params = build_filter_params(time_range, st.session_state.request_status_filter, room_filter)
+    request_params["limit"] = DASHBOARD_ROW_LIMIT
+    
+    # Fetch everything at once; the refresh takes as long as the slowest call
+    results = api_client().get_many({
+        "health": ("health", None),
+        "orders": ("orders", order_params),
+        "requests": ("requests", request_params),
+    })
+    for message in dict.fromkeys(results[name].error for name in ("orders", "requests") if results[name].error):
+        st.error(message)
+    orders_body = results["orders"].body
+    requests_data = json.loads(results["requests"].body) if results["requests"].ok else []
     
     # Update last refresh time
     st.session_state.last_refresh = datetime.now()
 
+health = results["health"]
+with health_placeholder.container():
+    if health.ok:
+        status_data = json.loads(health.body)
+        st.success(f"✅ **Backend Connected**")
+        st.caption(f"Status: {status_data.get('status', 'unknown')}")
+        st.caption(f"Database: {status_data.get('database', 'unknown')}")
+        st.caption(f"Refreshed in {max(r.elapsed_ms for r in results.values()):.0f} ms")
+    elif health.status:
+        st.warning("⚠️ **Backend Issues**")
+    else:
+        st.error("❌ **Backend Unavailable**")
+        st.info("Start backend with: `uvicorn backend.main:app --reload`")
+
 # Main dashboard layout with tabs
 tab1, tab2, tab3 = st.tabs(["🍽️ Restaurant Orders", "🧹 Service Requests", "📈 Analytics"])
 
 # Tab 1: Restaurant Orders
 with tab1:
-    if orders:
-        df_orders = pd.DataFrame(orders)
+    if orders_body:
+        # Typed, with items_formatted, status_badge, hour, date and option_label precomputed; read-only
+        df_orders = order_frames().get(orders_body)
         
         if not df_orders.empty:
-            # Convert created_at to datetime
-            if 'created_at' in df_orders.columns:
-                df_orders['created_at'] = pd.to_datetime(df_orders['created_at'])
-                
-                # Apply time filter
-                if time_range == "Last 1 hour":
-                    cutoff = datetime.now() - timedelta(hours=1)
-                    df_orders = df_orders[df_orders['created_at'] >= cutoff]
-                elif time_range == "Last 24 hours":
-                    cutoff = datetime.now() - timedelta(hours=24)
-                    df_orders = df_orders[df_orders['created_at'] >= cutoff]
-                elif time_range == "Last 7 days":
-                    cutoff = datetime.now() - timedelta(days=7)
-                    df_orders = df_orders[df_orders['created_at'] >= cutoff]
-                elif time_range == "Last 30 days":
-                    cutoff = datetime.now() - timedelta(days=30)
-                    df_orders = df_orders[df_orders['created_at'] >= cutoff]
-            
-            # Apply status filter
-            if 'status' in df_orders.columns and st.session_state.order_status_filter:
-                df_orders = df_orders[df_orders['status'].isin(st.session_state.order_status_filter)]
-            
-            # Format items column
-            if 'items' in df_orders.columns:
-                df_orders['items_formatted'] = df_orders['items'].apply(
-                    lambda x: ", ".join([f"{int(i.get('quantity', 1))}x {i.get('name', 'Unknown')}" 
-                                        for i in x]) if isinstance(x, list) else str(x)
-                )
-            
             # Create sub-tabs for different views
             subtab1, subtab2, subtab3 = st.tabs(["📋 List View", "📊 Charts", "⚡ Manage"])
             
@@ -427,11 +420,7 @@ with tab1:
                 # Display dataframe with status badges
                 st.markdown("### 📝 Order Details")
                 
-                # Add status badges column
-                df_display = df_orders.copy()
-                df_display['status_badge'] = df_display['status'].apply(
-                    lambda x: f'<span class="status-badge status-{x.lower().replace(" ", "")}">{x}</span>'
-                )
+                df_display = df_orders
                 
                 # Select columns to display
                 display_cols = []
@@ -469,7 +458,7 @@ with tab1:
                 )
                 
                 # Export button
-                csv = df_display[['id', 'room_number', 'status', 'total_amount', 'items_formatted', 'created_at']].to_csv(index=False)
+                csv = order_frames().csv(df_orders)
                 st.download_button(
                     label="📥 Download Orders CSV",
                     data=csv,
@@ -498,7 +487,6 @@ with tab1:
                 
                 with chart_col2:
                     if 'created_at' in df_orders.columns:
-                        df_orders['hour'] = df_orders['created_at'].dt.hour
                         hour_counts = df_orders['hour'].value_counts().sort_index()
                         if not hour_counts.empty:
                             fig2 = px.bar(
@@ -524,7 +512,6 @@ with tab1:
                 
                 with metric_col3:
                     if 'created_at' in df_orders.columns:
-                        df_orders['date'] = df_orders['created_at'].dt.date
                         orders_per_day = df_orders['date'].value_counts().mean()
                         st.metric("Avg Orders/Day", f"{orders_per_day:.1f}")
             
@@ -538,26 +525,16 @@ with tab1:
                         st.markdown("#### Update Order Status")
                         
                         # Select order
-                        order_options = []
-                        for _, row in df_orders.iterrows():
-                            order_text = f"#{row['id']} - Room {row['room_number']} - {row['status']}"
-                            if 'items_formatted' in row:
-                                items_preview = row['items_formatted'][:30] + "..." if len(row['items_formatted']) > 30 else row['items_formatted']
-                                order_text += f" ({items_preview})"
-                            order_options.append((row['id'], order_text))
+                        order_ids = dict(zip(df_orders['option_label'].tolist(), df_orders['id'].tolist()))
                         
                         selected_order = st.selectbox(
                             "Select Order",
-                            options=[opt[1] for opt in order_options],
+                            options=list(order_ids),
                             key="order_select_manage"
                         )
                         
                         # Get selected order ID
-                        selected_order_id = None
-                        for order_id, order_text in order_options:
-                            if order_text == selected_order:
-                                selected_order_id = order_id
-                                break
+                        selected_order_id = order_ids.get(selected_order)
                         
                         # Status selection
                         col1, col2 = st.columns(2)
@@ -6,9 +6,33 @@ Run with: python run.py [command]
 
 import os
 import sys
+import signal
+import socket
 import subprocess
+import threading
 import time
+import urllib.request
 from datetime import datetime
+from importlib.util import find_spec
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Production serving defaults (python run.py serve)
+SERVE_KEEP_ALIVE_SECONDS = int(os.getenv("SERVE_KEEP_ALIVE_SECONDS", "30"))
+SERVE_BACKLOG = int(os.getenv("SERVE_BACKLOG", "2048"))
+SERVE_GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("SERVE_GRACEFUL_SHUTDOWN_SECONDS", "30"))
+
+# Startup orchestration (python run.py start)
+BACKEND_HEALTH_URL = "http://127.0.0.1:8000/health"
+DASHBOARD_HEALTH_URL = "http://127.0.0.1:8501/_stcore/health"
+STARTUP_TIMEOUT_SECONDS = float(os.getenv("STARTUP_TIMEOUT_SECONDS", "60"))
+# Readiness polls start 5 ms apart and double up to 250 ms
+READY_POLL_FIRST_SECONDS = 0.005
+READY_POLL_MAX_SECONDS = 0.25
+# Crashed services restart after 0.5 s, doubling up to 30 s; a minute of uptime resets the delay
+RESTART_BACKOFF_FIRST_SECONDS = 0.5
+RESTART_BACKOFF_MAX_SECONDS = 30.0
+RESTART_STABLE_SECONDS = 60.0
 
 def print_banner():
     """Print application banner"""
@@ -24,20 +48,23 @@ def check_dependencies():
     """Check if required packages are installed"""
     print("🔍 Checking dependencies...")
     
-    required = [
-        "fastapi",
-        "uvicorn",
-        "sqlalchemy",
-        "google-generativeai",
-        "streamlit",
-        "requests"
-    ]
+    # pip package -> module; find_spec locates a module without importing it
+    required = {
+        "fastapi": "fastapi",
+        "uvicorn": "uvicorn",
+        "sqlalchemy": "sqlalchemy",
+        "google-generativeai": "google.generativeai",
+        "streamlit": "streamlit",
+        "requests": "requests"
+    }
     
     missing = []
-    for package in required:
+    for package, module in required.items():
         try:
-            __import__(package.replace("-", "_"))
+            found = find_spec(module) is not None
         except ImportError:
+            found = False
+        if not found:
             missing.append(package)
     
     if missing:
@@ -74,12 +101,21 @@ def setup_database():
         else:
             print(f"✅ Database already has {existing_items} menu items")
         
+        # Databases created before room inventory existed
+        from backend.models import Room
+        db = SessionLocal()
+        room_count = db.query(Room).count()
+        db.close()
+        if room_count == 0:
+            from add_menu_items import seed_rooms
+            seed_rooms()
+        
         return True
     except Exception as e:
         print(f"❌ Database setup failed: {e}")
         return False
 
-def start_backend():
+def start_backend(**popen_kwargs):
     """Start FastAPI backend server"""
     print("🚀 Starting backend server...")
     print(f"📡 API: http://localhost:8000")
@@ -93,9 +129,9 @@ def start_backend():
         "--reload"
     ]
     
-    return subprocess.Popen(backend_cmd)
+    return subprocess.Popen(backend_cmd, **popen_kwargs)
 
-def start_dashboard():
+def start_dashboard(**popen_kwargs):
     """Start Streamlit dashboard"""
     print("📊 Starting dashboard...")
     print(f"🌐 Dashboard: http://localhost:8501")
@@ -108,7 +144,7 @@ def start_dashboard():
         "--theme.base", "light"
     ]
     
-    return subprocess.Popen(dashboard_cmd)
+    return subprocess.Popen(dashboard_cmd, **popen_kwargs)
 
 def open_frontend():
     """Open frontend in browser"""
@@ -124,28 +160,133 @@ def open_frontend():
         print("⚠️  Could not open browser automatically")
         print(f"   Please open: frontend/index.html in your browser")
 
-def health_check():
+def probe(url, timeout=1.0):
+    """True if url answers 200"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status == 200
+    except (OSError, ValueError):
+        return False
+
+def wait_for_url(url, timeout=STARTUP_TIMEOUT_SECONDS, process=None):
+    """
+    Poll url until it answers 200, backing off from 5 ms to 250 ms between
+    attempts. Returns the seconds it took, or None on timeout or as soon as
+    `process` exits.
+    """
+    start = time.perf_counter()
+    delay = READY_POLL_FIRST_SECONDS
+    while True:
+        if probe(url):
+            return time.perf_counter() - start
+        if process is not None and process.poll() is not None:
+            return None
+        remaining = timeout - (time.perf_counter() - start)
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, READY_POLL_MAX_SECONDS)
+
+def health_check(timeout=20):
     """Check if services are running"""
     print("🏥 Performing health check...")
     
-    import requests
-    import time
-    
-    max_attempts = 10
-    for i in range(max_attempts):
-        try:
-            response = requests.get("http://localhost:8000/health", timeout=2)
-            if response.status_code == 200:
-                print("✅ Backend is healthy!")
-                return True
-        except:
-            if i < max_attempts - 1:
-                print(f"   Attempt {i+1}/{max_attempts}...")
-                time.sleep(2)
+    seconds = wait_for_url(BACKEND_HEALTH_URL, timeout)
+    if seconds is not None:
+        print(f"✅ Backend is healthy! ({seconds * 1000:.0f} ms)")
+        return True
     
     print("❌ Backend not responding")
     return False
 
+class Component:
+    """A supervised child process: readiness, time-to-ready and restarts with backoff"""
+    
+    def __init__(self, name, launch, ready_url):
+        self.name = name
+        self.launch = launch
+        self.ready_url = ready_url
+        self.process = None
+        self.started_at = None
+        self.time_to_ready = None
+        self.ready = threading.Event()
+        self.restarts = 0
+        self.backoff = RESTART_BACKOFF_FIRST_SECONDS
+        self.restart_at = None
+    
+    def start(self):
+        self.ready.clear()
+        self.time_to_ready = None
+        self.started_at = time.perf_counter()
+        # Own process group, so uvicorn's reload worker and streamlit's children go with it
+        self.process = self.launch(start_new_session=True)
+        threading.Thread(target=self._await_ready, args=(self.process,), name=f"{self.name}-ready",
+                         daemon=True).start()
+    
+    def _await_ready(self, process):
+        seconds = wait_for_url(self.ready_url, STARTUP_TIMEOUT_SECONDS, process)
+        if process is not self.process:
+            return  # superseded by a restart
+        if seconds is None:
+            if process.poll() is None:
+                print(f"⚠️  {self.name} not ready after {STARTUP_TIMEOUT_SECONDS:.0f}s")
+            return
+        self.time_to_ready = time.perf_counter() - self.started_at
+        self.ready.set()
+        restart_note = f" (restart #{self.restarts})" if self.restarts else ""
+        print(f"✅ {self.name} ready in {self.time_to_ready * 1000:.0f} ms{restart_note}")
+    
+    def check(self):
+        """Schedule or perform a restart if the process has exited"""
+        now = time.perf_counter()
+        if self.restart_at is not None:
+            if now >= self.restart_at:
+                self.restart_at = None
+                self.restarts += 1
+                self.start()
+            return
+        
+        code = self.process.poll()
+        if code is None:
+            if self.ready.is_set() and now - self.started_at > RESTART_STABLE_SECONDS:
+                self.backoff = RESTART_BACKOFF_FIRST_SECONDS
+            return
+        self.ready.clear()
+        self._signal_group(signal.SIGKILL)  # orphans would keep the port and answer health checks
+        print(f"⚠️  {self.name} exited ({code}), restarting in {self.backoff:.1f}s")
+        self.restart_at = now + self.backoff
+        self.backoff = min(self.backoff * 2, RESTART_BACKOFF_MAX_SECONDS)
+    
+    def stop(self):
+        """SIGTERM the process group; SIGKILL whatever is left after 5 s"""
+        if self.process is None:
+            return
+        self._signal_group(signal.SIGTERM)
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        self._signal_group(signal.SIGKILL)
+    
+    def _signal_group(self, sig):
+        try:
+            os.killpg(self.process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+def start_all(components, timeout=STARTUP_TIMEOUT_SECONDS):
+    """Launch every component at once; True when all are ready (crashes restart meanwhile)"""
+    for component in components:
+        component.start()
+    deadline = time.perf_counter() + timeout
+    while not all(component.ready.is_set() for component in components):
+        if time.perf_counter() > deadline:
+            return False
+        for component in components:
+            component.check()
+        time.sleep(0.01)
+    return True
+
 def cleanup(processes):
     """Cleanup running processes"""
     print("\n🧹 Cleaning up...")
@@ -161,6 +302,176 @@ def cleanup(processes):
                     pass
     print("✅ All processes stopped")
 
+def parse_serve_args(args):
+    """Options for serve: --workers N, --host, --port"""
+    options = {"workers": os.cpu_count() or 1, "host": "0.0.0.0", "port": 8000}
+    i = 0
+    while i < len(args):
+        name = args[i].lstrip("-")
+        if name in options and i + 1 < len(args):
+            value = args[i + 1]
+            options[name] = value if name == "host" else int(value)
+            i += 2
+        else:
+            raise ValueError(f"Unknown serve option: {args[i]}")
+    options["workers"] = max(1, options["workers"])
+    return options
+
+def uvicorn_serve_options():
+    """uvloop/httptools when installed, plus keep-alive, backlog and graceful shutdown tuning"""
+    loop = "uvloop" if find_spec("uvloop") else "asyncio"
+    http = "httptools" if find_spec("httptools") else "h11"
+    return [
+        "--app-dir", ROOT,
+        "--loop", loop,
+        "--http", http,
+        "--timeout-keep-alive", str(SERVE_KEEP_ALIVE_SECONDS),
+        "--backlog", str(SERVE_BACKLOG),
+        "--timeout-graceful-shutdown", str(SERVE_GRACEFUL_SHUTDOWN_SECONDS),
+        "--no-access-log",
+    ]
+
+def uvicorn_cmd(app, host, port, extra=()):
+    return [sys.executable, "-m", "uvicorn", app, "--host", host, "--port", str(port),
+            *uvicorn_serve_options(), *extra]
+
+def wait_until_ready(port, timeout=30):
+    """Poll a worker's /health until it answers"""
+    return wait_for_url(f"http://127.0.0.1:{port}/health", timeout) is not None
+
+def stop_process(process):
+    """SIGTERM lets uvicorn finish in-flight requests before exiting"""
+    process.terminate()
+    try:
+        process.wait(timeout=SERVE_GRACEFUL_SHUTDOWN_SECONDS + 5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def serve_single(host, port):
+    """
+    One worker. A lone uvicorn server has no SIGHUP handler (the signal
+    would kill it), so the listening socket is held here and SIGHUP
+    replaces the server process on it; connections that arrive in between
+    wait in the socket's backlog instead of being refused.
+    """
+    listener = socket.create_server((host, port), backlog=SERVE_BACKLOG)
+    fd = listener.fileno()
+    
+    def start():
+        return subprocess.Popen(uvicorn_cmd("backend.main:app", host, port, ["--fd", str(fd)]), pass_fds=(fd,))
+    
+    process = start()
+    reload_requested = []
+    stopping = []
+    signal.signal(signal.SIGHUP, lambda *_: reload_requested.append(True))
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    
+    try:
+        while not stopping:
+            if reload_requested:
+                reload_requested.clear()
+                print("🔄 Reloading worker...")
+                stop_process(process)
+                process = start()
+                wait_until_ready(port)
+                print("✅ Worker reloaded")
+            elif process.poll() is not None:
+                print(f"⚠️  Worker exited ({process.returncode}), restarting")
+                process = start()
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_process(process)
+        listener.close()
+    return 0
+
+def serve(workers, host="0.0.0.0", port=8000):
+    """
+    Production server: no --reload, one process per worker.
+    
+    With a shared session store (SESSION_STORE=sqlite/redis) uvicorn
+    pre-forks the workers onto one socket. With the in-process store,
+    workers listen on port+1..port+N behind backend.router, which sends
+    each session_id to the same worker every time. SIGHUP reloads the
+    workers one at a time without dropping the listening socket (a
+    single worker is restarted on a socket held by serve_single).
+    """
+    from backend.session_store import SESSION_STORE, create_session_store
+    
+    # Select the store now, so a missing optional package (redis) stops here and not on every worker's first chat
+    try:
+        create_session_store()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    # Create tables once here so workers don't race on schema setup
+    from backend.database import init_db
+    init_db()
+    
+    options = uvicorn_serve_options()
+    print(f"🚀 Serving with {workers} worker(s) on http://{host}:{port}")
+    print(f"   loop={options[options.index('--loop') + 1]} http={options[options.index('--http') + 1]}"
+          f" keep-alive={SERVE_KEEP_ALIVE_SECONDS}s backlog={SERVE_BACKLOG} sessions={SESSION_STORE}")
+    
+    if workers == 1:
+        return serve_single(host, port)
+    
+    if SESSION_STORE != "memory":
+        # Any worker can serve any session; uvicorn's supervisor reloads gracefully on SIGHUP
+        process = subprocess.Popen(uvicorn_cmd("backend.main:app", host, port, ["--workers", str(workers)]))
+        signal.signal(signal.SIGHUP, lambda *_: process.send_signal(signal.SIGHUP))
+        signal.signal(signal.SIGTERM, lambda *_: process.terminate())
+        try:
+            return process.wait()
+        except KeyboardInterrupt:
+            stop_process(process)
+            return 0
+    
+    ports = [port + 1 + i for i in range(workers)]
+    worker_processes = {p: subprocess.Popen(uvicorn_cmd("backend.main:app", "127.0.0.1", p)) for p in ports}
+    for p in ports:
+        if not wait_until_ready(p):
+            print(f"❌ Worker on port {p} did not start")
+            cleanup(list(worker_processes.values()))
+            return 1
+    
+    router_env = dict(os.environ, ROUTER_UPSTREAMS=",".join(f"http://127.0.0.1:{p}" for p in ports))
+    router = subprocess.Popen(uvicorn_cmd("backend.router:app", host, port), env=router_env)
+    print(f"🔀 Session-affinity router → workers on ports {ports[0]}-{ports[-1]}")
+    
+    reload_requested = []
+    stopping = []
+    signal.signal(signal.SIGHUP, lambda *_: reload_requested.append(True))
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    
+    try:
+        while not stopping and router.poll() is None:
+            if reload_requested:
+                reload_requested.clear()
+                print("🔄 Reloading workers...")
+                # One at a time; the router retries a worker's sessions until it is back
+                for p in ports:
+                    stop_process(worker_processes[p])
+                    worker_processes[p] = subprocess.Popen(uvicorn_cmd("backend.main:app", "127.0.0.1", p))
+                    wait_until_ready(p)
+                print("✅ Workers reloaded")
+            
+            for p, process in worker_processes.items():
+                if process.poll() is not None:
+                    print(f"⚠️  Worker on port {p} exited ({process.returncode}), restarting")
+                    worker_processes[p] = subprocess.Popen(uvicorn_cmd("backend.main:app", "127.0.0.1", p))
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_process(router)
+        for process in worker_processes.values():
+            stop_process(process)
+    return 0
+
 def main():
     """Main entry point"""
     print_banner()
@@ -176,29 +487,26 @@ def main():
         if not setup_database():
             return 1
         
-        processes = []
+        # Backend and dashboard start together; each is up once its health endpoint answers
+        components = [
+            Component("Backend", start_backend, BACKEND_HEALTH_URL),
+            Component("Dashboard", start_dashboard, DASHBOARD_HEALTH_URL),
+        ]
+        started = time.perf_counter()
         try:
-            # Start backend
-            backend_process = start_backend()
-            processes.append(backend_process)
-            time.sleep(3)  # Wait for backend to start
-            
-            # Check backend health
-            if not health_check():
-                cleanup(processes)
+            if not start_all(components):
+                not_ready = ", ".join(c.name for c in components if not c.ready.is_set())
+                print(f"❌ Not ready after {STARTUP_TIMEOUT_SECONDS:.0f}s: {not_ready}")
                 return 1
             
-            # Start dashboard
-            dashboard_process = start_dashboard()
-            processes.append(dashboard_process)
-            time.sleep(2)
-            
             # Open frontend
             open_frontend()
             
             print("\n" + "="*50)
-            print("✅ SYSTEM IS RUNNING!")
+            print(f"✅ SYSTEM IS RUNNING! (ready in {(time.perf_counter() - started) * 1000:.0f} ms)")
             print("="*50)
+            for component in components:
+                print(f"   {component.name}: ready in {component.time_to_ready * 1000:.0f} ms")
             print("\n📱 Access Points:")
             print("   Chat Interface: frontend/index.html")
             print("   Dashboard: http://localhost:8501")
@@ -206,20 +514,35 @@ def main():
             print("\n🛑 Press Ctrl+C to stop all services")
             print("="*50)
             
-            # Keep running
+            # Keep running, restarting anything that crashes
             try:
                 while True:
-                    time.sleep(1)
+                    for component in components:
+                        component.check()
+                    time.sleep(0.2)
             except KeyboardInterrupt:
                 print("\n👋 Shutting down...")
         
         finally:
-            cleanup(processes)
+            print("\n🧹 Cleaning up...")
+            for component in components:
+                component.stop()
+            print("✅ All processes stopped")
     
     elif command == "backend":
         # Start only backend
         start_backend().wait()
     
+    elif command == "serve":
+        # Production multi-worker backend
+        try:
+            options = parse_serve_args(sys.argv[2:])
+        except ValueError as e:
+            print(f"❌ {e}")
+            print("   Use: python run.py serve --workers N [--host H] [--port P]")
+            return 1
+        return serve(**options)
+    
     elif command == "dashboard":
         # Start only dashboard
         start_dashboard().wait()
@@ -240,7 +563,8 @@ def main():
     elif command == "help":
         print("\n📖 Available commands:")
         print("  start       - Start all services (backend + dashboard)")
-        print("  backend     - Start only backend API")
+        print("  backend     - Start only backend API (development, auto-reload)")
+        print("  serve       - Production backend: serve --workers N [--host H] [--port P]")
         print("  dashboard   - Start only Streamlit dashboard")
         print("  setup-db    - Initialize database tables")
         print("  seed-menu   - Add sample menu items")
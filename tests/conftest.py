@@ -0,0 +1,45 @@
+import itertools
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+# The app keeps resort.db in the working directory; give the test run its own, and no real LLM
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="resort_tests_"))
+os.environ["FAKE_LLM"] = "1"
+
+_stays = itertools.count()
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """Tables, menu and room inventory in the test run's database"""
+    import add_menu_items
+    add_menu_items.setup_full_database()
+
+@pytest.fixture
+def client(seeded_db):
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    return TestClient(app)
+
+@pytest.fixture
+def stay():
+    """Two nights no other test books"""
+    check_in = date.today() + timedelta(days=30 + 3 * next(_stays))
+    return check_in, check_in + timedelta(days=2)
+
+@pytest.fixture
+def menu_db(tmp_path, monkeypatch):
+    """A database of its own with an empty menu, for tests that rewrite the menu"""
+    from sqlalchemy import create_engine
+    from backend import database, menu_loader, menu_search
+    engine = create_engine(f"sqlite:///{tmp_path / 'menu.db'}")
+    for module in (database, menu_loader, menu_search):
+        monkeypatch.setattr(module, "engine", engine)
+    monkeypatch.setattr(menu_search, "FTS_AVAILABLE", True)
+    database.init_db()
+    return engine
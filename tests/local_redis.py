@@ -0,0 +1,31 @@
+import threading
+import time
+from typing import Dict
+
+class LocalRedis:
+    """Minimal in-process stand-in for a Redis client (get/set/delete with expiry), for tests"""
+
+    def __init__(self, clock=time.time):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[name]
+                return None
+            return value
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (value, self._clock() + ex if ex else None)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
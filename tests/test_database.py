@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, inspect, text
+
+from backend import database, menu_search
+
+def test_init_db_dedupes_menu_names_of_an_old_database(tmp_path, monkeypatch):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text("CREATE TABLE menu_items (id INTEGER PRIMARY KEY, name VARCHAR, description VARCHAR, "
+                          "price FLOAT, category VARCHAR)"))
+        conn.execute(text("INSERT INTO menu_items (name, price, category) VALUES "
+                          "('Masala Dosa', 100, 'Breakfast'), ('Idli', 60, 'Breakfast'), "
+                          "('Masala Dosa', 120, 'Breakfast')"))
+    monkeypatch.setattr(database, "engine", legacy)
+    monkeypatch.setattr(menu_search, "engine", legacy)
+
+    database.init_db()
+
+    with legacy.begin() as conn:
+        rows = conn.execute(text("SELECT name, price FROM menu_items ORDER BY name")).all()
+    assert [tuple(row) for row in rows] == [("Idli", 60), ("Masala Dosa", 120)]
+    assert "uq_menu_items_name" in {index["name"] for index in inspect(legacy).get_indexes("menu_items")}
@@ -0,0 +1,70 @@
+import pytest
+
+from backend import tools
+from dashboard.api_client import ApiClient
+
+def place_order(room, items=None):
+    tools.place_restaurant_order(room, items or {"Masala Dosa": 1})
+
+@pytest.mark.parametrize("path", ["orders", "requests"])
+def test_unchanged_list_is_answered_with_304(client, path):
+    first = client.get(f"/{path}", params={"room_number": "501"})
+    etag = first.headers["ETag"]
+
+    again = client.get(f"/{path}", params={"room_number": "501"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+
+def test_etag_matches_any_tag_in_the_header(client):
+    etag = client.get("/orders", params={"room_number": "502"}).headers["ETag"]
+    again = client.get("/orders", params={"room_number": "502"}, headers={"If-None-Match": f'"stale", {etag}'})
+    assert again.status_code == 304
+
+def test_new_order_changes_the_etag(client):
+    etag = client.get("/orders", params={"room_number": "503"}).headers["ETag"]
+    place_order("503")
+
+    fresh = client.get("/orders", params={"room_number": "503"}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert [order["room_number"] for order in fresh.json()] == ["503"]
+
+def test_status_update_changes_the_etag(client):
+    place_order("504")
+    listed = client.get("/orders", params={"room_number": "504"})
+    etag, order_id = listed.headers["ETag"], listed.json()[0]["id"]
+
+    client.put(f"/orders/{order_id}", json={"status": "Delivered"})
+    fresh = client.get("/orders", params={"room_number": "504"}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json()[0]["status"] == "Delivered"
+
+def test_service_request_changes_the_etag(client):
+    etag = client.get("/requests", params={"room_number": "505"}).headers["ETag"]
+    tools.create_room_service_request("505", "towel", "2 towels")
+
+    fresh = client.get("/requests", params={"room_number": "505"}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert len(fresh.json()) == 1
+
+def test_filters_have_their_own_etag(client):
+    place_order("506")
+    one = client.get("/orders", params={"room_number": "506"}).headers["ETag"]
+    other = client.get("/orders", params={"room_number": "506", "status": "Delivered"}).headers["ETag"]
+    assert one != other
+
+def test_dashboard_client_reuses_the_body_on_304(client):
+    api = ApiClient("http://testserver")
+    api.session = client
+    place_order("507")
+
+    first = api.get("orders", {"room_number": ["507"]})
+    again = api.get("orders", {"room_number": ["507"]})
+    assert first.status == 200 and not first.revalidated
+    assert again.status == 304 and again.revalidated
+    assert again.body == first.body
+
+    place_order("507", {"Masala Dosa": 2})
+    changed = api.get("orders", {"room_number": ["507"]})
+    assert changed.status == 200 and changed.body != first.body
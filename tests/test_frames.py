@@ -0,0 +1,58 @@
+import json
+
+import pandas as pd
+
+from dashboard.frames import OrderFrames, build_order_frame, format_items
+
+def order(order_id, items, status="Pending", room="101"):
+    return {"id": order_id, "room_number": room, "items": items, "total_amount": 120.0,
+            "status": status, "created_at": "2026-10-19T08:30:00"}
+
+def test_format_items():
+    items = pd.Series([
+        [{"name": "Masala Chai", "quantity": 2}, {"name": "Samosa", "quantity": 1}],
+        [],
+        "legacy text",
+        [{"name": None, "quantity": None}],
+    ])
+    assert format_items(items).tolist() == ["2x Masala Chai, 1x Samosa", "", "legacy text", "1x Unknown"]
+
+def test_order_frame_columns():
+    frame = build_order_frame([order(7, [{"name": "Masala Dosa", "quantity": 1}], status="In Progress")])
+    row = frame.iloc[0]
+    assert row["items_formatted"] == "1x Masala Dosa"
+    assert row["status_badge"] == '<span class="status-badge status-inprogress">In Progress</span>'
+    assert row["hour"] == 8
+    assert row["option_label"] == "#7 - Room 101 - In Progress (1x Masala Dosa)"
+
+def test_long_items_are_previewed():
+    frame = build_order_frame([order(8, [{"name": "Paneer Butter Masala", "quantity": 3}] * 3)])
+    assert frame.iloc[0]["option_label"].endswith("...)")
+
+def test_same_body_reuses_the_frame_and_csv():
+    frames = OrderFrames()
+    body = json.dumps([order(1, [{"name": "Masala Dosa", "quantity": 1}])]).encode()
+
+    frame = frames.get(body)
+    assert frames.get(body) is frame
+    assert frames.csv(frame) is frames.csv(frame)
+    assert frames.csv(frame).splitlines()[0] == "id,room_number,status,total_amount,items_formatted,created_at"
+
+def test_new_data_keeps_items_text_of_known_orders():
+    frames = OrderFrames()
+    frames.get(json.dumps([order(1, [{"name": "Masala Dosa", "quantity": 1}])]).encode())
+    # Items of order 1 are not formatted again, so its remembered text shows even if the body differs
+    frame = frames.get(json.dumps([
+        order(1, [{"name": "changed", "quantity": 9}], status="Delivered"),
+        order(2, [{"name": "Samosa", "quantity": 2}]),
+    ]).encode())
+    assert frame["items_formatted"].tolist() == ["1x Masala Dosa", "2x Samosa"]
+    assert frame["status"].tolist() == ["Delivered", "Pending"]
+
+def test_only_recent_versions_are_kept():
+    frames = OrderFrames(max_versions=2)
+    bodies = [json.dumps([order(i, [])]).encode() for i in range(3)]
+    first = frames.get(bodies[0])
+    frames.get(bodies[1])
+    frames.get(bodies[2])
+    assert frames.get(bodies[0]) is not first
@@ -0,0 +1,67 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend import idempotency, tools
+from backend.database import SessionLocal
+from backend.models import Order, ServiceRequest
+
+WINDOW = idempotency.IDEMPOTENCY_WINDOW_SECONDS
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls the time idempotency keys are bucketed by; starts 10 s into a window"""
+    now = [WINDOW * 1_000_000 + 10.0]
+    monkeypatch.setattr(idempotency, "time", SimpleNamespace(time=lambda: now[0], monotonic=time.monotonic))
+    return now
+
+def count(model, room_number):
+    db = SessionLocal()
+    try:
+        return db.query(model).filter(model.room_number == room_number).count()
+    finally:
+        db.close()
+
+def other_worker():
+    """A worker (or a restart) that has never seen the earlier submissions"""
+    idempotency.order_cache._entries.clear()
+    idempotency.request_cache._entries.clear()
+
+def test_double_submission_returns_original(seeded_db, clock):
+    first = tools.place_restaurant_order("401", {"Masala Dosa": 1}, session_id="idem-1")
+    again = tools.place_restaurant_order("401", {"masala dosa": 1}, session_id="idem-1")
+    assert "ORDER PLACED" in first and "ALREADY PLACED" in again
+    assert count(Order, "401") == 1
+
+def test_retry_across_window_on_another_worker(seeded_db, clock):
+    tools.place_restaurant_order("402", {"Masala Dosa": 1}, session_id="idem-2")
+    tools.create_room_service_request("402", "towel", "2 towels", session_id="idem-2")
+    clock[0] += WINDOW
+    other_worker()
+    assert "ALREADY PLACED" in tools.place_restaurant_order("402", {"Masala Dosa": 1}, session_id="idem-2")
+    assert "ALREADY REQUESTED" in tools.create_room_service_request("402", "towel", "2 towels", session_id="idem-2")
+    assert count(Order, "402") == 1 and count(ServiceRequest, "402") == 1
+
+@pytest.mark.parametrize("fresh_worker", [False, True])
+def test_repeating_order_does_not_extend_window(seeded_db, clock, fresh_worker):
+    room = "403" if fresh_worker else "404"
+    for _ in range(3):
+        tools.place_restaurant_order(room, {"Masala Dosa": 1}, session_id=f"idem-3-{room}")
+        tools.create_room_service_request(room, "towel", "2 towels", session_id=f"idem-3-{room}")
+        clock[0] += 100
+        if fresh_worker:
+            other_worker()
+    # 0 s, 100 s and 200 s are one submission; at 300 s the original's window is over
+    assert count(Order, room) == 1 and count(ServiceRequest, room) == 1
+    tools.place_restaurant_order(room, {"Masala Dosa": 1}, session_id=f"idem-3-{room}")
+    tools.create_room_service_request(room, "towel", "2 towels", session_id=f"idem-3-{room}")
+    assert count(Order, room) == 2 and count(ServiceRequest, room) == 2
+
+def test_client_key_overrides_content(seeded_db, clock):
+    tools.place_restaurant_order("405", {"Masala Dosa": 1}, session_id="idem-4", idempotency_key="tap-1")
+    other_worker()
+    clock[0] += 10 * WINDOW
+    assert "ALREADY PLACED" in tools.place_restaurant_order("405", {"Masala Dosa": 1}, idempotency_key="tap-1")
+    tools.place_restaurant_order("405", {"Masala Dosa": 1}, session_id="idem-4", idempotency_key="tap-2")
+    assert count(Order, "405") == 2
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+
+from backend.llm_guard import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LLMGuard, LLMUnavailable
+
+class FakeChat:
+    """Chat session whose send_message answers, fails or hangs"""
+
+    def __init__(self, reply="ok", error=None, hang=None):
+        self.reply = reply
+        self.error = error
+        self.hang = hang
+        self.history = []
+
+    def send_message(self, message):
+        if self.hang:
+            self.hang.wait(5)
+        if self.error:
+            raise self.error
+        return self.reply
+
+@pytest.fixture
+def guard():
+    guard = LLMGuard(timeout=0.2, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    yield guard
+    guard.executor.shutdown(wait=False)
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_seconds=0)
+    for _ in range(5):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+def test_send_returns_the_reply_and_session(guard):
+    chat = FakeChat("hello")
+    assert guard.send(chat, "hi") == ("hello", chat)
+    assert guard.counts["succeeded"] == 1
+
+def test_slow_call_times_out(guard):
+    release = threading.Event()
+    with pytest.raises(LLMUnavailable) as e:
+        guard.send(FakeChat(hang=release), "hi")
+    release.set()
+    assert e.value.reason == "timeout"
+    assert guard.counts["timeouts"] == 1
+
+def test_errors_open_the_circuit_and_later_calls_are_rejected(guard):
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable) as e:
+            guard.send(FakeChat(error=ConnectionError("503")), "hi")
+        assert e.value.reason == "error"
+
+    chat = FakeChat()
+    with pytest.raises(LLMUnavailable) as e:
+        guard.send(chat, "hi")
+    assert e.value.reason == "circuit_open"
+    assert guard.counts["rejected"] == 1
+    assert guard.snapshot()["circuit"]["state"] == OPEN
+
+def test_hedged_call_wins_when_the_first_is_slow():
+    release = threading.Event()
+    hedge = FakeChat("from hedge")
+    slow = FakeChat(hang=release)
+    slow.model = type("Model", (), {"start_chat": lambda self, history: hedge})()
+    guard = LLMGuard(timeout=2, hedge_after=0.05, breaker=CircuitBreaker())
+    try:
+        assert guard.send(slow, "hi") == ("from hedge", hedge)
+        assert guard.counts["hedged"] == 1 and guard.counts["hedge_wins"] == 1
+    finally:
+        release.set()
+        guard.executor.shutdown(wait=False)
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import text
+
+from backend.menu_loader import load_menu_file, read_menu_file, upsert_menu_items
+
+MENU = [
+    {"name": "Masala Dosa", "description": "Crisp rice crepe", "price": "120", "category": "Breakfast"},
+    {"name": "Idli", "description": "Steamed rice cakes", "price": 60, "category": "Breakfast"},
+    {"name": "Filter Coffee", "price": 40, "category": "Beverages"},
+]
+
+def menu(engine):
+    with engine.connect() as conn:
+        return {row.name: (row.price, row.category) for row in conn.execute(text("SELECT * FROM menu_items"))}
+
+def test_first_load_adds_everything(menu_db):
+    diff = upsert_menu_items(MENU)
+    assert diff == {"added": ["Masala Dosa", "Idli", "Filter Coffee"], "updated": [], "unchanged": 0, "missing": []}
+    assert menu(menu_db)["Masala Dosa"] == (120.0, "Breakfast")
+
+def test_reload_reports_only_what_changed(menu_db):
+    upsert_menu_items(MENU)
+    changed = [dict(MENU[0], price="130"), MENU[1], {"name": "Vada", "price": 50, "category": "Breakfast"}]
+
+    diff = upsert_menu_items(changed)
+    assert diff == {"added": ["Vada"], "updated": ["Masala Dosa"], "unchanged": 1, "missing": ["Filter Coffee"]}
+    assert menu(menu_db)["Masala Dosa"] == (130.0, "Breakfast")
+    assert "Filter Coffee" in menu(menu_db)
+
+def test_prune_removes_missing_items(menu_db):
+    upsert_menu_items(MENU)
+    diff = upsert_menu_items(MENU[:1], prune=True)
+    assert diff["removed"] == ["Idli", "Filter Coffee"]
+    assert set(menu(menu_db)) == {"Masala Dosa"}
+
+def test_rows_are_cleaned(menu_db):
+    diff = upsert_menu_items([{"name": "  Upma ", "price": "n/a"}, {"name": ""}, {"price": 10}])
+    assert diff["added"] == ["Upma"]
+    assert menu(menu_db) == {"Upma": (0.0, None)}
+
+def test_repeated_name_last_one_wins(menu_db):
+    diff = upsert_menu_items([MENU[1], dict(MENU[1], price=70)], chunk_size=1)
+    assert diff["added"] == ["Idli"]
+    assert menu(menu_db)["Idli"] == (70.0, "Breakfast")
+
+def test_load_csv_and_jsonl(menu_db, tmp_path):
+    csv_file = tmp_path / "menu.csv"
+    csv_file.write_text("name,description,price,category\nMasala Dosa,Crisp,120,Breakfast\n", encoding="utf-8")
+    jsonl_file = tmp_path / "menu.jsonl"
+    jsonl_file.write_text('{"name": "Idli", "price": 60}\n\n{"name": "Masala Dosa", "price": 125}\n', encoding="utf-8")
+
+    assert load_menu_file(str(csv_file))["added"] == ["Masala Dosa"]
+    diff = load_menu_file(str(jsonl_file))
+    assert diff["added"] == ["Idli"] and diff["updated"] == ["Masala Dosa"]
+
+def test_unsupported_file_type(tmp_path):
+    path = tmp_path / "menu.xlsx"
+    path.write_text("")
+    with pytest.raises(ValueError, match="Unsupported menu file type"):
+        list(read_menu_file(str(path)))
@@ -0,0 +1,52 @@
+import pytest
+
+from backend import menu_search
+from backend.menu_loader import upsert_menu_items
+from backend.menu_search import search_menu_items
+
+MENU = [
+    {"name": "Masala Dosa", "description": "Crisp rice crepe with potato filling", "price": 120, "category": "Breakfast"},
+    {"name": "Paneer Tikka", "description": "Grilled cottage cheese", "price": 280, "category": "Starters"},
+    {"name": "Potato Wedges", "description": "Fried and spiced", "price": 150, "category": "Snacks"},
+    {"name": "Mango Lassi", "description": "Sweet yogurt drink", "price": 90, "category": "Beverages"},
+]
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def menu(request, menu_db, monkeypatch):
+    upsert_menu_items(MENU)
+    monkeypatch.setattr(menu_search, "FTS_AVAILABLE", request.param)
+
+def names(query, **kwargs):
+    return [item["name"] for item in search_menu_items(query, **kwargs)]
+
+def test_name_match_ranks_above_description(menu):
+    assert names("potato") == ["Potato Wedges", "Masala Dosa"]
+
+def test_category_and_filler_words(menu):
+    assert names("i would like something from breakfast please") == ["Masala Dosa"]
+
+def test_only_filler_words_find_nothing(menu):
+    assert names("something to eat please") == names("") == []
+
+def test_limit(menu):
+    assert len(names("potato", limit=1)) == 1
+
+def test_fts_matches_prefixes_and_stems(menu_db):
+    upsert_menu_items(MENU)
+    assert names("pane") == ["Paneer Tikka"]
+    assert names("grill") == ["Paneer Tikka"]
+
+def test_fts_syntax_in_queries_is_harmless(menu_db):
+    upsert_menu_items(MENU)
+    assert names('lassi" OR name:*') == ["Mango Lassi"]
+
+def test_index_follows_menu_updates(menu_db):
+    upsert_menu_items(MENU)
+    upsert_menu_items([dict(MENU[3], name="Rose Lassi")], prune=True)
+    assert names("mango") == []
+    assert names("rose") == ["Rose Lassi"]
+
+def test_endpoint(client):
+    response = client.get("/menu/search", params={"q": "dosa", "limit": 3})
+    assert response.status_code == 200
+    assert any("Dosa" in item["name"] for item in response.json()["results"])
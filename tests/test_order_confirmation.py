@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from backend.llm_guard import OPEN, llm_guard
+
+def chat(client, session_id, *messages):
+    history, replies = [], []
+    for message in messages:
+        history.append({"role": "user", "content": message})
+        reply = client.post("/chat", json={"session_id": session_id, "history": history}).json()["response"]
+        history.append({"role": "assistant", "content": reply})
+        replies.append(reply)
+    return replies
+
+def orders_for(client, room_number):
+    return client.get("/orders", params={"room_number": [room_number]}).json()
+
+@pytest.fixture
+def llm_down(monkeypatch):
+    """Circuit breaker open, so the restaurant agent takes orders locally"""
+    breaker = llm_guard.breaker
+    monkeypatch.setattr(breaker, "state", OPEN)
+    monkeypatch.setattr(breaker, "opened_at", time.monotonic())
+    monkeypatch.setattr(breaker, "reset_seconds", 3600)
+
+def test_remembered_room_is_confirmed_not_billed(client):
+    replies = chat(client, "confirm-1", "I'm in room 311", "I want 1 masala dosa")
+    assert "room 311" in replies[-1] and "ORDER PLACED" not in replies[-1]
+    assert orders_for(client, "311") == []
+    chat(client, "confirm-1", "I'm in room 311", "I want 1 masala dosa", "311")
+    assert len(orders_for(client, "311")) == 1
+
+@pytest.mark.parametrize("answer", ["yes", "Yes please", "ok, send it"])
+def test_yes_confirms_offered_room(client, answer):
+    replies = chat(client, f"yes-{answer}", "I'm in room 315", "I want 1 masala dosa", answer)
+    assert "ORDER PLACED" in replies[-1] and "Room 315" in replies[-1]
+
+def test_other_room_in_reply_wins(client):
+    chat(client, "yes-other", "I'm in room 316", "I want 1 masala dosa", "yes, 317")
+    assert orders_for(client, "316") == [] and len(orders_for(client, "317")) == 1
+
+@pytest.mark.parametrize("answer", ["no, not 312", "dont send to 312!", "cancel that, 312 is wrong"])
+def test_negated_room_reply_places_nothing(client, answer):
+    replies = chat(client, f"negated-{answer}", "I'm in room 312", "I want 1 masala dosa", answer)
+    assert "haven't placed" in replies[-1]
+    assert orders_for(client, "312") == []
+
+def test_held_order_lives_one_turn(client, llm_down):
+    replies = chat(client, "held-1", "I'd like 2 masala dosa", "never mind, cancel that",
+                   "what time is the pool open?", "Please send housekeeping to room 313 for cleaning")
+    assert "room number" in replies[0]
+    assert orders_for(client, "313") == []
+
+def test_held_order_placed_on_room_answer(client, llm_down):
+    replies = chat(client, "held-2", "I'd like 2 masala dosa", "314")
+    assert "ORDER PLACED" in replies[-1]
+    assert orders_for(client, "314")[0]["items"][0]["quantity"] == 2
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend import admin, reservations
+from backend.availability import get_availability_index
+
+def test_guest_confirms_and_cancels_own_hold(seeded_db, stay):
+    hold = reservations.create_hold("deluxe", *stay, guests=2, session_id="guest-a")
+    booking = reservations.confirm_hold(hold["id"], "guest-a", "Priya")
+    assert booking["status"] == "Confirmed" and booking["guest_name"] == "Priya"
+    assert reservations.cancel_booking(hold["id"], "guest-a")["status"] == "Cancelled"
+
+def test_other_session_cannot_confirm_or_cancel(seeded_db, stay):
+    hold = reservations.create_hold("deluxe", *stay, session_id="guest-a")
+    with pytest.raises(reservations.BookingError):
+        reservations.confirm_hold(hold["id"], "guest-b")
+    reservations.confirm_hold(hold["id"], "guest-a")
+    # Already confirmed: still not readable by another session
+    with pytest.raises(reservations.BookingError):
+        reservations.confirm_hold(hold["id"], "guest-b")
+    with pytest.raises(reservations.BookingError):
+        reservations.cancel_booking(hold["id"], "guest-b")
+
+def test_session_is_required(seeded_db, stay):
+    hold = reservations.create_hold("deluxe", *stay, session_id="guest-a")
+    for session_id in (None, ""):
+        with pytest.raises(reservations.BookingError):
+            reservations.confirm_hold(hold["id"], session_id)
+        with pytest.raises(reservations.BookingError):
+            reservations.cancel_booking(hold["id"], session_id)
+
+def test_staff_confirm_and_cancel_any_booking(seeded_db, stay):
+    hold = reservations.create_hold("deluxe", *stay, session_id="guest-a")
+    assert reservations.staff_confirm_hold(hold["id"])["status"] == "Confirmed"
+    assert reservations.staff_cancel_booking(hold["id"])["status"] == "Cancelled"
+
+def test_session_id_never_returned(seeded_db, stay):
+    hold = reservations.create_hold("deluxe", *stay, session_id="guest-a")
+    assert "session_id" not in hold
+    assert "session_id" not in reservations.confirm_hold(hold["id"], "guest-a")
+
+def test_api_requires_session(client, stay):
+    hold = client.post("/bookings/hold", json={"room_type": "deluxe", "check_in": str(stay[0]),
+                                               "check_out": str(stay[1]), "session_id": "guest-a"}).json()
+    assert "session_id" not in hold
+    assert client.post(f"/bookings/{hold['id']}/confirm").status_code == 422
+    assert client.post(f"/bookings/{hold['id']}/confirm", json={"session_id": "guest-b"}).status_code == 409
+    assert client.delete(f"/bookings/{hold['id']}").status_code == 422
+    assert client.delete(f"/bookings/{hold['id']}", params={"session_id": "guest-b"}).status_code == 409
+
+    confirmed = client.post(f"/bookings/{hold['id']}/confirm", json={"session_id": "guest-a"})
+    assert confirmed.status_code == 200 and "session_id" not in confirmed.json()
+    assert all("session_id" not in b for b in client.get("/bookings").json())
+
+def test_admin_routes_need_token(client, stay, monkeypatch):
+    hold = reservations.create_hold("deluxe", *stay, session_id="guest-a")
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert client.post(f"/admin/bookings/{hold['id']}/confirm", headers={"X-Admin-Token": ""}).status_code == 403
+
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert client.post(f"/admin/bookings/{hold['id']}/confirm", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.post(f"/admin/bookings/{hold['id']}/confirm", headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert client.delete(f"/admin/bookings/{hold['id']}", headers={"X-Admin-Token": "secret"}).json()["status"] == "Cancelled"
+
+def test_no_room_is_held_twice(seeded_db, stay):
+    # The resort has four suites
+    sessions = [f"guest-{i}" for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = {pool.submit(reservations.create_hold, "suite", *stay, session_id=s): s for s in sessions}
+    held = {futures[f]: f.result() for f in futures if f.exception() is None}
+    assert len(held) == 4
+    assert len({booking["room_number"] for booking in held.values()}) == 4
+    assert all(isinstance(f.exception(), reservations.BookingError) for f in futures if f.exception())
+
+    session_id, booking = next(iter(held.items()))
+    reservations.cancel_booking(booking["id"], session_id)
+    assert reservations.create_hold("suite", *stay, session_id="guest-9")["room_number"] == booking["room_number"]
+
+def test_lapsed_hold_cannot_be_confirmed_and_is_freed(seeded_db, stay):
+    hold = reservations.create_hold("premium", *stay, session_id="guest-a", hold_minutes=-1)
+    with pytest.raises(reservations.BookingError, match="expired"):
+        reservations.confirm_hold(hold["id"], "guest-a")
+
+    assert reservations.expire_holds() >= 1
+    assert hold["room_number"] in get_availability_index().free_rooms("premium", *stay)
+    with pytest.raises(reservations.BookingError):
+        reservations.cancel_booking(hold["id"], "guest-a")
@@ -0,0 +1,93 @@
+import sys
+import uuid
+
+import pytest
+
+from backend import session_store
+from backend.agents import ConversationMemory
+from backend.session_store import InMemorySessionStore, RedisSessionStore, SQLiteSessionStore
+from local_redis import LocalRedis
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request):
+    if request.param == "memory":
+        return InMemorySessionStore()
+    if request.param == "sqlite":
+        request.getfixturevalue("seeded_db")
+        return SQLiteSessionStore()
+    return RedisSessionStore(client=LocalRedis())
+
+@pytest.fixture
+def session_id():
+    return f"test-{uuid.uuid4().hex}"
+
+def test_unknown_session_loads_nothing(store, session_id):
+    assert store.load(session_id) is None
+
+def test_saved_state_round_trips(store, session_id):
+    state = {"messages": [{"role": "user", "content": "Masala dosa to room 204 🙏"}], "context": {"party_size": 2}}
+    store.save(session_id, state)
+    assert store.load(session_id) == state
+
+def test_save_overwrites(store, session_id):
+    store.save(session_id, {"context": {"room_number": "101"}})
+    store.save(session_id, {"context": {"room_number": "202"}})
+    assert store.load(session_id) == {"context": {"room_number": "202"}}
+
+def test_delete(store, session_id):
+    store.save(session_id, {"context": {}})
+    store.delete(session_id)
+    assert store.load(session_id) is None
+    store.delete(session_id)  # deleting again is harmless
+
+def test_sessions_are_separate(store, session_id):
+    store.save(session_id, {"context": {"guest_name": "Priya"}})
+    assert store.load(session_id + "-other") is None
+
+def test_update_context_persists_through_the_store(store, session_id):
+    memory = ConversationMemory(store)
+    memory.update_context(session_id, {"guest_name": "Priya"})
+    memory.update_context(session_id, {"party_size": 3})
+
+    assert ConversationMemory(store).get_context(session_id) == {"guest_name": "Priya", "party_size": 3}
+
+def test_update_context_inside_a_session_block_saves_once_on_exit(store, session_id):
+    memory = ConversationMemory(store)
+    with memory.session(session_id):
+        memory.update_context(session_id, {"room_number": "204"})
+        assert store.load(session_id) is None
+    assert store.load(session_id)["context"] == {"room_number": "204"}
+
+def test_redis_sessions_expire_after_ttl(session_id):
+    now = [1000.0]
+    store = RedisSessionStore(client=LocalRedis(clock=lambda: now[0]), ttl=60)
+    store.save(session_id, {"context": {}})
+
+    now[0] += 59
+    assert store.load(session_id) == {"context": {}}
+    now[0] += 1
+    assert store.load(session_id) is None
+
+def test_redis_save_refreshes_ttl(session_id):
+    now = [1000.0]
+    store = RedisSessionStore(client=LocalRedis(clock=lambda: now[0]), ttl=60)
+    store.save(session_id, {"context": {}})
+    now[0] += 50
+    store.save(session_id, {"context": {"party_size": 2}})
+    now[0] += 50
+    assert store.load(session_id) == {"context": {"party_size": 2}}
+
+def test_memory_store_evicts_least_recently_used():
+    store = InMemorySessionStore(max_sessions=2)
+    store.save("a", {"context": {}})
+    store.save("b", {"context": {}})
+    store.load("a")
+    store.save("c", {"context": {}})
+
+    assert store.load("b") is None
+    assert store.load("a") is not None and store.load("c") is not None
+
+def test_redis_store_without_the_package_says_how_to_install(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(RuntimeError, match="pip install redis"):
+        session_store.create_session_store("redis")
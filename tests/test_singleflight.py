@@ -0,0 +1,64 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "menu"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.do, "menu", slow)
+        while flight.snapshot()["in_flight"] == 0:
+            pass
+        followers = [pool.submit(flight.do, "menu", slow) for _ in range(4)]
+        while flight.snapshot()["shared"] < 4:
+            pass
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert results == ["menu"] * 5
+    assert len(calls) == 1
+    assert flight.snapshot() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+def test_followers_get_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ValueError("db down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", failing)
+        while flight.snapshot()["in_flight"] == 0:
+            pass
+        follower = pool.submit(flight.do, "k", failing)
+        while flight.snapshot()["shared"] == 0:
+            pass
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError, match="db down"):
+                future.result()
+    assert flight.snapshot()["in_flight"] == 0
+
+def test_nothing_is_cached_after_completion():
+    flight = SingleFlight()
+    values = iter([1, 2])
+    assert flight.do("k", lambda: next(values)) == 1
+    assert flight.do("k", lambda: next(values)) == 2
+    assert flight.executed == 2
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: "a") == "a"
+    assert flight.do("b", lambda: "b") == "b"
+    assert flight.shared == 0
@@ -0,0 +1,51 @@
+from backend.slots import extract_guest_name, extract_room_number, extract_slots, fill_tool_args
+
+def test_room_number_stated():
+    assert extract_room_number("Please send 2 towels to room 204") == "204"
+    assert extract_room_number("I'm in 305, can I get breakfast?") == "305"
+    assert extract_room_number("We are staying at room 412.") == "412"
+    assert extract_room_number("Hi, this is Priya from 118") == "118"
+
+def test_rooms_asked_about_are_not_the_guests():
+    for text in ("where is room 101?", "Is there wifi in room 101?", "How far is the pool from room 204?"):
+        assert extract_slots(text).get("room_number") is None, text
+    assert extract_room_number("Can you send towels to room 204?") == "204"
+    assert extract_room_number("Thanks. Where is room 101? I'm in room 204") == "204"
+
+def test_billing_tools_never_get_a_remembered_room():
+    context = {"room_number": "204", "party_size": 2}
+    assert fill_tool_args("place_restaurant_order", {"items_dict": {"Masala Dosa": 1}}, context) == \
+        {"items_dict": {"Masala Dosa": 1}}
+    assert "room_number" not in fill_tool_args("create_room_service_request", {"request_type": "towel"}, context)
+    assert fill_tool_args("check_room_availability", {}, context) == {"guests": 2}
+
+def test_prices_are_not_room_numbers():
+    assert extract_slots("Any dish from 250 or less?").get("room_number") is None
+    assert extract_slots("Do you have rooms from 150 rupees?").get("room_number") is None
+    assert extract_room_number("Is there a room 300 rs cheaper?") is None
+    assert extract_room_number("Suite 450/- per night?") is None
+
+def test_dates_are_not_room_numbers():
+    assert extract_slots("I want a room 2026-03-01 to 2026-03-04").get("room_number") is None
+    assert extract_room_number("Book a room 2027 march please") is None
+    assert extract_room_number("room 12/04 to 15/04") is None
+
+def test_bare_room_answer():
+    assert extract_slots("204", "What is your room number?") == {"room_number": "204"}
+    assert extract_slots("it's 150 rupees", "What is your room number?") == {}
+    assert extract_slots("204", "How can I help?") == {}
+
+def test_guest_name():
+    assert extract_guest_name("My name is Priya Sharma") == "Priya Sharma"
+    assert extract_guest_name("name: Arjun Rao") == "Arjun Rao"
+    assert extract_guest_name("Please book it under Meera") == "Meera"
+
+def test_guest_name_answering_prompt():
+    assert extract_slots("Priya Sharma", "May I have your full name?") == {"guest_name": "Priya Sharma"}
+    assert extract_slots("It's Priya.", "What name should I put the booking under?") == {"guest_name": "Priya"}
+    assert extract_slots("Priya Sharma", "How can I help?") == {}
+
+def test_no_name_without_explicit_cue():
+    for text in ("I'm Vegan, what can I eat?", "I am Allergic to peanuts", "I'm Starving", "This is Amazing",
+                 "I'm Curious", "Hi I'm Lost", "Hi, I'm Arjun"):
+        assert extract_slots(text).get("guest_name") is None, text
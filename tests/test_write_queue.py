@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from backend import tools, write_queue
+from backend.database import SessionLocal
+from backend.models import Order
+from backend.write_queue import WriteQueue
+
+@pytest.fixture
+def writer(seeded_db):
+    writer = WriteQueue(max_batch=50, max_latency_ms=50)
+    writer.start()
+    yield writer
+    writer.stop()
+
+def orders_for(room_number):
+    db = SessionLocal()
+    try:
+        return db.query(Order).filter(Order.room_number == room_number).all()
+    finally:
+        db.close()
+
+def test_concurrent_writes_are_group_committed(writer):
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        saved = list(pool.map(lambda i: writer.submit(Order(room_number="601", items=[], total_amount=i)), range(20)))
+
+    assert all(order.id for order in saved)
+    assert len({order.id for order in saved}) == 20
+    assert len(orders_for("601")) == 20
+    assert writer.rows == 20 and writer.batches < 20
+
+def test_a_bad_row_fails_alone(writer):
+    start = threading.Barrier(3)
+
+    def submit(key):
+        start.wait()
+        return writer.submit(Order(room_number="602", items=[], total_amount=1, idempotency_key=key))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(submit, key) for key in ("wq-dup", "wq-dup", "wq-other")]
+        results, errors = [], []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except IntegrityError as e:
+                errors.append(e)
+
+    assert len(results) == 2 and len(errors) == 1
+    assert sorted(order.idempotency_key for order in orders_for("602")) == ["wq-dup", "wq-other"]
+
+def test_stop_flushes_and_later_submits_fail(seeded_db):
+    writer = WriteQueue(max_batch=50, max_latency_ms=5000)
+    writer.start()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(writer.submit, Order(room_number="603", items=[], total_amount=1))
+        time.sleep(0.1)  # the writer is now waiting out its latency budget for more rows
+        started = time.monotonic()
+        writer.stop()
+        assert pending.result().id
+        assert time.monotonic() - started < 1
+    with pytest.raises(RuntimeError, match="not running"):
+        writer.submit(Order(room_number="603", items=[], total_amount=1))
+
+def test_tools_write_through_the_shared_writer(seeded_db):
+    writer = write_queue.start_writer(max_latency_ms=5)
+    try:
+        assert "ORDER PLACED" in tools.place_restaurant_order("604", {"Masala Dosa": 1})
+        assert writer.rows == 1
+    finally:
+        write_queue.stop_writer()
+    assert write_queue.get_writer() is None
+    assert len(orders_for("604")) == 1